@@ -52,6 +52,9 @@ HTTP_HEAD = 'HEAD'
 HTTP_TRACE = 'TRACE'
 HTTP_CONNECT = 'CONNECT'
 
+# Router method for WebSocket routes. (ASGI only)
+WEBSOCKET = 'WEBSOCKET'
+
 HTTP_100 = '100 Continue'
 HTTP_101 = '101 Switching Protocols'
 HTTP_200 = '200 OK'
@@ -27,7 +27,12 @@
 # CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
+import os
 import base64
+from copy import deepcopy
+from hashlib import sha256
+from threading import Lock
+from collections import OrderedDict
 from datetime import timedelta
 
 from authlib.jose import jwt
@@ -41,11 +46,204 @@ from luxon.exceptions import (AccessDeniedError,
                               TokenMissingError)
 from luxon.utils import js
 from luxon.utils.timezone import epoch
-from luxon.utils import files
 
 log = GetLogger(__name__)
 
 
+def _import_key(raw):
+    # NOTE(cfrademan): Parsing the PEM is a large part of RS256 cost, the key
+    # object is re-used for every sign / verify. Older authlib releases
+    # without JsonWebKey.import_key are given the raw PEM.
+    try:
+        from authlib.jose import JsonWebKey
+        return JsonWebKey.import_key(raw, {'kty': 'RSA'})
+    except Exception:
+        return raw
+
+
+class KeyStore(object):
+    """Process-wide RSA key store.
+
+    Keys are read and parsed once and re-used by all Auth objects. The file
+    is stat'd on every lookup and the key reloaded when its modification
+    time or size changes.
+    """
+    __slots__ = ('_keys', '_lock')
+
+    def __init__(self):
+        self._keys = {}
+        self._lock = Lock()
+
+    def get(self, path):
+        """Return key for file.
+
+        Args:
+            path (str): Path to PEM file.
+
+        Returns:
+            tuple: (fingerprint, key) or None if file does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._keys.pop(path, None)
+            return None
+
+        version = (stat.st_mtime_ns, stat.st_size,)
+
+        try:
+            cached_version, fingerprint, key = self._keys[path]
+            if cached_version == version:
+                return (fingerprint, key,)
+        except KeyError:
+            pass
+
+        with self._lock:
+            with open(path, 'rb') as f:
+                raw = f.read()
+
+            fingerprint = sha256(raw).digest()
+            key = _import_key(raw)
+            self._keys[path] = (version, fingerprint, key,)
+            log.info("Loaded key '%s'" % path)
+
+        return (fingerprint, key,)
+
+    def clear(self):
+        """Clear loaded keys."""
+        with self._lock:
+            self._keys.clear()
+
+
+class TokenCache(object):
+    """Verified token cache.
+
+    Bounded LRU of token payloads that passed RS256 verification. Keyed by
+    hash of the raw token and public key fingerprint. Entries are discarded
+    once the token 'exp' claim has passed.
+
+    Args:
+        max_tokens (int): Maximum tokens cached. (0 disables cache)
+    """
+    __slots__ = ('_tokens', '_lock', '_max_tokens',
+                 '_hits', '_misses', '_expired', '_evictions')
+
+    def __init__(self, max_tokens=1024):
+        self._tokens = OrderedDict()
+        self._lock = Lock()
+        self._max_tokens = max_tokens
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _reference(fingerprint, token):
+        if isinstance(token, str):
+            token = token.encode('UTF-8')
+        return sha256(fingerprint + token).digest()
+
+    def get(self, fingerprint, token):
+        """Return verified claims for token.
+
+        Args:
+            fingerprint (bytes): Public key fingerprint.
+            token (str): Raw token.
+
+        Returns:
+            JWTClaims: Claims or None if not cached.
+        """
+        reference = self._reference(fingerprint, token)
+        with self._lock:
+            try:
+                payload, header, exp = self._tokens[reference]
+            except KeyError:
+                self._misses += 1
+                return None
+
+            if exp is not None and epoch() >= exp:
+                del self._tokens[reference]
+                self._expired += 1
+                self._misses += 1
+                return None
+
+            self._tokens.move_to_end(reference)
+            self._hits += 1
+
+        # NOTE(cfrademan): Auth modifies claims in place, such as roles.
+        return JWTClaims(deepcopy(payload), header)
+
+    def set(self, fingerprint, token, claims):
+        """Cache verified claims for token.
+
+        Args:
+            fingerprint (bytes): Public key fingerprint.
+            token (str): Raw token.
+            claims (JWTClaims): Verified claims.
+        """
+        if self._max_tokens <= 0:
+            return
+
+        reference = self._reference(fingerprint, token)
+        entry = (deepcopy(dict(claims)), claims.header, claims.get('exp'),)
+        with self._lock:
+            self._tokens[reference] = entry
+            self._tokens.move_to_end(reference)
+            while len(self._tokens) > self._max_tokens:
+                self._tokens.popitem(last=False)
+                self._evictions += 1
+
+    @property
+    def stats(self):
+        """Cache statistics.
+
+        Returns:
+            dict: tokens, hits, misses, expired and evictions.
+        """
+        return {'tokens': len(self._tokens),
+                'hits': self._hits,
+                'misses': self._misses,
+                'expired': self._expired,
+                'evictions': self._evictions}
+
+    def clear(self):
+        """Clear cached tokens and statistics."""
+        with self._lock:
+            self._tokens.clear()
+            self._hits = 0
+            self._misses = 0
+            self._expired = 0
+            self._evictions = 0
+
+
+_keys = KeyStore()
+_tokens = None
+
+
+def _token_cache():
+    global _tokens
+
+    if _tokens is None:
+        _tokens = TokenCache(g.app.config.getint('tokens', 'cache',
+                                                 fallback=1024))
+    return _tokens
+
+
+def auth_cache_info():
+    """Verified token cache statistics.
+
+    Returns:
+        dict: tokens, hits, misses, expired and evictions.
+    """
+    return _token_cache().stats
+
+
+def auth_cache_clear():
+    """Clear loaded keys and verified token cache."""
+    _keys.clear()
+    _token_cache().clear()
+
+
 class Auth(object):
     """Authentication class.
 
@@ -61,47 +259,42 @@ class Auth(object):
 
     Args:
         expire (int): Token life-span in seconds. (default 60 seconds)
+        on_change (function): Called when authentication changes.
     """
     __slots__ = ('_token',
                  '_token_expire',
                  '_header',
                  '_jwt',
                  '_rsa_pub',
-                 '_rsa_prv',
+                 '_on_change',
                  )
 
-    def __init__(self, expire=60):
-        def read_file(path):
-            with open(path, 'rb') as f:
-                return f.read()
-
+    def __init__(self, expire=60, on_change=None):
         # JWT Token header.
         self._header = {'alg': 'RS256'}
 
+        # Called when authentication changes.
+        self._on_change = on_change
+
         # Create initial token dict.
         self.clear()
 
         # Token expiry.
         self._token_expire = expire
 
-        # Read private key.
-        if files.exists(g.app.path.rstrip('/') + '/private.pem'):
-            with open(g.app.path.rstrip('/') + '/private.pem', 'rb') as f:
-                self._rsa_prv = f.read()
-        else:
-            self._rsa_prv = None
-
-        # Read public key.
-        if files.exists(g.app.path.rstrip('/') + '/public.pem'):
-            with open(g.app.path.rstrip('/') + '/public.pem', 'rb') as f:
-                self._rsa_pub = f.read()
-        else:
-            self._rsa_pub = None
+        # Public key from process-wide key store. The private key is only
+        # loaded when signing.
+        self._rsa_pub = _keys.get(g.app.path.rstrip('/') + '/public.pem')
 
     def clear(self):
         """Clear authentication."""
         self._token = None
         self._jwt = None
+        self._changed()
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
 
     def validate(self):
         if self._jwt:
@@ -128,10 +321,11 @@ class Auth(object):
             raise TokenMissingError()
 
         if not self._token:
-            if self._rsa_prv:
+            rsa_prv = _keys.get(g.app.path.rstrip('/') + '/private.pem')
+            if rsa_prv:
                 return jwt.encode(self._header,
                                   self._jwt,
-                                  self._rsa_prv)
+                                  rsa_prv[1])
             else:
                 raise AccessDeniedError('No private key for signing JWT Token')
         else:
@@ -143,9 +337,17 @@ class Auth(object):
             raise AccessDeniedError('No public key for validating JWT Token')
 
         if token is not None:
+            fingerprint, key = self._rsa_pub
+            tokens = _token_cache()
             self._token = token
-            self._jwt = jwt.decode(token, self._rsa_pub)
-            self.validate()
+            self._jwt = tokens.get(fingerprint, token)
+            if self._jwt is None:
+                self._jwt = jwt.decode(token, key)
+                self.validate()
+                tokens.set(fingerprint, token, self._jwt)
+            else:
+                self.validate()
+            self._changed()
 
     @property
     def json(self):
@@ -177,6 +379,7 @@ class Auth(object):
 
         claims['exp'] = int(epoch() + self._token_expire)
         self._jwt = JWTClaims(claims, self._header)
+        self._changed()
 
     def extend(self):
         self._token = None
@@ -210,6 +413,7 @@ class Auth(object):
         else:
             raise ValueError("Appending roles requires 'str', 'tuple'" +
                              " or 'list'")
+        self._changed()
 
     @property
     def metadata(self):
@@ -222,6 +426,7 @@ class Auth(object):
         self._token = None
         self.validate()
         self._jwt['metadata'] = value
+        self._changed()
 
     @property
     def user_id(self):
@@ -258,6 +463,7 @@ class Auth(object):
     def default_tenant_id(self, value):
         if self._jwt:
             self._jwt['default_tenant_id'] = value
+            self._changed()
 
     @property
     def tenant_id(self):
@@ -275,6 +481,7 @@ class Auth(object):
                 raise AccessDeniedError("Token already scoped in 'tenant'")
 
         self._jwt['tenant_id'] = value
+        self._changed()
 
     @property
     def domain(self):
@@ -292,6 +499,7 @@ class Auth(object):
                 raise AccessDeniedError("Token already scoped in 'domain'")
 
         self._jwt['domain'] = value
+        self._changed()
 
     def __repr__(self):
         return repr(self._jwt)
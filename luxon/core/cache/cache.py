@@ -28,9 +28,15 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 from luxon import g
+from luxon.core.metrics import registry
 from luxon.utils.imports import get_class
 from luxon.utils.singleton import Singleton
 
+_REQUESTS = registry.counter('luxon_cache_requests_total',
+                             'Cache loads by result. (hit, miss)')
+_STORES = registry.counter('luxon_cache_stores_total',
+                           'Objects stored in cache.')
+
 
 class Cache(metaclass=Singleton):
     """Caching class
@@ -52,6 +58,7 @@ class Cache(metaclass=Singleton):
                              fallback="luxon.core.cache:Memory"))(
                              max_objects,
                              max_object_size)
+        self._backend_name = type(self._cached_backend).__name__
 
     def store(self, reference, obj, expire=60):
         """Store object
@@ -65,6 +72,8 @@ class Cache(metaclass=Singleton):
             expire = 604800
 
         self._cached_backend.store(reference, obj, expire)
+        if registry.enabled:
+            _STORES.inc(backend=self._backend_name)
 
     def load(self, reference):
         """Returns Cached Object
@@ -75,4 +84,8 @@ class Cache(metaclass=Singleton):
         Returns:
             object from cache
         """
-        return self._cached_backend.load(reference)
+        obj = self._cached_backend.load(reference)
+        if registry.enabled:
+            _REQUESTS.inc(backend=self._backend_name,
+                          result='miss' if obj is None else 'hit')
+        return obj
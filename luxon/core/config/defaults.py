@@ -38,6 +38,7 @@ defaults = {
         'log_stdout': 'True',
         'log_level': 'WARNING',
         'debug': 'False',
+        'json_encoder': 'pretty',
     },
     'identity': {
         'url': 'http://127.0.0.1/infinitystone',
@@ -48,6 +49,12 @@ defaults = {
     },
     'tokens': {
         'expire': '3600',
+        'cache': '1024',
+    },
+    'form': {
+        'max_size': '0',
+        'max_parts': '1000',
+        'spool_size': '1048576',
     },
     'sessions': {
         'expire': '86400',
@@ -57,6 +64,13 @@ defaults = {
     'database': {
         'type': 'sqlite3',
         'host': '127.0.0.1',
+        'schema_ttl': '300',
+        'sqlite_journal_mode': 'wal',
+        'sqlite_synchronous': 'normal',
+        'sqlite_busy_timeout': '5000',
+        'sqlite_cache_size': '-8000',
+        'sqlite_mmap_size': '67108864',
+        'sqlite_statements': '256',
     },
     'redis': {
         'db': '0',
@@ -69,5 +83,12 @@ defaults = {
         'backend': 'luxon.core.cache:Memory',
         'max_objects': '5000',
         'max_object_size': '50',
+        'responses': 'false',
+    },
+    'metrics': {
+        'enabled': 'false',
+        'route': '/metrics',
+        'cells': '4096',
+        'workers': '0',
     },
 }
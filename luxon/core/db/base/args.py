@@ -29,6 +29,7 @@
 # SUCH DAMAGE.
 
 import re
+from functools import lru_cache
 from ipaddress import IPv4Address, IPv6Address
 from decimal import Decimal
 from datetime import datetime
@@ -76,73 +77,103 @@ def _parse_param(value, cast_map):
     return value
 
 
-def args_to(query, args, to='qmark', cast=None):
-    if isinstance(args, tuple):
-        args = list(args)
-    if not isinstance(args, (list, dict)):
-        if args is None:
-            return (query, args)
-        args = [args, ]
-    else:
-        args = args.copy()
+@lru_cache(maxsize=1024)
+def _translate(query, to):
+    """Translate query placeholders to destination paramstyle.
 
-    if to == "qmark" or to == "numeric" or to == "format":
-        new_args = []
-    else:
-        new_args = {}
+    Cached by query text and destination paramstyle, since the rewritten
+    query never changes for the same query.
 
+    Returns:
+        tuple: (query, columns, positional, style) where columns is the
+            sequence of column names or placeholders in order of appearance,
+            positional the number of leading placeholders that can be bound
+            from sequence args and style the paramstyle of the first
+            placeholder requiring dict args.
+    """
+    columns = []
+    positional = None
+    style = None
     counter = 0
     expressions = interpolation_format_match.findall(query)
     for expr in expressions:
         if pyformat_re_match.match(expr):
-            if not isinstance(args, dict):
-                raise TypeError('Can only match pyformat using dict args')
             column = expr[2:][:-2]
+            if positional is None:
+                positional = len(columns)
+                style = 'pyformat'
         elif named_re_match.match(expr):
-            if not isinstance(args, dict):
-                raise TypeError('Can only match named using dict args')
             column = expr[1:]
+            if positional is None:
+                positional = len(columns)
+                style = 'named'
         else:
             column = expr
+
+        if to == "qmark":
+            query = query.replace(expr, '?', 1)
+        elif to == "numeric":
+            query = query.replace(expr, ':%s' % counter, 1)
+            counter += 1
+        elif to == "named":
+            query = query.replace(expr, ':%s' % column, 1)
+        elif to == "format":
+            query = query.replace(expr, '%s', 1)
+        elif to == "pyformat":
+            query = query.replace(expr, '%' + '(%s)s' % column, 1)
+        else:
+            raise ValueError("Unknown type '%s'" % to) from None
+
+        columns.append(column)
+
+    if positional is None:
+        positional = len(columns)
+
+    return (query, tuple(columns), positional, style)
+
+
+def args_cache_info():
+    """Query translation cache statistics.
+
+    Returns:
+        namedtuple: (hits, misses, maxsize, currsize)
+    """
+    return _translate.cache_info()
+
+
+def args_cache_clear():
+    """Clear query translation cache.
+    """
+    _translate.cache_clear()
+
+
+def args_to(query, args, to='qmark', cast=None):
+    if isinstance(args, tuple):
+        args = list(args)
+    if not isinstance(args, (list, dict)):
+        if args is None:
+            return (query, args)
+        args = [args, ]
+
+    query, columns, positional, style = _translate(query, to)
+
+    if isinstance(args, dict):
         try:
-            if to == "qmark":
-                query = query.replace(expr, '?', 1)
-                if isinstance(args, dict):
-                    new_args.append(_parse_param(args[column], cast))
-                else:
-                    new_args.append(_parse_param(args.pop(0), cast))
-            elif to == "numeric":
-                query = query.replace(expr, ':%s' % counter, 1)
-                if isinstance(args, dict):
-                    new_args.append(_parse_param(args[column], cast))
-                else:
-                    new_args.append(_parse_param(args.pop(0), cast))
-                counter += 1
-            elif to == "named":
-                query = query.replace(expr, ':%s' % column, 1)
-                if isinstance(args, dict):
-                    new_args.append(_parse_param(args[column], cast))
-                else:
-                    new_args.append(_parse_param(args.pop(0), cast))
-            elif to == "format":
-                query = query.replace(expr, '%s', 1)
-                if isinstance(args, dict):
-                    new_args.append(_parse_param(args[column], cast))
-                else:
-                    new_args.append(_parse_param(args.pop(0), cast))
-            elif to == "pyformat":
-                query = query.replace(expr, '%' + '(%s)s' % column, 1)
-                if isinstance(args, dict):
-                    new_args.append(_parse_param(args[column], cast))
-                else:
-                    new_args.append(_parse_param(args.pop(0), cast))
-            else:
-                raise ValueError("Unknown type '%s'" % type) from None
-        except KeyError:
-            raise KeyError("DB Query: Field '%s' value not in" % column +
+            new_args = [_parse_param(args[column], cast)
+                        for column in columns]
+        except KeyError as e:
+            raise KeyError("DB Query: Field '%s' value not in" % e.args[0] +
                            " dictionary provided") from None
-        except IndexError:
+    else:
+        if len(args) < positional:
             raise IndexError("DB Query: Not all field" +
                              " values provided") from None
+        if style is not None:
+            raise TypeError('Can only match %s using dict args' % style)
+        new_args = [_parse_param(value, cast)
+                    for value in args[:positional]]
+
+    if to == "named" or to == "pyformat":
+        new_args = dict(zip(columns, new_args))
 
     return (query, new_args)
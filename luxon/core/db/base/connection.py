@@ -29,9 +29,9 @@
 # SUCH DAMAGE.
 from threading import RLock
 
-from luxon import exceptions
 from luxon.core.logger import GetLogger
 from luxon.core.db.base.cursor import Cursor
+from luxon.core.db.base import schema
 from luxon.core.db.base.exceptions import Exceptions as BaseExeptions
 
 # LOCALIZE Exceptions to Module as pep-0249
@@ -89,7 +89,16 @@ class Connection(BaseExeptions):
     ERROR_MAP = error_map
     CAST_MAP = cast_map
     _crsr_cls_args = []
+    # Driver cursor for streaming, None uses same cursor.
+    _stream_crsr_cls = None
     THREADSAFETY = threadsafety
+    # Bulk insert limits per statement.
+    BULK_ROWS = 1000
+    BULK_PARAMS = None
+    BULK_PACKET = 1048576
+    # Driver type codes of datetime columns in cursor description.
+    # Columns are probed for datetime values when None.
+    DATETIME_TYPES = None
     _instances = {}
 
     def __new__(cls, *args, **kwargs):
@@ -108,25 +117,99 @@ class Connection(BaseExeptions):
             self._cached_crsr = None
             self._crsr_cls = None
             self._cursors = []
+            # Open streaming cursors and functions run once closed.
+            self._streams = []
+            self._deferred = []
         except Exception as e:
             self._error_handler(self, e, self.ERROR_MAP)
 
     def __repr__(self):
         return str(self)
 
-    def cursor(self):
+    def cursor(self, stream=False):
         """Return a new Cursor Object using the connection.
 
         If the database does not provide a direct cursor concept, the module
         will have to emulate cursors using other means to the extent needed by
         this specification.
 
+        Keyword Args:
+            stream (bool): Fetch rows from server as read, refer to stream.
+
         Reference PEP-0249
         """
-        crsr = Cursor(self)
+        crsr = Cursor(self, stream)
         self._cursors.append(crsr)
+        if stream:
+            self._streams.append(crsr)
         return crsr
 
+    def stream(self, query, args=None, batch=1000):
+        """Execute query and stream rows.
+
+        Rows are fetched from the server in batches while iterating, large
+        result sets are not loaded into memory. Rows are returned as for
+        execute.
+
+        The cursor is closed once all rows are read, or when closed. Until
+        then closing the connection or returning it to the pool is deferred
+        and no other queries should be executed on the connection.
+
+        .. code:: python
+
+            with conn.stream('SELECT * FROM log') as rows:
+                for row in rows:
+                    ...
+
+        Args:
+            query (str): SQL Query.
+
+        Keyword Args:
+            args (list): Query values.
+            batch (int): Rows fetched at a time.
+
+        Returns:
+            Cursor object.
+        """
+        crsr = self.cursor(stream=True)
+        crsr.BATCH = batch
+        try:
+            return crsr.execute(query, args)
+        except Exception:
+            crsr.close()
+            raise
+
+    def defer(self, func):
+        """Run function once streaming cursors are closed.
+
+        Used by Pool to return connection once streams are closed.
+
+        Args:
+            func (function): Function to call without arguments.
+
+        Returns:
+            bool: True when deferred, False when no streams are open.
+        """
+        if not self._streams:
+            return False
+        self._deferred.append(func)
+        return True
+
+    def _closed_stream(self, crsr):
+        try:
+            self._streams.remove(crsr)
+        except ValueError:
+            pass
+        if not self._streams:
+            deferred = self._deferred
+            self._deferred = []
+            for func in deferred:
+                func()
+
+    def _columns(self, crsr):
+        # Column names of result set for driver cursor.
+        return [column[0] for column in crsr.description]
+
     @property
     def _crsr(self):
         if self._cached_crsr is None:
@@ -181,42 +264,65 @@ class Connection(BaseExeptions):
         """
         return self._crsr.execute(*args, **kwargs)
 
-    def has_table(self, table):
+    @property
+    def _schema_key(self):
+        # Identifies database in schema metadata cache.
+        return str(self)
+
+    def _load_columns(self, table):
+        # Columns of table from database, refer to columns.
+        raise NotImplementedError()
+
+    def _fetch(self, query, args=None):
+        # Rows of query on own cursor, results of other cursors and
+        # uncommited transactions are left as is.
+        crsr = self.cursor()
         try:
-            query = 'SELECT * FROM %s limit 0' % table
-            self.execute(query)
-            return True
-        except exceptions.SQLOperationalError:
-            # THIS ONE MATCHES FOR SQLLITE3? Kinda wrong.
-            return False
-        except exceptions.SQLProgrammingError:
-            # MYSQL USES THIS ONE
-            return False
+            return crsr.execute(query, args).fetchall()
+        finally:
+            crsr._uncommited = False
+            crsr.close()
+
+    def columns(self, table):
+        """Columns of table.
+
+        Loaded from the schema metadata cache, refer to
+        luxon.core.db.base.schema.
+
+        Args:
+            table (str): Table name.
+
+        Returns:
+            dict: Column name and database type, empty if no such table.
+        """
+        return schema.columns(self, table)
+
+    def has_table(self, table):
+        return len(self.columns(table)) > 0
 
     def has_field(self, table, field):
-        try:
-            query = 'SELECT %s FROM %s LIMIT 0' % (field,
-                                                   table)
-            self.execute(query)
-            return True
-        except exceptions.SQLOperationalError:
-            # THIS ONE MATCHES FOR SQLLITE3? Kinda wrong.
-            return False
-        except exceptions.SQLDatabaseError:
-            # MYSQL USES THIS ONE?
-            return False
-        except exceptions.SQLProgrammingError:
-            # MYSQL USES THIS ONE?
-            return False
+        return field in self.columns(table)
+
+    def executemany(self, *args, **kwargs):
+        """Prepare and execute a database operation against many parameters.
 
-    def insert(self, table, data):
+        This method is for conveniance and non-standard.
+
+        Refer to Cursor.executemany.
+        """
+        return self._crsr.executemany(*args, **kwargs)
+
+    def insert(self, table, data, bulk=False):
         """Insert data into table.
 
         Args:
             table (str): Table name.
             data (list): List of rows containing values.
+
+        Keyword Args:
+            bulk (bool): Use multi-row INSERT statements.
         """
-        self._crsr.insert(table, data)
+        self._crsr.insert(table, data, bulk)
 
     def clean_up(self):
         """Cleanup server Session.
@@ -245,6 +351,9 @@ class Connection(BaseExeptions):
 
         Reference PEP-0249
         """
+        if self.defer(self.close):
+            return
+
         self.clean_up()
         for crsr in self._cursors:
             crsr.close()
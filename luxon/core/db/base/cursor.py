@@ -27,12 +27,15 @@
 # STRICT LIABILITY,OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY
 # WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
+from timeit import default_timer
+
 from luxon import g
 from luxon.core.logger import GetLogger
 from luxon.core.db.base.args import args_to
-from luxon.core.db.base.parse import parse_row
+from luxon.core.db.base.parse import Decoder
 from luxon.core.db.base.exceptions import Exceptions as BaseExeptions
 from luxon.utils.timer import Timer
+from luxon.core.metrics import registry
 
 log = GetLogger(__name__)
 
@@ -58,15 +61,46 @@ def _log(cursor, msg, elapsed=0, values=None):
     log.debug(log_msg, timer=elapsed)
 
 
+_QUERY_DURATION = registry.histogram('luxon_db_query_duration_seconds',
+                                     'Seconds executing database query.')
+
+
+def _observe(cursor, query, start):
+    """Record query metrics.
+
+    Args:
+        cursor (object): Cursor object.
+        query (str): Query executed.
+        start (float): Time query started.
+    """
+    # NOTE(cfrademan): Statement keyword keeps label values bounded.
+    try:
+        command = query.split(None, 1)[0].upper()
+    except (AttributeError, IndexError):
+        command = ''
+    _QUERY_DURATION.observe(default_timer() - start,
+                            database=type(cursor._conn).__module__.rsplit(
+                                '.', 1)[-1],
+                            command=command)
+
+
 class Cursor(BaseExeptions):
-    def __init__(self, conn):
+    # Rows fetched from driver at a time while iterating.
+    BATCH = 1000
+
+    def __init__(self, conn, stream=False):
         try:
             self._conn = conn
-            self._crsr = conn._crsr_cls(*conn._crsr_cls_args)
+            self._stream = stream
+            if stream and conn._stream_crsr_cls is not None:
+                self._crsr = conn._stream_crsr_cls(*conn._crsr_cls_args)
+            else:
+                self._crsr = conn._crsr_cls(*conn._crsr_cls_args)
             self._uncommited = False
             self.arraysize = 1
             self._rownumber = 0
             self._executed = False
+            self._decoder = None
             try:
                 self._debug = g.app.debug
             except AttributeError:
@@ -162,14 +196,18 @@ class Cursor(BaseExeptions):
     def __iter__(self):
         """Return self to make cursors compatible to the iteration protocol
 
+        Streaming cursors are closed once all rows are returned.
+
         Reference PEP-0249
         """
         while True:
-            value = self.fetchone()
-            if value is not None:
-                yield parse_row(value)
-            else:
+            rows = self.fetchmany(self.BATCH)
+            if not rows:
                 break
+            yield from rows
+
+        if self._stream:
+            self.close()
 
     def execute(self, query, args=None):
         """Prepare and execute a database operation (query or command).
@@ -201,8 +239,10 @@ class Cursor(BaseExeptions):
 
         Reference PEP-0249
         """
+        start = default_timer() if registry.enabled else None
         with Timer() as elapsed:
             self._rownumber = 0
+            self._decoder = None
             try:
                 if args is not None and not isinstance(args, (dict,
                                                               list,
@@ -227,13 +267,12 @@ class Cursor(BaseExeptions):
             finally:
                 if self._debug:
                     _log(self, "Completed " + query, elapsed(), values=args)
+                if start is not None:
+                    _observe(self, query, start)
 
     def executemany(self, query, params):
         """Pepare and Execute Many.
 
-        Warning:
-            !!! NOT IMPLEMENTED !!!
-
         Prepare a database operation (query or command) and then execute it
         against all parameter sequences or mappings found in the sequence
         seq_of_parameters.
@@ -252,9 +291,48 @@ class Cursor(BaseExeptions):
 
         Return values are not defined.
 
+        The query is translated once and the parameters are passed to the
+        driver's executemany, which batches the operation natively. (e.g.
+        multi-row INSERT statements for MySQL)
+
         Reference PEP-0249
         """
-        raise NotImplementedError()
+        start = default_timer() if registry.enabled else None
+        with Timer() as elapsed:
+            self._rownumber = 0
+            self._decoder = None
+            seq_of_args = []
+            try:
+                for args in params:
+                    if args is not None and not isinstance(args, (dict,
+                                                                  list,
+                                                                  tuple)):
+                        args = [args]
+
+                    translated, args = args_to(query, args,
+                                               self._conn.DEST_FORMAT,
+                                               self._conn.CAST_MAP)
+                    seq_of_args.append(args)
+
+                if not seq_of_args:
+                    return self
+
+                query = translated
+                if self._debug:
+                    _log(self, "Start Many " + query, elapsed(),
+                         values="%s rows" % len(seq_of_args))
+                self._uncommited = True
+                self._executed = True
+                self._crsr.executemany(query, seq_of_args)
+                return self
+            except Exception as e:
+                self._error_handler(self, e, self._conn.ERROR_MAP)
+            finally:
+                if self._debug:
+                    _log(self, "Completed Many " + query, elapsed(),
+                         values="%s rows" % len(seq_of_args))
+                if start is not None and seq_of_args:
+                    _observe(self, query, start)
 
     def fetchone(self):
         """Fetch row.
@@ -269,12 +347,11 @@ class Cursor(BaseExeptions):
         """
         if self._executed is False:
             raise self.ProgrammingError('No data, use execute method first')
-        try:
-            row = parse_row(dict(self._crsr.fetchone()))
-            self._rownumber += 1
-            return row
-        except TypeError:
+        row = self._crsr.fetchone()
+        if row is None:
             return None
+        self._rownumber += 1
+        return self._decode((row,))[0]
 
     def fetchmany(self, size=None):
         """Fetch many rows.
@@ -299,12 +376,15 @@ class Cursor(BaseExeptions):
 
         Reference PEP-0249
         """
-        many = []
+        if self._executed is False:
+            raise self.ProgrammingError('No data, use execute method first')
         if size is None:
             size = self.arraysize
-        for a in range(size):
-            many.append(self.fetchone())
-        return many
+        rows = self._crsr.fetchmany(size)
+        if not rows:
+            return []
+        self._rownumber += len(rows)
+        return self._decode(rows)
 
     def fetchall(self):
         """Fetch all rows.
@@ -318,10 +398,24 @@ class Cursor(BaseExeptions):
 
         Reference PEP-0249
         """
-        all = []
-        for a in self:
-            all.append(a)
-        return all
+        if self._executed is False:
+            raise self.ProgrammingError('No data, use execute method first')
+        rows = self._crsr.fetchall()
+        if not rows:
+            return []
+        self._rownumber += len(rows)
+        return self._decode(rows)
+
+    def _decode(self, rows):
+        # Decoder resolved once for result set of query executed.
+        decoder = self._decoder
+        if decoder is None:
+            description = self._crsr.description
+            decoder = self._decoder = Decoder(
+                self._conn._columns(self._crsr),
+                [column[1] for column in description],
+                self._conn.DATETIME_TYPES)
+        return decoder(rows)
 
     def nextset(self):
         """Return next result set.
@@ -412,6 +506,19 @@ class Cursor(BaseExeptions):
         subclass) exception will be raised if any operation is attempted with
         the cursor.
         """
+        if self._stream is not False:
+            # NOTE(cfrademan): Unbuffered results are read to the end when
+            # closed, queries are only read so nothing to rollback.
+            if self._stream:
+                self._stream = None
+                self._crsr.close()
+                try:
+                    self._conn._cursors.remove(self)
+                except ValueError:
+                    pass
+                self._conn._closed_stream(self)
+            return
+
         if self._uncommited is True:
             self.rollback()
             self.commit()
@@ -430,10 +537,7 @@ class Cursor(BaseExeptions):
                 try:
                     self._crsr.commit()
                 except AttributeError:
-                    try:
-                        self._conn.commit()
-                    except AttributeError:
-                        self._conn._conn.commit()
+                    self._conn._conn.commit()
 
             if self._debug:
                 _log(self, "Commit", elapsed())
@@ -455,14 +559,26 @@ class Cursor(BaseExeptions):
             if self._debug:
                 _log(self, "Rollback", elapsed())
 
-    def insert(self, table, data):
+    def insert(self, table, data, bulk=False):
         """Insert data into table.
 
+        In bulk mode consecutive rows with the same columns are packed into
+        multi-row INSERT statements. Statements are limited by the
+        connection's BULK_ROWS, BULK_PARAMS and BULK_PACKET.
+
         Args:
             table (str): Table name.
             data (list): List of rows containing values.
+
+        Keyword Args:
+            bulk (bool): Use multi-row INSERT statements.
         """
         if data is not None:
+            if bulk is True:
+                self._insert_bulk(table, data)
+                self.commit()
+                return
+
             for row in data:
                 if isinstance(row, dict):
                     query = "INSERT INTO %s (" % table
@@ -490,6 +606,67 @@ class Cursor(BaseExeptions):
                     pass
             self.commit()
 
+    def _insert_bulk(self, table, data):
+        max_rows = self._conn.BULK_ROWS
+        max_params = self._conn.BULK_PARAMS
+        max_packet = self._conn.BULK_PACKET
+
+        columns = None
+        width = 0
+        values = []
+        rows = 0
+        packet = 0
+
+        def flush(columns, width, values, rows):
+            if rows:
+                query = "INSERT INTO %s" % table
+                if columns:
+                    query += " (" + ','.join(columns) + ")"
+                query += ' VALUES '
+                query += ','.join(
+                    ['(' + ','.join(['%s'] * width) + ')'] * rows
+                )
+                self.execute(query, values)
+
+        for row in data:
+            if isinstance(row, dict):
+                row_columns = tuple(row.keys())
+                row = list(row.values())
+            elif isinstance(row, (list, tuple)):
+                row_columns = ()
+                row = list(row)
+            else:
+                continue
+
+            if not row:
+                continue
+
+            row_packet = 0
+            for value in row:
+                if isinstance(value, (str, bytes,)):
+                    row_packet += len(value) + 4
+                else:
+                    row_packet += 24
+
+            if (rows and (row_columns != columns or
+                          len(row) != width or
+                          rows >= max_rows or
+                          (max_params and
+                           len(values) + width > max_params) or
+                          packet + row_packet > max_packet)):
+                flush(columns, width, values, rows)
+                values = []
+                rows = 0
+                packet = 0
+
+            columns = row_columns
+            width = len(row)
+            values += row
+            rows += 1
+            packet += row_packet
+
+        flush(columns, width, values, rows)
+
     def __enter__(self):
         return self
 
@@ -31,6 +31,8 @@
 from datetime import datetime
 from luxon.utils.timezone import to_utc, TimezoneUTC
 
+_UTC = TimezoneUTC()
+
 
 def parse_row(row):
     """Parse SQL columsn returned.
@@ -41,3 +43,77 @@ def parse_row(row):
                 row[column] = to_utc(row[column], fallback=TimezoneUTC())
 
     return row
+
+
+class Decoder(object):
+    """Decode result set rows to dicts.
+
+    Columns are resolved once for each result set. Only columns returning
+    datetime values are converted to UTC, other values are used as
+    returned by the driver.
+
+    When the driver type codes of datetime columns are not known, columns
+    are probed until the first value that is not None is found.
+
+    Args:
+        names (list): Column names.
+
+    Keyword Args:
+        types (list): Driver type codes of columns.
+        datetime_types (tuple): Driver type codes of datetime columns.
+    """
+    __slots__ = ('_names', '_convert', '_pending',)
+
+    def __init__(self, names, types=None, datetime_types=None):
+        self._names = tuple(names)
+        self._convert = []
+        if types is not None and datetime_types is not None:
+            self._pending = None
+            for name, type in zip(self._names, types):
+                if type in datetime_types:
+                    self._convert.append(name)
+        else:
+            self._pending = list(range(len(self._names)))
+
+    def _probe(self, rows):
+        pending = self._pending
+        for row in rows:
+            for column in tuple(pending):
+                value = row[column]
+                if value is not None:
+                    pending.remove(column)
+                    if isinstance(value, datetime):
+                        self._convert.append(self._names[column])
+            if not pending:
+                break
+
+    def __call__(self, rows):
+        """Decode rows.
+
+        Args:
+            rows (list): Rows as sequences of column values.
+
+        Returns:
+            list: Rows as dicts.
+        """
+        if self._pending:
+            self._probe(rows)
+
+        names = self._names
+        convert = self._convert
+        if not convert:
+            return [dict(zip(names, row)) for row in rows]
+
+        decoded = []
+        append = decoded.append
+        for row in rows:
+            row = dict(zip(names, row))
+            for column in convert:
+                value = row[column]
+                if isinstance(value, datetime):
+                    if value.tzinfo is None:
+                        row[column] = value.replace(tzinfo=_UTC)
+                    else:
+                        row[column] = to_utc(value)
+            append(row)
+        return decoded
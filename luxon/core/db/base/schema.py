@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTI-
+# TUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUP-
+# TION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY,OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY
+from threading import Lock
+from time import monotonic
+
+from luxon import g
+from luxon.exceptions import NoContextError
+
+# Cached columns of tables. (database, table) -> (expire, columns)
+_cache = {}
+_lock = Lock()
+
+
+def _ttl():
+    try:
+        return g.app.config.getint('database', 'schema_ttl', fallback=300)
+    except (NoContextError, ValueError):
+        return 300
+
+
+def columns(conn, table):
+    """Columns of table from schema metadata cache.
+
+    Columns are loaded with the connection '_load_columns' method when not
+    cached or expired. The cache is per process, entries expire after the
+    '[database] schema_ttl' seconds. (default 300)
+
+    Args:
+        conn (obj): Database connection.
+        table (str): Table name.
+
+    Returns:
+        dict: Column name and database type, empty if no such table.
+    """
+    key = (conn._schema_key, table,)
+    now = monotonic()
+    try:
+        expire, cached = _cache[key]
+        if now < expire:
+            return cached
+    except KeyError:
+        pass
+
+    cached = conn._load_columns(table)
+    with _lock:
+        _cache[key] = (now + _ttl(), cached,)
+    return cached
+
+
+def invalidate(table=None):
+    """Invalidate schema metadata cache.
+
+    Call after tables are created, altered or dropped. Only the cache of
+    this process is invalidated, other processes reload once expired.
+
+    Keyword Args:
+        table (str): Table name, all tables when None.
+    """
+    with _lock:
+        if table is None:
+            _cache.clear()
+        else:
+            for key in [key for key in _cache if key[1] == table]:
+                del _cache[key]
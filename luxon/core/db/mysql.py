@@ -28,7 +28,7 @@
 # WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
 import pymysql
-from pymysql.constants import COMMAND
+from pymysql.constants import COMMAND, FIELD_TYPE
 
 from luxon.core.db.base.connection import Connection as BaseConnection
 
@@ -97,13 +97,15 @@ class Connection(BaseConnection):
     CAST_MAP = cast_map
     DEST_FORMAT = 'format'
     THREADSAFETY = threadsafety
+    DATETIME_TYPES = (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP,)
 
     def __init__(self, host, username, password, database, port=3306):
         self._host = host
         self._db = database
         super().__init__(host=host, user=username, passwd=password,
                          db=database, port=port)
-        self._crsr_cls = pymysql.cursors.DictCursor
+        self._crsr_cls = pymysql.cursors.Cursor
+        self._stream_crsr_cls = pymysql.cursors.SSCursor
         self._crsr_cls_args = [self._conn]
         self.execute('SET time_zone = %s', '+00:00')
         self._crsr._uncommited = False
@@ -112,6 +114,39 @@ class Connection(BaseConnection):
     def __str__(self):
         return "MySQL Server: '%s' Database: '%s'" % (self._host, self._db,)
 
+    def _load_columns(self, table):
+        return {row['name']: row['type']
+                for row in self._fetch('SELECT COLUMN_NAME AS name,'
+                                       ' COLUMN_TYPE AS type'
+                                       ' FROM information_schema.COLUMNS'
+                                       ' WHERE TABLE_SCHEMA = DATABASE()'
+                                       ' AND TABLE_NAME = %s'
+                                       ' ORDER BY ORDINAL_POSITION',
+                                       table)}
+
+    def replication_lag(self):
+        """Seconds replica is behind its source.
+
+        Returns:
+            int: Seconds, 0 when not a replica and None when replication
+                is not running.
+        """
+        rows = self._fetch('SHOW SLAVE STATUS')
+        if not rows:
+            return 0
+        return rows[0].get('Seconds_Behind_Master')
+
+    def _columns(self, crsr):
+        # NOTE(cfrademan): Same as pymysql DictCursor, duplicate column
+        # names are prefixed with table name.
+        names = []
+        for field in crsr._result.fields:
+            name = field.name
+            if name in names:
+                name = field.table_name + '.' + name
+            names.append(name)
+        return names
+
     def ping(self):
         """Check if the server is alive.
 
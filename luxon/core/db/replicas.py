@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTI-
+# TUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUP-
+# TION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+# STRICT LIABILITY,OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY
+from threading import Lock
+from time import monotonic
+
+from luxon.core.logger import GetLogger
+from luxon.exceptions import PoolExhausted
+
+log = GetLogger(__name__)
+
+BALANCE = ('round_robin', 'least_in_use',)
+
+
+class Replica(object):
+    """Read replica endpoint.
+
+    Args:
+        name (str): Name of replica for logging. (host:port)
+        pool (Pool): Connection pool for replica.
+
+    Keyword Args:
+        weight (int): Share of reads relative to other replicas.
+    """
+    __slots__ = ('name', 'pool', 'weight', 'current', 'ejected',
+                 'lag_checked',)
+
+    def __init__(self, name, pool, weight=1):
+        if weight < 1:
+            raise ValueError("Replica '%s' weight must be 1 or more" % name)
+        self.name = name
+        self.pool = pool
+        self.weight = weight
+        # Smooth weighted round-robin counter.
+        self.current = 0
+        # Ejected until monotonic time, 0 when healthy.
+        self.ejected = 0
+        # Replication lag last checked, monotonic time.
+        self.lag_checked = None
+
+    def __repr__(self):
+        return '<Replica: %s>' % self.name
+
+
+class Replicas(object):
+    """Route database connections to write endpoint and read replicas.
+
+    Reads are balanced between replicas with weighted round-robin or the
+    least connections in use relative to weight. Replicas failing to
+    connect are ejected for 'eject' seconds and re-admitted afterwards.
+    When max_lag is set, replicas behind their source for longer are
+    ejected until the lag is checked again after 'lag_interval' seconds.
+
+    Reads use the write endpoint when no replicas are available.
+
+    Args:
+        write (Pool): Connection pool for write endpoint.
+
+    Keyword Args:
+        replicas (list): Replica objects.
+        balance (str): 'round_robin' or 'least_in_use'.
+        eject (float): Seconds failed replicas are ejected.
+        max_lag (float): Maximum replication lag seconds. (None disabled)
+        lag_interval (float): Seconds between replication lag checks.
+    """
+    __slots__ = ('_write', '_replicas', '_balance', '_eject', '_max_lag',
+                 '_lag_interval', '_lock',)
+
+    def __init__(self, write, replicas=(), balance='round_robin', eject=30,
+                 max_lag=None, lag_interval=5):
+        if balance not in BALANCE:
+            raise ValueError("Unknown replica balance '%s'" % balance)
+
+        self._write = write
+        self._replicas = list(replicas)
+        self._balance = balance
+        self._eject = eject
+        self._max_lag = max_lag
+        self._lag_interval = lag_interval
+        self._lock = Lock()
+
+    @property
+    def replicas(self):
+        return tuple(self._replicas)
+
+    @property
+    def stats(self):
+        """Replica statistics.
+
+        Returns:
+            dict: Pool stats of 'write' and each replica with 'weight' and
+                'ejected' added.
+        """
+        now = monotonic()
+        stats = {'write': self._write.stats}
+        for replica in self._replicas:
+            stats[replica.name] = replica.pool.stats
+            stats[replica.name]['weight'] = replica.weight
+            stats[replica.name]['ejected'] = replica.ejected > now
+        return stats
+
+    def write(self):
+        """Connection from write endpoint pool.
+        """
+        return self._write()
+
+    def read(self):
+        """Connection from read replica pool.
+
+        Returns connection from write endpoint pool when no replicas are
+        available.
+        """
+        tried = []
+        while True:
+            now = monotonic()
+            replica = self._select(now, tried)
+            if replica is None:
+                return self._write()
+
+            tried.append(replica)
+            try:
+                conn = replica.pool()
+            except PoolExhausted:
+                continue
+            except Exception as e:
+                self._eject_replica(replica, now + self._eject, e)
+                continue
+
+            if self._lagging(replica, conn, now):
+                conn.close()
+                continue
+
+            if replica.ejected:
+                replica.ejected = 0
+                log.info("Re-admitted read replica '%s'" % replica.name)
+
+            return conn
+
+    def _select(self, now, tried):
+        candidates = [replica for replica in self._replicas
+                      if replica.ejected <= now and replica not in tried]
+        if not candidates:
+            return None
+
+        if self._balance == 'least_in_use':
+            return min(candidates,
+                       key=lambda replica: (replica.pool.stats['in_use'] /
+                                            replica.weight))
+
+        # NOTE(cfrademan): Smooth weighted round-robin spreads reads of
+        # heavier replicas between the others instead of in bursts.
+        with self._lock:
+            total = 0
+            selected = None
+            for replica in candidates:
+                replica.current += replica.weight
+                total += replica.weight
+                if selected is None or replica.current > selected.current:
+                    selected = replica
+            selected.current -= total
+        return selected
+
+    def _eject_replica(self, replica, until, reason):
+        replica.ejected = until
+        log.warning("Ejected read replica '%s' for %.0f seconds (%s)" %
+                    (replica.name, until - monotonic(), reason,))
+
+    def _lagging(self, replica, conn, now):
+        if self._max_lag is None:
+            return False
+
+        if (replica.lag_checked is not None and
+                now - replica.lag_checked < self._lag_interval):
+            return False
+        replica.lag_checked = now
+
+        try:
+            lag = conn.replication_lag()
+        except Exception as e:
+            self._eject_replica(replica, now + self._lag_interval,
+                                'replication lag check failed: %s' % e)
+            return True
+
+        if lag is None:
+            self._eject_replica(replica, now + self._lag_interval,
+                                'replication not running')
+            return True
+
+        if lag > self._max_lag:
+            self._eject_replica(replica, now + self._lag_interval,
+                                'replication lag %s seconds' % lag)
+            return True
+
+        return False
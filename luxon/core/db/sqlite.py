@@ -27,7 +27,9 @@
 # STRICT LIABILITY,OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY
 # WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 # SUCH DAMAGE.
+import os
 import sqlite3
+import threading
 from decimal import Decimal as PyDecimal
 
 from luxon.core.db.base.connection import Connection as BaseConnection
@@ -55,7 +57,7 @@ apilevel = "2.0"
 # 1     Threads may share the module, but not connections.
 # 2     Threads may share the module and connections.
 # 3     Threads may share the module, connections and cursors.
-threadsafety = 0
+threadsafety = 1
 # Sharing in the above context means that two threads may use a resource
 # without wrapping it using a mutex semaphore to implement resource locking.
 # Note that you cannot always make external resources thread safe by managing
@@ -86,23 +88,94 @@ cast_map = (
 )
 
 
+# Allowed values of pragmas from configuration.
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off',)
+SYNCHRONOUS = ('off', 'normal', 'full', 'extra',)
+
+# Connections of thread.
+_local = threading.local()
+
+
 class Connection(BaseConnection):
+    """SQLite3 Connection.
+
+    Args:
+        db (str): Path of database file.
+
+    Keyword Args:
+        journal_mode (str): Journal mode, ie 'wal'.
+        synchronous (str): Synchronous, ie 'normal'.
+        busy_timeout (int): Milliseconds to wait for locked database.
+        cache_size (int): Page cache pages, or KiB when negative.
+        mmap_size (int): Bytes of database memory mapped.
+        statements (int): Prepared statements cached by connection.
+    """
     DB_API = sqlite3
     ERROR_MAP = error_map
     CAST_MAP = cast_map
     DEST_FORMAT = 'qmark'
     THREADSAFETY = threadsafety
+    # NOTE(cfrademan): SQLITE_MAX_VARIABLE_NUMBER defaults to 999 for
+    # versions before 3.32.0.
+    BULK_PARAMS = 999
 
-    def __init__(self, db):
-        super().__init__(db, detect_types=sqlite3.PARSE_DECLTYPES)
+    def __init__(self, db, journal_mode=None, synchronous=None,
+                 busy_timeout=None, cache_size=None, mmap_size=None,
+                 statements=128):
+        pragmas = ['foreign_keys = ON']
+        if journal_mode is not None:
+            if journal_mode.lower() not in JOURNAL_MODES:
+                raise ValueError("Invalid journal_mode '%s'" % journal_mode)
+            pragmas.append('journal_mode = %s' % journal_mode)
+        if synchronous is not None:
+            if synchronous.lower() not in SYNCHRONOUS:
+                raise ValueError("Invalid synchronous '%s'" % synchronous)
+            pragmas.append('synchronous = %s' % synchronous)
+        if busy_timeout is not None:
+            pragmas.append('busy_timeout = %d' % int(busy_timeout))
+        if cache_size is not None:
+            pragmas.append('cache_size = %d' % int(cache_size))
+        if mmap_size is not None:
+            pragmas.append('mmap_size = %d' % int(mmap_size))
+
+        super().__init__(db, detect_types=sqlite3.PARSE_DECLTYPES,
+                         cached_statements=int(statements))
         self._crsr_cls = getattr(self._conn, 'cursor')
         self._db = db
-        self._conn.row_factory = sqlite3.Row
-        self.execute('PRAGMA foreign_keys = ON;')
+        # Persistent connections of thread, refer to thread_connect.
+        self._persistent = False
+        self._users = 0
+
+        for pragma in pragmas:
+            self.execute('PRAGMA %s;' % pragma)
+        self._crsr._uncommited = False
 
     def __str__(self):
         return "SQLite3 Database '%s'" % self._db
 
+    def _load_columns(self, table):
+        return {row['name']: row['type']
+                for row in self._fetch('PRAGMA table_info(`%s`)' % table)}
+
+    def close(self):
+        """Close the connection
+
+        Persistent connections of thread are only cleaned up once closed
+        by all users, and remain open for reuse.
+
+        Reference PEP-0249
+        """
+        if not self._persistent:
+            return super().close()
+
+        if self.defer(self.close):
+            return
+
+        self._users -= 1
+        if self._users <= 0:
+            self._users = 0
+            self.clean_up()
+
 
 def connect(*args, **kwargs):
     """Constructor for creating a connection to the database.
@@ -113,3 +186,36 @@ def connect(*args, **kwargs):
     database dependent.
     """
     return Connection(*args, **kwargs)
+
+
+def thread_connect(db, **kwargs):
+    """Persistent connection to database for current thread.
+
+    Each thread has its own connection to the database, opened once and
+    reused. Closing the connection returns it for reuse by the thread,
+    uncommited transactions are rolled back once closed by all users.
+
+    Args:
+        db (str): Path of database file.
+
+    Keyword Args:
+        kwargs: Refer to Connection.
+
+    Returns:
+        Connection object.
+    """
+    pid = os.getpid()
+    if getattr(_local, 'pid', None) != pid:
+        # NOTE(cfrademan): Connections are not shared with forked
+        # processes.
+        _local.pid = pid
+        _local.conns = {}
+
+    try:
+        conn = _local.conns[db]
+    except KeyError:
+        conn = _local.conns[db] = Connection(db, **kwargs)
+        conn._persistent = True
+
+    conn._users += 1
+    return conn
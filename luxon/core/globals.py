@@ -28,6 +28,8 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 
+from contextvars import ContextVar
+
 from luxon.exceptions import NoContextError
 from luxon.structs.threaddict import ThreadDict
 
@@ -38,8 +40,15 @@ _thread_items = ('current_request', )
 _context_items = ('current_request',
                   'app', )
 
+# NOTE(cfrademan): Request scoped items are stored in context variables.
+# Each thread and each asyncio task has its own context, WSGI threads and
+# ASGI tasks see their own request.
+_context_vars = {item: ContextVar(item) for item in _thread_items}
+
 _globals = {}
 
+_unset = object()
+
 
 class Globals(object):
     """Global object
@@ -48,7 +57,8 @@ class Globals(object):
 
     Purpose:
         * Placeholder for context related references.
-        * Ensures relevant references to objects are based on thread.
+        * Ensures relevant references to objects are based on thread or
+          asyncio task context.
         * Provides globals such as configuration on demand.
     """
     __slots__ = ('__dict__',)
@@ -56,16 +66,32 @@ class Globals(object):
     def __init__(self):
         self.__dict__ = _globals
 
+    def __setattr__(self, attr, value):
+        try:
+            _context_vars[attr].set(value)
+        except KeyError:
+            _globals[attr] = value
+
     def __delattr__(self, attr):
         try:
-            del _thread_globals[attr]
+            _context_vars[attr].set(_unset)
         except KeyError:
             try:
-                del _globals[attr]
+                del _thread_globals[attr]
             except KeyError:
-                pass
+                try:
+                    del _globals[attr]
+                except KeyError:
+                    pass
 
     def __getattr__(self, attr):
+        try:
+            value = _context_vars[attr].get(_unset)
+            if value is not _unset:
+                return value
+        except KeyError:
+            pass
+
         try:
             return _thread_globals[attr]
         except KeyError:
@@ -82,8 +108,10 @@ class Globals(object):
                                      attr + "'") from None
 
     def __contains__(self, attr):
-        return attr in _thread_globals or attr in _globals or hasattr(self,
-                                                                      attr)
+        if attr in _context_vars:
+            return _context_vars[attr].get(_unset) is not _unset
+        return (attr in _thread_globals or attr in _globals or
+                hasattr(self, attr))
 
 
 # All globals.... luxon.g = Application wide context.
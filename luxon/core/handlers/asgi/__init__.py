@@ -0,0 +1 @@
+from luxon.core.handlers.asgi.application import Application as Asgi
@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Christiaan Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import sys
+import asyncio
+import traceback
+import contextvars
+from timeit import default_timer
+from inspect import iscoroutinefunction
+from tempfile import SpooledTemporaryFile
+from concurrent.futures import ThreadPoolExecutor
+
+from luxon.core.logger import GetLogger
+from luxon.core.metrics import registry
+from luxon.core.handlers.wsgi.application import Application as Wsgi
+from luxon.core.handlers.wsgi.form import SPOOL_SIZE
+from luxon.core.handlers.asgi.websocket import WebSocket
+from luxon.exceptions import NotFoundError, AccessDeniedError
+from luxon.utils.encoding import if_unicode_to_bytes
+from luxon.utils.timer import Timer
+from luxon.constants import WEBSOCKET
+
+log = GetLogger(__name__)
+
+# End of response body iterator.
+_done = object()
+
+
+def environ(scope, body=None):
+    """WSGI environ for ASGI connection scope.
+
+    Request objects are shared with WSGI and read the connection
+    information from the environ.
+
+    Args:
+        scope (dict): ASGI connection scope.
+
+    Keyword Args:
+        body (file): File like object containing request body.
+
+    Returns:
+        dict: WSGI environ.
+    """
+    server = scope.get('server') or ('localhost', 80,)
+    client = scope.get('client') or ('', 0,)
+    scheme = scope.get('scheme', 'http')
+    if scheme == 'ws':
+        scheme = 'http'
+    elif scheme == 'wss':
+        scheme = 'https'
+
+    if scope['type'] == 'websocket':
+        method = WEBSOCKET
+    else:
+        method = scope['method']
+
+    env = {'REQUEST_METHOD': method,
+           'SCRIPT_NAME': scope.get('root_path', ''),
+           # NOTE(cfrademan): PEP 3333 PATH_INFO is bytes tunneled as
+           # latin-1.
+           'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+           'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+           'SERVER_NAME': str(server[0]),
+           'SERVER_PORT': str(server[1]),
+           'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+           'REMOTE_ADDR': str(client[0]),
+           'REMOTE_PORT': str(client[1]),
+           'wsgi.version': (1, 0,),
+           'wsgi.url_scheme': scheme,
+           'wsgi.input': body,
+           'wsgi.errors': sys.stderr,
+           'wsgi.multithread': True,
+           'wsgi.multiprocess': False,
+           'wsgi.run_once': False,
+           'asgi.scope': scope}
+
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            env['CONTENT_TYPE'] = value
+            continue
+        elif name == 'CONTENT_LENGTH':
+            continue
+
+        name = 'HTTP_' + name
+        if name in env:
+            # Duplicate headers are joined as one.
+            if name == 'HTTP_COOKIE':
+                value = env[name] + '; ' + value
+            else:
+                value = env[name] + ',' + value
+        env[name] = value
+
+    if body is not None:
+        # NOTE(cfrademan): Body is buffered, length is always known.
+        env['CONTENT_LENGTH'] = str(body.tell())
+        body.seek(0)
+
+    return env
+
+
+class Application(Wsgi):
+    """This class is part of the main entry point into the application.
+
+    Each instance provides a callable interface for ASGI connections.
+
+    Routes, middleware, policy and error handling are shared with the WSGI
+    application. Resources defined with 'async def' are awaited on the
+    event loop. Plain resources and middleware run on a thread pool.
+
+    Args:
+        name (str): Unique Name for application. Use __name__ of module to
+            ensure root path for application can be found conveniantly.
+
+    Keyword Arguments:
+        app_root (str): Path to application root. (e.g. The location of
+            'settings.ini', 'policy.json' and overiding 'templates')
+        max_workers (int): Threads for plain resources and middleware.
+
+    The request for the current connection is available as
+    'g.current_request' in each asyncio task and the threads it uses.
+
+    Responses with a body returning an asynchronous iterator are streamed
+    from the event loop.
+
+    .. code:: python
+
+        @register.resource('GET', '/v1/events')
+        async def events(req, resp):
+            async def stream():
+                while True:
+                    yield await next_event()
+
+            return stream()
+    """
+    def __init__(self, name, path=None, ini=None, content_type=None,
+                 max_workers=None):
+        super().__init__(name, path, ini, content_type)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _sync(self, func, *args):
+        """Run function on thread pool within current context.
+
+        Must be called from a coroutine running on the event loop.
+
+        Returns:
+            Future for value returned by function.
+        """
+        context = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self._executor,
+                                                          context.run,
+                                                          func,
+                                                          *args)
+
+    async def __call__(self, scope, receive, send):
+        """Application Connection Interface.
+        """
+        if scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        elif scope['type'] == 'websocket':
+            await self.websocket(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.lifespan(scope, receive, send)
+        else:
+            raise ValueError("Unsupported ASGI scope type '%s'" %
+                             scope['type'])
+
+    async def lifespan(self, scope, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def body(self, receive):
+        """Buffer request body.
+
+        Bodies larger than the form spool size are written to a temporary
+        file.
+
+        Returns:
+            file: File like object positioned at end of body. None when
+                client disconnected.
+        """
+        body = SpooledTemporaryFile(SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            chunk = message.get('body')
+            if chunk:
+                body.write(chunk)
+            if not message.get('more_body', False):
+                return body
+
+    async def view(self, request, response, resource, r_kwargs, cache,
+                   cache_ref):
+        """Run resource for request.
+
+        Coroutine resources are awaited, other resources run on the thread
+        pool.
+
+        Returns:
+            bool: True if response is from or stored in server-side cache.
+        """
+        if not iscoroutinefunction(resource):
+            return await self._sync(super().view, request, response,
+                                    resource, r_kwargs, cache, cache_ref)
+
+        # ETag set by server-side cache.
+        cached = False
+
+        # Execute Routed View.
+        try:
+            if request.middleware[1]:
+                await self._sync(self.resource_middleware, request,
+                                 response)
+            # Run View method.
+            if cache_ref and await self._sync(self.cache_load, request,
+                                              cache_ref):
+                # Served from server-side cache.
+                cached = True
+            else:
+                view = await resource(request, response, **r_kwargs)
+                cached = self.respond(request,
+                                      response,
+                                      view,
+                                      cache,
+                                      cache_ref)
+        finally:
+            # Process the middleware 'post' at the end
+            if request.middleware[2]:
+                await self._sync(self.post_middleware, request, response,
+                                 False)
+
+        return cached
+
+    async def http(self, scope, receive, send):
+        start = default_timer()
+        body = await self.body(receive)
+        if body is None:
+            return
+
+        started = []
+
+        def start_response(status, headers):
+            started.append(int(status.split(' ', 1)[0]))
+            started.append(headers)
+
+        request = response = None
+        try:
+            with Timer() as elapsed:
+                request, response = self.setup(environ(scope, body),
+                                               start_response)
+
+                resource, r_kwargs, cache, cache_ref = await self._sync(
+                    self.route, request, response)
+
+                cached = await self.view(request, response, resource,
+                                         r_kwargs, cache, cache_ref)
+
+            self.cache_headers(request, response, cache, cached)
+
+        except Exception as exception:
+            if response is None:
+                body.close()
+                raise
+            trace = str(traceback.format_exc())
+            await self._sync(self.error, request, response, exception,
+                             trace)
+        finally:
+            # Completed Request
+            log.info('Completed Request',
+                     timer=elapsed())
+
+        try:
+            await self.send(request, response, start_response, started,
+                            send)
+        finally:
+            body.close()
+            if registry.enabled:
+                self.observe(request, response, default_timer() - start)
+
+    async def send(self, request, response, start_response, started, send):
+        """Send response.
+        """
+        stream = response._stream
+
+        if hasattr(stream, '__aiter__') or isinstance(stream, (bytes,
+                                                               type(None),)):
+            iterable = response()
+        else:
+            # File like and iterable bodies block and may be compressed.
+            iterable = await self._sync(response)
+
+        status, headers = started
+        await send({'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(name.encode('latin-1'),
+                                 value.encode('latin-1'),)
+                                for name, value in headers]})
+
+        if (request.method == 'HEAD' or
+                status in response._BODILESS_STATUS_CODES):
+            await send({'type': 'http.response.body'})
+            response.close()
+            return
+
+        try:
+            if hasattr(stream, '__aiter__'):
+                async for chunk in stream:
+                    if chunk:
+                        await send({'type': 'http.response.body',
+                                    'body': if_unicode_to_bytes(chunk),
+                                    'more_body': True})
+            elif isinstance(stream, (bytes, type(None),)):
+                for chunk in iterable:
+                    if chunk:
+                        await send({'type': 'http.response.body',
+                                    'body': chunk,
+                                    'more_body': True})
+            else:
+                iterator = iter(iterable)
+                while True:
+                    chunk = await self._sync(next, iterator, _done)
+                    if chunk is _done:
+                        break
+                    if chunk:
+                        await send({'type': 'http.response.body',
+                                    'body': chunk,
+                                    'more_body': True})
+        except Exception:
+            # NOTE(cfrademan): Response already started, status can not be
+            # changed anymore.
+            log.critical('%s' % traceback.format_exc())
+        finally:
+            response.close()
+
+        await send({'type': 'http.response.body'})
+
+    async def websocket(self, scope, receive, send):
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        ws = WebSocket(receive, send)
+
+        request = response = None
+        try:
+            with Timer() as elapsed:
+                request, response = self.setup(environ(scope),
+                                               lambda *args: None)
+
+                resource, r_kwargs, cache, cache_ref = await self._sync(
+                    self.route, request, response)
+
+                if resource is None:
+                    raise NotFoundError("Route not found" +
+                                        " WebSocket '%s'" % request.route)
+
+                try:
+                    if request.middleware[1]:
+                        await self._sync(self.resource_middleware, request,
+                                         response)
+
+                    await resource(request, ws, **r_kwargs)
+                finally:
+                    if request.middleware[2]:
+                        await self._sync(self.post_middleware, request,
+                                         response, False)
+
+            await ws.close()
+
+        except Exception as exception:
+            if isinstance(exception, (AccessDeniedError, NotFoundError,)):
+                log.warning('%s' % exception)
+                # Policy Violation.
+                code = 1008
+            else:
+                log.critical('%s' % traceback.format_exc())
+                # Internal Error.
+                code = 1011
+
+            # NOTE(cfrademan): Closing before accepted rejects handshake.
+            await ws.close(code)
+        finally:
+            log.info('Completed WebSocket',
+                     timer=elapsed())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Christiaan Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+from luxon.utils import js
+
+# Connection states.
+CONNECTING = 0
+CONNECTED = 1
+CLOSED = 2
+
+
+class WebSocket(object):
+    """WebSocket connection for ASGI WebSocket routes.
+
+    Provided to WebSocket resources registered with
+    'register.websocket' along with the Request object.
+
+    Args:
+        receive (coroutine function): ASGI receive callable.
+        send (coroutine function): ASGI send callable.
+
+    Messages are received as 'str' or 'bytes' and iterating the WebSocket
+    yields messages until the client disconnects.
+
+    .. code:: python
+
+        @register.websocket('/v1/echo')
+        async def echo(req, ws):
+            await ws.accept()
+            async for message in ws:
+                await ws.send(message)
+    """
+    __slots__ = ('_receive', '_send', 'state', 'close_code')
+
+    def __init__(self, receive, send):
+        self._receive = receive
+        self._send = send
+        self.state = CONNECTING
+        self.close_code = None
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.state)
+
+    async def accept(self, subprotocol=None, headers=None):
+        """Accept WebSocket connection.
+
+        Keyword Args:
+            subprotocol (str): Selected subprotocol.
+            headers (list): List of (name, value,) tuples of additional
+                headers for handshake response.
+        """
+        if self.state != CONNECTING:
+            raise RuntimeError('WebSocket already accepted or closed')
+
+        message = {'type': 'websocket.accept',
+                   'subprotocol': subprotocol}
+        if headers:
+            message['headers'] = [(name.lower().encode('latin-1'),
+                                   value.encode('latin-1'),)
+                                  for name, value in headers]
+
+        await self._send(message)
+        self.state = CONNECTED
+
+    async def receive(self):
+        """Receive message.
+
+        Returns:
+            Message as 'str' or 'bytes'. None once client disconnected.
+        """
+        if self.state == CLOSED:
+            return None
+
+        message = await self._receive()
+
+        if message['type'] == 'websocket.disconnect':
+            self.state = CLOSED
+            self.close_code = message.get('code', 1000)
+            return None
+
+        text = message.get('text')
+        if text is not None:
+            return text
+
+        return message.get('bytes')
+
+    async def receive_json(self):
+        """Receive JSON message.
+
+        Returns:
+            Decoded JSON message. None once client disconnected.
+        """
+        message = await self.receive()
+        if message is None:
+            return None
+
+        return js.loads(message)
+
+    async def send(self, data):
+        """Send message.
+
+        Args:
+            data (str/bytes/dict/list): 'str' is sent as text message,
+                'bytes' as binary message. 'dict' and 'list' are sent as
+                JSON text message.
+        """
+        if self.state != CONNECTED:
+            raise RuntimeError('WebSocket not connected')
+
+        if isinstance(data, (bytes, bytearray,)):
+            await self._send({'type': 'websocket.send',
+                              'bytes': bytes(data)})
+        else:
+            if isinstance(data, (dict, list,)):
+                data = js.dumps(data)
+            await self._send({'type': 'websocket.send',
+                              'text': data})
+
+    async def close(self, code=1000):
+        """Close WebSocket connection.
+
+        Closing connection not yet accepted rejects the handshake.
+
+        Keyword Args:
+            code (int): WebSocket close code.
+        """
+        if self.state == CLOSED:
+            return
+
+        await self._send({'type': 'websocket.close',
+                          'code': code})
+        self.state = CLOSED
+        self.close_code = code
+
+    def __aiter__(self):
+        return self._messages()
+
+    async def _messages(self):
+        while True:
+            message = await self.receive()
+            if message is None:
+                break
+            yield message
@@ -97,7 +97,8 @@ class RequestBase(object):
     def credentials(self):
         if self._cached_auth is None:
             expire = g.app.config.getint('tokens', 'expire', fallback=3600)
-            self._cached_auth = Auth(expire=expire)
+            self._cached_auth = Auth(expire=expire,
+                                     on_change=self._credentials_changed)
             if self.unscoped_token:
                 try:
                     if self.scoped_token:
@@ -129,6 +130,12 @@ class RequestBase(object):
     def context_tenant_id(self):
         return None
 
+    def _credentials_changed(self):
+        # NOTE(cfrademan): Rule results are memoized for the request and
+        # depend on credentials, such as after login within the request.
+        if self._cached_policy is not None:
+            self._cached_policy.clear()
+
     @property
     def policy(self):
         if self._cached_policy is None:
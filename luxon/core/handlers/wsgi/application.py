@@ -28,6 +28,7 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 import traceback
+from timeit import default_timer
 
 from luxon import g, router
 from luxon.core.app import App
@@ -44,10 +45,28 @@ from luxon.constants import TEXT_HTML, TEXT_PLAIN
 from luxon.utils.objects import object_name
 from luxon.utils.timer import Timer
 from luxon.utils.http import etagger
+from luxon.utils.hashing import md5sum
+from luxon.core.cache import Cache
 from luxon.core import register
+from luxon.core.router import retype
+from luxon.core.metrics import (registry, metrics, region_path,
+                                DURATION_BUCKETS, SIZE_BUCKETS)
 
 log = GetLogger(__name__)
 
+_REQUEST_DURATION = registry.histogram(
+    'luxon_http_request_duration_seconds',
+    'Seconds processing request.',
+    DURATION_BUCKETS)
+_REQUEST_SIZE = registry.histogram(
+    'luxon_http_request_size_bytes',
+    'Request body size.',
+    SIZE_BUCKETS)
+_RESPONSE_SIZE = registry.histogram(
+    'luxon_http_response_size_bytes',
+    'Response body size, streamed bodies not included.',
+    SIZE_BUCKETS)
+
 
 class Application(object):
     """This class is part of the main entry point into the application.
@@ -61,16 +80,82 @@ class Application(object):
     Keyword Arguments:
         app_root (str): Path to application root. (e.g. The location of
             'settings.ini', 'policy.json' and overiding 'templates')
+
+    JSON response bodies are indented by default. Compact output or compact
+    output encoded in chunks while the response is sent can be selected in
+    'settings.ini'. Streamed bodies are not stored in the server-side cache.
+
+        .. code::
+
+            [application]
+            json_encoder = stream
+
+    Server-side caching of GET responses for routes registered with 'cache'
+    can be enabled in 'settings.ini'. Responses are stored using the
+    configured cache backend and served before the resource is invoked.
+
+        .. code::
+
+            [cache]
+            responses = true
     """
+    # Request headers that uniquely identify a cached response.
+    _CACHE_VARY = ('Cookie',
+                   'Accept-Encoding',
+                   'Content-Type',
+                   'X-Auth-Token',
+                   'X-Domain',
+                   'X-Tenant-Id',
+                   'X-Region',)
+
     def __init__(self, name, path=None, ini=None, content_type=None):
         try:
             # Initilize Application
             app = App(name, path, ini)
 
+            # Server-side response cache.
+            if app.config.getboolean('cache', 'responses', fallback=False):
+                self._cache = Cache()
+            else:
+                self._cache = None
+
             # Set Default Content Type
             if content_type is not None:
                 Response._DEFAULT_CONTENT_TYPE = content_type
 
+            # JSON Encoder for dict and list response bodies.
+            json_encoder = app.config.get('application', 'json_encoder',
+                                          fallback='pretty')
+            if json_encoder not in ('pretty', 'compact', 'stream',):
+                raise ValueError("Invalid 'json_encoder' %s" % json_encoder)
+            Response._JSON_ENCODER = json_encoder
+
+            # Form parsing limits.
+            Request._FORM_MAX_SIZE = app.config.getint('form', 'max_size',
+                                                       fallback=0)
+            Request._FORM_MAX_PARTS = app.config.getint('form', 'max_parts',
+                                                        fallback=1000)
+            Request._FORM_SPOOL_SIZE = app.config.getint(
+                'form', 'spool_size', fallback=1024 * 1024)
+
+            # Request and process metrics shared by all workers.
+            if app.config.getboolean('metrics', 'enabled', fallback=False):
+                # NOTE(cfrademan): Named region shared with workers loading
+                # the application after forking.
+                path = app.config.get('metrics', 'path', fallback=None)
+                registry.setup(
+                    cells=app.config.getint('metrics', 'cells',
+                                            fallback=4096),
+                    workers=app.config.getint('metrics', 'workers',
+                                              fallback=0),
+                    path=path or region_path(app.path))
+                route = app.config.get('metrics', 'route',
+                                       fallback='/metrics')
+                if route:
+                    router.add('GET', route, metrics,
+                               tag=app.config.get('metrics', 'tag',
+                                                  fallback=None))
+
             # Started Application
             log.info('Started Application'
                      ' %s' % app.name +
@@ -81,11 +166,341 @@ class Application(object):
             log.critical("%s" % trace)
             raise
 
+    def cache_reference(self, request):
+        """Reference for cached response of request.
+
+        Built from the method, route, query string and the values of
+        request headers the response varies on.
+        """
+        ref = [request.method,
+               request.host,
+               request.app,
+               request.route,
+               request.query_string or '']
+
+        for header in self._CACHE_VARY:
+            ref.append(request.get_header(header, default=''))
+
+        return 'response:' + md5sum('\n'.join(ref))
+
+    def cache_load(self, request, reference):
+        """Load cached response into response object.
+
+        Returns:
+            bool: True if cached response was found.
+        """
+        cached = self._cache.load(reference)
+        if cached is None:
+            return False
+
+        status, headers, content_type, body, etag = cached
+        response = request.response
+        response.set_headers(headers)
+        response.content_type = content_type
+        response.body(body)
+        response.status = status
+        if etag:
+            response.etag.set(etag)
+
+        return True
+
+    def cache_store(self, request, reference, expire):
+        """Store response for request in cache and set ETag.
+
+        Only complete 'bytes' bodies with a 200 status are stored. Responses
+        setting cookies are never stored.
+        """
+        response = request.response
+        # NOTE(cfrademan): Needed Encoding for Different Etag.
+        encoding = request.get_header('Accept-Encoding')
+        etag = etagger(response._stream, encoding)
+
+        if (response.status == 200 and
+                response._cookies is None):
+            headers = [(header, value, )
+                       for header, value in response._headers.items()
+                       if header not in ('Etag', 'Content-Length',)]
+            self._cache.store(reference,
+                              (response.status,
+                               headers,
+                               response.content_type,
+                               response._stream,
+                               etag,),
+                              expire)
+
+        response.etag.set(etag)
+
     def post_middleware(self, request, response, error):
         # Process the middleware 'post' at the end
-        for middleware in reversed(register._middleware_post):
+        for middleware in reversed(request.middleware[2]):
             middleware(request, response, error)
 
+    def setup(self, *args, **kwargs):
+        """Request and Response objects for request.
+
+        Sets the request for the current context as 'g.current_request'.
+
+        Returns:
+            tuple: (request, response)
+        """
+        # Request Object.
+        request = g.current_request = Request(*args,
+                                              **kwargs)
+        request.env['SCRIPT_NAME'] = g.app.config.get(
+            'application',
+            'script',
+            fallback=request.env['SCRIPT_NAME'])
+
+        script_name = request.get_header('X-Script-Name')
+        if script_name:
+            request.env['SCRIPT_NAME'] = script_name
+
+        # Response Object.
+        response = Response(*args,
+                            **kwargs)
+
+        # Set Response object for request.
+        request.response = response
+
+        # Middleware chain before routing.
+        request.middleware = router.chain()
+
+        # Debug output
+        if g.app.debug is True:
+            log.info('Request %s' % request.route +
+                     ' Method %s\n' % request.method)
+
+        return (request, response,)
+
+    def route(self, request, response):
+        """Route request.
+
+        Processes the middleware 'pre' methods, finds the route, processes
+        the route scoped middleware 'pre' methods and validates the route
+        tag with policy.
+
+        Returns:
+            tuple: (resource, route kwargs, cache, cache reference)
+        """
+        # Process the middleware 'pre' method before routing it
+        for middleware in register._middleware_pre:
+            middleware(request, response)
+
+        # Route Object.
+        resource, method, r_kwargs, target, tag, cache = router.find(
+            request.method,
+            request.route)
+
+        # Middleware chain for route.
+        request.middleware = router.chain(method, target)
+        request.route_template = target
+
+        # Route Kwargs in requests.
+        request.route_kwargs = r_kwargs
+
+        # Set route tag in requests.
+        request.tag = tag
+
+        # JSON sanitization policy for route.
+        trusted = getattr(resource, 'json_trusted', None)
+        if trusted is not None:
+            request.json_trusted = trusted
+
+        # Process the route scoped middleware 'pre' method
+        for middleware in request.middleware[0]:
+            middleware(request, response)
+
+        # If route tagged validate with policy
+        if tag is not None:
+            if not request.policy.validate(tag,
+                                           access_denied_raise=True):
+                raise AccessDeniedError("Access Denied by" +
+                                        " policy '%s'" % tag)
+
+        # Server-side response cache reference.
+        if (self._cache is not None and
+                cache > 0 and request.method == 'GET'):
+            cache_ref = self.cache_reference(request)
+        else:
+            cache_ref = None
+
+        return (resource, r_kwargs, cache, cache_ref,)
+
+    def resource_middleware(self, request, response):
+        # Process the middleware 'resource' after routing it
+        for middleware in request.middleware[1]:
+            middleware(request, response)
+
+    def respond(self, request, response, view, cache, cache_ref):
+        """Set value returned by resource as response body.
+
+        Returns:
+            bool: True if response is stored in server-side cache.
+        """
+        if view is not None:
+            response.body(view)
+        if cache_ref and isinstance(response._stream, bytes):
+            self.cache_store(request, cache_ref, cache)
+            return True
+
+        return False
+
+    def view(self, request, response, resource, r_kwargs, cache, cache_ref):
+        """Run resource for request.
+
+        Processes the middleware 'resource' methods before the resource and
+        the middleware 'post' methods after.
+
+        Returns:
+            bool: True if response is from or stored in server-side cache.
+        """
+        # ETag set by server-side cache.
+        cached = False
+
+        # Execute Routed View.
+        try:
+            self.resource_middleware(request, response)
+            # Run View method.
+            if cache_ref and self.cache_load(request, cache_ref):
+                # Served from server-side cache.
+                cached = True
+            elif resource is not None:
+                cached = self.respond(request,
+                                      response,
+                                      resource(request,
+                                               response,
+                                               **r_kwargs),
+                                      cache,
+                                      cache_ref)
+            else:
+                raise NotFoundError("Route not found" +
+                                    " Method '%s'" % request.method +
+                                    " Route '%s'" % request.route)
+        finally:
+            # Process the middleware 'post' at the end
+            self.post_middleware(request, response, False)
+
+        return cached
+
+    def cache_headers(self, request, response, cache, cached):
+        """Set Cache-Control, Vary and ETag headers for response.
+
+        Responds with 304 Not Modified when the client cache is valid.
+        """
+        # Cache GET Response.
+        # Only cache for GET responses!
+        if cache > 0 and request.method == 'GET':
+            # Get session_id if any for Caching
+            session_id = request.cookies.get(request.host)
+
+            # NOTE(cfrademan): Instruct to use cache but revalidate on,
+            # stale cache entry. Expire remote cache in same duration
+            # as internal cache.
+            if session_id:
+                response.set_header(
+                    "cache-control",
+                    "must-revalidate, private, max-age=" + str(cache)
+                )
+            else:
+                response.set_header(
+                    "cache-control",
+                    "must-revalidate, max-age=" + str(cache)
+                )
+
+            # Set Vary Header
+            # NOTE(cfrademan): Client should uniquely cache
+            # based these request headers.
+            response.set_header('Vary',
+                                'Cookie, Accept-Encoding' +
+                                ', Content-Type')
+
+            # Set Etag
+            # NOTE(cfrademan): Needed Encoding for Different Etag.
+            if not cached and isinstance(response._stream, bytes):
+                encoding = request.get_header('Accept-Encoding')
+                response.etag.set(etagger(response._stream, encoding))
+
+            # If Etag matches do not return full body use
+            # external/user-agent cache.
+            if (len(request.if_none_match) > 0 and
+                    request.if_none_match in response.etag):
+                # Etag matches do not return full body.
+                response.not_modified()
+
+            # NOTE(cfrademan): Use last_modified as last resort for
+            # external/user-agent cache.
+            elif (request.if_modified_since and
+                  response.last_modified and
+                  request.if_modified_since <= response.last_modified):
+                # Last-Modified matches do not return full body.
+                response.not_modified()
+        else:
+            response.set_header("cache-control",
+                                "no-store, no-cache, max-age=0")
+
+    def observe(self, request, response, elapsed):
+        """Record request metrics.
+
+        Routes are recorded as registered, requests not routed are
+        recorded with an empty route.
+
+        Args:
+            request (obj): Request object.
+            response (obj): Response object.
+            elapsed (float): Seconds processing request.
+        """
+        method = request.method
+        route = request.route_template
+        if route is None:
+            route = ''
+        elif isinstance(route, retype):
+            route = route.pattern
+        else:
+            route = '/' + route
+        status = response.status
+
+        _REQUEST_DURATION.observe(elapsed,
+                                  method=method,
+                                  route=route,
+                                  status=status)
+
+        try:
+            size = request.content_length
+        except HTTPError:
+            # Invalid Content-Length header.
+            size = 0
+        if size:
+            _REQUEST_SIZE.observe(size,
+                                  method=method,
+                                  route=route)
+
+        size = response.content_length
+        if size is not None:
+            _RESPONSE_SIZE.observe(int(size),
+                                   method=method,
+                                   route=route,
+                                   status=status)
+
+    def error(self, request, response, exception, trace=None):
+        """Handle exception raised while processing request.
+
+        Args:
+            request (obj): Request object.
+            response (obj): Response object.
+            exception (Exception): Exception raised.
+
+        Keyword Args:
+            trace (str): Formatted traceback, defaults to exception being
+                handled.
+        """
+        if trace is None:
+            trace = str(traceback.format_exc())
+        self.handle_error(request,
+                          response,
+                          exception,
+                          trace)
+        self.post_middleware(request, response, True)
+
     def __call__(self, *args, **kwargs):
         """Application Request Interface.
 
@@ -96,153 +511,33 @@ class Application(object):
 
         Response object is returned.
         """
+        start = default_timer()
+        request = response = None
         try:
             with Timer() as elapsed:
-                # Request Object.
-                request = g.current_request = Request(*args,
-                                                      **kwargs)
-                request.env['SCRIPT_NAME'] = g.app.config.get(
-                    'application',
-                    'script',
-                    fallback=request.env['SCRIPT_NAME'])
-
-                script_name = request.get_header('X-Script-Name')
-                if script_name:
-                    request.env['SCRIPT_NAME'] = script_name
-
-                # Response Object.
-                response = Response(*args,
-                                    **kwargs)
-
-                # Set Response object for request.
-                request.response = response
-
-                # Debug output
-                if g.app.debug is True:
-                    log.info('Request %s' % request.route +
-                             ' Method %s\n' % request.method)
-
-                # Process the middleware 'pre' method before routing it
-                for middleware in register._middleware_pre:
-                    middleware(request, response)
-
-                # Route Object.
-                resource, method, r_kwargs, target, tag, cache = router.find(
-                    request.method,
-                    request.route)
-
-                # Route Kwargs in requests.
-                request.route_kwargs = r_kwargs
-
-                # Set route tag in requests.
-                request.tag = tag
-
-                # If route tagged validate with policy
-                if tag is not None:
-                    if not request.policy.validate(tag,
-                                                   access_denied_raise=True):
-                        raise AccessDeniedError("Access Denied by" +
-                                                " policy '%s'" % tag)
-
-                # Execute Routed View.
-                try:
-                    # Process the middleware 'resource' after routing it
-                    for middleware in register._middleware_resource:
-                        middleware(request, response)
-                    # Run View method.
-                    if resource is not None:
-                        view = resource(request,
-                                        response,
-                                        **r_kwargs)
-                        if view is not None:
-                            response.body(view)
-                    else:
-                        raise NotFoundError("Route not found" +
-                                            " Method '%s'" % request.method +
-                                            " Route '%s'" % request.route)
-                finally:
-                    # Process the middleware 'post' at the end
-                    self.post_middleware(request, response, False)
-
-            # Cache GET Response.
-            # Only cache for GET responses!
-            if cache > 0 and request.method == 'GET':
-                # Get session_id if any for Caching
-                session_id = request.cookies.get(request.host)
-
-                # NOTE(cfrademan): Instruct to use cache but revalidate on,
-                # stale cache entry. Expire remote cache in same duration
-                # as internal cache.
-                if session_id:
-                    response.set_header(
-                        "cache-control",
-                        "must-revalidate, private, max-age=" + str(cache)
-                    )
-                else:
-                    response.set_header(
-                        "cache-control",
-                        "must-revalidate, max-age=" + str(cache)
-                    )
-
-                # Set Vary Header
-                # NOTE(cfrademan): Client should uniquely cache
-                # based these request headers.
-                response.set_header('Vary',
-                                    'Cookie, Accept-Encoding' +
-                                    ', Content-Type')
-
-                # Set Etag
-                # NOTE(cfrademan): Needed Encoding for Different Etag.
-                if isinstance(response._stream, bytes):
-                    encoding = request.get_header('Accept-Encoding')
-                    response.etag.set(etagger(response._stream, encoding))
-
-                # If Etag matches do not return full body use
-                # external/user-agent cache.
-                if (len(request.if_none_match) > 0 and
-                        request.if_none_match in response.etag):
-                    # Etag matches do not return full body.
-                    response.not_modified()
-
-                # NOTE(cfrademan): Use last_modified as last resort for
-                # external/user-agent cache.
-                elif (request.if_modified_since and
-                      response.last_modified and
-                      request.if_modified_since <= response.last_modified):
-                    # Last-Modified matches do not return full body.
-                    response.not_modified()
-            else:
-                response.set_header("cache-control",
-                                    "no-store, no-cache, max-age=0")
+                request, response = self.setup(*args, **kwargs)
 
-            # Return response object.
-            return response()
+                resource, r_kwargs, cache, cache_ref = self.route(request,
+                                                                  response)
+
+                cached = self.view(request, response, resource, r_kwargs,
+                                   cache, cache_ref)
+
+            self.cache_headers(request, response, cache, cached)
 
-        except HTTPError as exception:
-            trace = str(traceback.format_exc())
-            self.handle_error(request, response, exception, trace)
-            self.post_middleware(request, response, True)
-            # Return response object.
-            return response()
-        except Error as exception:
-            trace = str(traceback.format_exc())
-            self.handle_error(request, response, exception, trace)
-            self.post_middleware(request, response, True)
             # Return response object.
             return response()
+
         except Exception as exception:
-            trace = str(traceback.format_exc())
-            self.handle_error(request,
-                              response,
-                              exception,
-                              trace)
-            self.post_middleware(request, response, True)
+            self.error(request, response, exception)
             # Return response object.
             return response()
         finally:
             # Completed Request
             log.info('Completed Request',
                      timer=elapsed())
+            if registry.enabled and response is not None:
+                self.observe(request, response, default_timer() - start)
 
     def handle_error(self, req, resp, exception, trace):
         # Parse Exceptions.
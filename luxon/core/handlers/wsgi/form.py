@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import re
+from tempfile import SpooledTemporaryFile
+from urllib.parse import unquote, unquote_plus
+
+from luxon.exceptions import HTTPBadRequest, HTTPPayloadTooLarge
+
+# Size of blocks read from wsgi.input.
+BLOCK_SIZE = 64 * 1024
+
+# Parts larger than this are spooled from memory to disk.
+SPOOL_SIZE = 1024 * 1024
+
+# Maximum size of headers for single multipart part.
+MAX_HEADER_SIZE = 16 * 1024
+
+_PARAM_RE = re.compile(r';\s*([^\s=;]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+# Multipart parser states.
+_PREAMBLE = 0
+_DELIMITER = 1
+_HEADERS = 2
+_BODY = 3
+_DONE = 4
+
+
+def parse_header(value):
+    """Parse header value with parameters.
+
+    e.g. 'form-data; name="file"; filename="a.txt"'
+
+    Args:
+        value (str): Header value.
+
+    Returns:
+        tuple: Lower case value and dict of parameters.
+    """
+    main = value.partition(';')[0].strip().lower()
+
+    params = {}
+    for key, param in _PARAM_RE.findall(value):
+        param = param.strip()
+        if len(param) > 1 and param[0] == param[-1] == '"':
+            param = param[1:-1].replace('\\\\', '\\').replace('\\"', '"')
+        params[key.lower()] = param
+
+    # RFC 5987 encoded filename. e.g. filename*=UTF-8''%e2%82%ac.txt
+    if 'filename*' in params:
+        charset, _, encoded = params['filename*'].partition("'")
+        encoded = encoded.partition("'")[2]
+        try:
+            params['filename'] = unquote(encoded,
+                                         encoding=charset or 'utf-8',
+                                         errors='replace')
+        except LookupError:
+            pass
+
+    return (main, params,)
+
+
+class FormField(object):
+    """Form field or uploaded file.
+
+    Attributes:
+        name (str): Field name.
+        filename (str): Filename for uploaded file, otherwise None.
+        type (str): Content type of field.
+        file (obj): Binary file object of upload, otherwise None.
+        size (int): Size of uploaded file in bytes.
+        value (str): Value of field, bytes for uploaded file.
+    """
+    __slots__ = ('name', 'filename', 'type', 'file', 'size', '_value',)
+
+    def __init__(self, name, value=None, filename=None, type=None,
+                 file=None, size=0):
+        self.name = name
+        self.filename = filename
+        self.type = type
+        self.file = file
+        self.size = size
+        self._value = value
+
+    def __repr__(self):
+        if self.file is not None:
+            return '<%s: %s (%s, %s, %s bytes)>' % (self.__class__.__name__,
+                                                    self.name,
+                                                    self.filename,
+                                                    self.type,
+                                                    self.size,)
+        return '<%s: %s>' % (self.__class__.__name__, self.name,)
+
+    @property
+    def value(self):
+        if self.file is not None:
+            self.file.seek(0)
+            value = self.file.read()
+            self.file.seek(0)
+            return value
+
+        return self._value
+
+
+class Form(object):
+    """Parsed form data.
+
+    Provides the 'cgi.FieldStorage' interface used by Request. Fields with
+    multiple values return a list of FormField objects.
+    """
+    __slots__ = ('_fields',)
+
+    def __init__(self):
+        self._fields = {}
+
+    def append(self, field):
+        try:
+            self._fields[field.name].append(field)
+        except KeyError:
+            self._fields[field.name] = [field]
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, name):
+        return name in self._fields
+
+    def __getitem__(self, name):
+        fields = self._fields[name]
+        if len(fields) == 1:
+            return fields[0]
+        return list(fields)
+
+    def keys(self):
+        return list(self._fields)
+
+    def getvalue(self, name, default=None):
+        try:
+            fields = self._fields[name]
+        except KeyError:
+            return default
+
+        if len(fields) == 1:
+            return fields[0].value
+        return [field.value for field in fields]
+
+    def getfirst(self, name, default=None):
+        try:
+            return self._fields[name][0].value
+        except KeyError:
+            return default
+
+    def getlist(self, name):
+        try:
+            return [field.value for field in self._fields[name]]
+        except KeyError:
+            return []
+
+    @property
+    def files(self):
+        """List of uploaded files as FormField objects.
+        """
+        return [field for fields in self._fields.values()
+                for field in fields if field.file is not None]
+
+    def close(self):
+        for field in self.files:
+            field.file.close()
+
+
+def _read_blocks(stream, length, block_size):
+    remaining = length
+    while remaining > 0:
+        block = stream.read(min(block_size, remaining))
+        if not block:
+            break
+        remaining -= len(block)
+        yield block
+
+
+def _too_many_parts(max_parts):
+    return HTTPPayloadTooLarge(description='Form exceeds limit of %s'
+                               % max_parts + ' fields')
+
+
+def _add_urlencoded(form, data, parts, max_parts):
+    for pair in data.split(b'&'):
+        if not pair:
+            continue
+        parts += 1
+        if max_parts and parts > max_parts:
+            raise _too_many_parts(max_parts)
+        name, _, value = pair.decode('utf-8', 'replace').partition('=')
+        form.append(FormField(unquote_plus(name, errors='replace'),
+                              unquote_plus(value, errors='replace')))
+
+    return parts
+
+
+def parse_urlencoded(stream, length, block_size=BLOCK_SIZE, max_parts=0):
+    """Parse application/x-www-form-urlencoded body.
+
+    Args:
+        stream (obj): File like object. (e.g. wsgi.input)
+        length (int): Length of body.
+
+    Keyword Args:
+        block_size (int): Size of blocks read from stream.
+        max_parts (int): Maximum number of fields, 0 for no limit.
+
+    Returns:
+        Form object.
+
+    Raises:
+        HTTPPayloadTooLarge: Exceeds limit of fields.
+    """
+    form = Form()
+    buffer = b''
+    parts = 0
+
+    for block in _read_blocks(stream, length, block_size):
+        buffer += block
+        if b'&' in block:
+            complete, _, buffer = buffer.rpartition(b'&')
+            parts = _add_urlencoded(form, complete, parts, max_parts)
+
+    _add_urlencoded(form, buffer, parts, max_parts)
+
+    return form
+
+
+def _field(headers, file, size):
+    disposition, params = parse_header(headers.get('content-disposition',
+                                                   ''))
+    content_type = headers.get('content-type', 'text/plain')
+    name = params.get('name')
+    filename = params.get('filename')
+
+    file.seek(0)
+    if filename is None:
+        charset = parse_header(content_type)[1].get('charset', 'utf-8')
+        try:
+            value = file.read().decode(charset, 'replace')
+        except LookupError:
+            file.seek(0)
+            value = file.read().decode('utf-8', 'replace')
+        file.close()
+        return FormField(name, value, type=content_type)
+
+    return FormField(name, filename=filename, type=content_type,
+                     file=file, size=size)
+
+
+def parse_multipart(stream, boundary, length, block_size=BLOCK_SIZE,
+                    spool_size=SPOOL_SIZE, max_parts=0):
+    """Parse multipart/form-data body.
+
+    The body is read in blocks and parsed incrementally. Parts are written
+    to SpooledTemporaryFile objects, kept in memory up to spool_size and
+    moved to disk when larger.
+
+    Lines ending with LF only are accepted in addition to CRLF.
+
+    Args:
+        stream (obj): File like object. (e.g. wsgi.input)
+        boundary (str): Multipart boundary.
+        length (int): Length of body.
+
+    Keyword Args:
+        block_size (int): Size of blocks read from stream.
+        spool_size (int): Bytes kept in memory per part before spooling.
+        max_parts (int): Maximum number of parts, 0 for no limit.
+
+    Returns:
+        Form object.
+
+    Raises:
+        HTTPBadRequest: Malformed multipart body.
+        HTTPPayloadTooLarge: Exceeds limit of parts.
+    """
+    form = Form()
+    delimiter = b'--' + boundary.encode('latin-1')
+    separator = b'\n' + delimiter
+    # Bytes kept in buffer which may be the start of a separator.
+    keep = len(separator) + 1
+
+    buffer = bytearray()
+    state = _PREAMBLE
+    headers = None
+    header_size = 0
+    file = None
+    size = 0
+    parts = 0
+
+    blocks = _read_blocks(stream, length, block_size)
+
+    try:
+        while state != _DONE:
+            block = next(blocks, None)
+            if block is None:
+                raise HTTPBadRequest(description='Incomplete multipart body')
+            buffer += block
+
+            while True:
+                if state == _PREAMBLE:
+                    pos = buffer.find(delimiter)
+                    if pos == -1:
+                        del buffer[:max(len(buffer) - len(delimiter), 0)]
+                        break
+                    del buffer[:pos]
+                    state = _DELIMITER
+
+                elif state == _DELIMITER:
+                    # Buffer starts with delimiter.
+                    if len(buffer) < len(delimiter) + 2:
+                        break
+                    if buffer[len(delimiter):len(delimiter) + 2] == b'--':
+                        state = _DONE
+                        break
+                    pos = buffer.find(b'\n', len(delimiter))
+                    if pos == -1:
+                        if len(buffer) > MAX_HEADER_SIZE:
+                            raise HTTPBadRequest(
+                                description='Invalid multipart delimiter')
+                        break
+                    del buffer[:pos + 1]
+                    headers = {}
+                    header_size = 0
+                    state = _HEADERS
+
+                elif state == _HEADERS:
+                    pos = buffer.find(b'\n')
+                    if pos == -1:
+                        if header_size + len(buffer) > MAX_HEADER_SIZE:
+                            raise HTTPBadRequest(
+                                description='Multipart headers too large')
+                        break
+                    header_size += pos + 1
+                    if header_size > MAX_HEADER_SIZE:
+                        raise HTTPBadRequest(
+                            description='Multipart headers too large')
+                    line = bytes(buffer[:pos]).rstrip(b'\r')
+                    del buffer[:pos + 1]
+                    if line:
+                        name, _, value = line.decode(
+                            'utf-8', 'replace').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                        continue
+                    parts += 1
+                    if max_parts and parts > max_parts:
+                        raise _too_many_parts(max_parts)
+                    file = SpooledTemporaryFile(max_size=spool_size)
+                    size = 0
+                    state = _BODY
+
+                elif state == _BODY:
+                    pos = buffer.find(separator)
+                    if pos == -1:
+                        if len(buffer) > keep:
+                            end = len(buffer) - keep
+                            file.write(buffer[:end])
+                            size += end
+                            del buffer[:end]
+                        break
+                    end = pos
+                    if end > 0 and buffer[end - 1] == 13:
+                        # Strip CR of CRLF before delimiter.
+                        end -= 1
+                    file.write(buffer[:end])
+                    size += end
+                    del buffer[:pos + 1]
+                    form.append(_field(headers, file, size))
+                    file = None
+                    state = _DELIMITER
+    except Exception:
+        if file is not None:
+            file.close()
+        form.close()
+        raise
+
+    return form
+
+
+def parse_form(stream, content_type, length, block_size=BLOCK_SIZE,
+               spool_size=SPOOL_SIZE, max_parts=0, max_size=0):
+    """Parse form data in request body.
+
+    Supports 'multipart/form-data' and 'application/x-www-form-urlencoded'.
+    Bodies without content type are parsed as urlencoded, other content
+    types return an empty form.
+
+    Args:
+        stream (obj): File like object. (e.g. wsgi.input)
+        content_type (str): Content-Type header value.
+        length (int): Content-Length of body.
+
+    Keyword Args:
+        block_size (int): Size of blocks read from stream.
+        spool_size (int): Bytes kept in memory per part before spooling.
+        max_parts (int): Maximum number of fields, 0 for no limit.
+        max_size (int): Maximum size of body, 0 for no limit.
+
+    Returns:
+        Form object.
+
+    Raises:
+        HTTPBadRequest: Malformed multipart body.
+        HTTPPayloadTooLarge: Exceeds limit of size or parts.
+    """
+    # NOTE(cfrademan): Checked before reading, oversized bodies are
+    # never read.
+    if max_size and length > max_size:
+        raise HTTPPayloadTooLarge(description='Form exceeds limit of %s'
+                                  % max_size + ' bytes')
+
+    if not length:
+        return Form()
+
+    if content_type is None:
+        return parse_urlencoded(stream, length, block_size, max_parts)
+
+    content_type, params = parse_header(content_type)
+
+    if content_type == 'multipart/form-data':
+        boundary = params.get('boundary')
+        if not boundary:
+            raise HTTPBadRequest(description='Missing multipart boundary')
+        return parse_multipart(stream, boundary, length, block_size,
+                               spool_size, max_parts)
+    elif content_type == 'application/x-www-form-urlencoded':
+        return parse_urlencoded(stream, length, block_size, max_parts)
+
+    return Form()
@@ -29,7 +29,7 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 
 import base64
-from cgi import FieldStorage
+from functools import lru_cache
 from http.cookies import SimpleCookie, CookieError
 
 from luxon import g
@@ -40,7 +40,7 @@ from luxon.utils import js
 from luxon.utils.cast import to_tuple
 from luxon.utils.timezone import TimezoneGMT, to_gmt
 from luxon.utils.objects import dict_value_property
-from luxon.utils.text import split
+from luxon.structs.cidict import CiDict
 from luxon.utils.http import parse_form_field
 from luxon.utils.imports import get_class
 from luxon.exceptions import (HTTPInvalidHeader,
@@ -48,12 +48,61 @@ from luxon.exceptions import (HTTPInvalidHeader,
 from luxon.core.session import Session
 from luxon.utils.http import ETags
 from luxon.core.handlers.request import RequestBase
+from luxon.core.handlers.wsgi.form import parse_form
 
 from luxon.core.logger import GetLogger
 
 
 log = GetLogger(__name__)
 
+# User-Agent substrings for classification, matched in lower case.
+MOBILE_AGENTS = ('iphone',
+                 'android',)
+
+BOT_AGENTS = ('google',
+              'bot',
+              'bingpreview',
+              'yandex',
+              'yahoo',
+              'slurp',
+              'baidu',)
+
+
+@lru_cache(maxsize=256)
+def _wsgi_header(name):
+    return name.upper().replace('-', '_')
+
+
+@lru_cache(maxsize=1024)
+def _parse_cookies(cookie_header):
+    # NOTE(cfrademan): Browsers send the same Cookie header on every
+    # request of a session. Results are shared, callers receive copies.
+    parser = SimpleCookie()
+    for cookie_part in cookie_header.split('; '):
+        try:
+            parser.load(cookie_part)
+        except CookieError:
+            log.error('Invalid Cookie: %s' % cookie_part)
+    cookies = {}
+    for morsel in parser.values():
+        cookies[morsel.key] = morsel.value
+
+    return cookies
+
+
+@lru_cache(maxsize=1024)
+def _parse_query(query_string):
+    return parse_qs(query_string, True)
+
+
+@lru_cache(maxsize=1024)
+def _classify_agent(agent):
+    # Returns (is_mobile, is_bot) for User-Agent.
+    agent = agent.lower()
+
+    return (any(device in agent for device in MOBILE_AGENTS),
+            any(bot in agent for bot in BOT_AGENTS),)
+
 
 class Request(RequestBase):
     """Represents a clients HTTP request.
@@ -239,10 +288,22 @@ class Request(RequestBase):
 
         stream: File-like input object for reading the body of the request.
 
-        json (object): JSON Payload as object.
+        json (object): JSON Payload as object. HTML tags are stripped from
+            strings within objects according to json_trusted.
+
+        json_trusted (set): JSON sanitization policy. None sanitizes all
+            strings, True disables sanitization and a set of keys leaves
+            values of those object keys as is. Set from the route with
+            register.trusted().
+
+        form: Form object with submitted form data. Multipart and
+            urlencoded bodies are parsed in blocks, uploads are spooled to
+            disk above 1 MiB.
 
-        form: cgi.FieldStorage() To get at submitted form data. As per Common
-            Gateway Interface support provided by Python natively.
+        form_max_size (int): Maximum size of form body in bytes, 0 for no
+            limit. Larger bodies raise HTTPPayloadTooLarge before reading.
+
+        form_max_parts (int): Maximum number of form fields, 0 for no limit.
 
         form_dict (dict): Generated dictionary of form data submitted with
             field names as keys and values provided as either str, bytes or
@@ -311,11 +372,23 @@ class Request(RequestBase):
     """
     _WSGI_CONTENT_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH')
 
+    # Form parsing defaults, set from settings.ini by Application.
+    _FORM_MAX_SIZE = 0
+    _FORM_MAX_PARTS = 1000
+    _FORM_SPOOL_SIZE = 1024 * 1024
+    # Base64 encoded in blocks, multiple of 57 bytes per line of output.
+    _BASE64_BLOCK_SIZE = 57 * 1024
+
     __slots__ = (
         'tag',
+        'middleware',
+        'json_trusted',
+        'form_max_size',
+        'form_max_parts',
         'method',
         'route',
         'route_kwargs',
+        'route_template',
         'env',
         'response',
         '_cached_uri',
@@ -371,6 +444,19 @@ class Request(RequestBase):
         # Set Environ
         self.env = env
 
+        # Middleware chain for route. (pre, resource, post)
+        self.middleware = None
+
+        # Route as registered, set by router.
+        self.route_template = None
+
+        # JSON sanitization policy.
+        self.json_trusted = None
+
+        # Form limits.
+        self.form_max_size = self._FORM_MAX_SIZE
+        self.form_max_parts = self._FORM_MAX_PARTS
+
         # Caching
         self._unscoped_token = None
         self._scoped_token = None
@@ -433,7 +519,12 @@ class Request(RequestBase):
     @property
     def json(self):
         if self._cached_json is None:
-            self._cached_json = js.loads(self.stream.read())
+            payload = self.read(self.content_length)
+            trusted = self.json_trusted
+            if trusted is True:
+                self._cached_json = js.loads(payload, sanitize=False)
+            else:
+                self._cached_json = js.loads(payload, trusted=trusted)
 
         return self._cached_json
 
@@ -729,15 +820,14 @@ class Request(RequestBase):
 
     @property
     def query_params(self):
-        # URI QUERY_STRING try/catch cheaper and faster
         if self._cached_query_params is None:
-            try:
-                if self.query_string:
-                    self._cached_query_params = parse_qs(self.query_string,
-                                                         True)
-                else:
-                    self._cached_query_params = {}
-            except KeyError:
+            query_string = self.query_string
+            if query_string:
+                # Copy of shared parsed result, lists included.
+                self._cached_query_params = {
+                    key: list(value) if isinstance(value, list) else value
+                    for key, value in _parse_query(query_string).items()}
+            else:
                 self._cached_query_params = {}
 
         return self._cached_query_params
@@ -757,6 +847,9 @@ class Request(RequestBase):
 
     @property
     def content_length(self):
+        if self._cached_content_length is not None:
+            return self._cached_content_length
+
         # CONTENT_LENGTH try/catch cheaper and faster
         try:
             length = int(self.env['CONTENT_LENGTH'])
@@ -765,8 +858,10 @@ class Request(RequestBase):
                     'Content-Length',
                     'Negative Length not allowed.'
                 )
+            self._cached_content_length = length
             return length
         except KeyError:
+            self._cached_content_length = 0
             return 0
         except ValueError:
             raise HTTPInvalidHeader('Content-Length',
@@ -777,16 +872,28 @@ class Request(RequestBase):
         if self._cached_form is not None:
             return self._cached_form
 
-        environ = {'REQUEST_METHOD': 'POST',
-                   'CONTENT_LENGTH': self.content_length}
+        self._cached_form = parse_form(self.stream,
+                                       self.content_type,
+                                       self.content_length,
+                                       spool_size=self._FORM_SPOOL_SIZE,
+                                       max_parts=self.form_max_parts,
+                                       max_size=self.form_max_size)
 
-        if 'CONTENT_TYPE' in self.env:
-            environ['CONTENT_TYPE'] = self.env['CONTENT_TYPE']
+        return self._cached_form
 
-        self._cached_form = FieldStorage(fp=self, keep_blank_values=True,
-                                         environ=environ)
+    def _base64(self, file):
+        # NOTE(cfrademan): Encoded in blocks to avoid holding the raw
+        # and encoded file in memory, output is identical to encodebytes.
+        file.seek(0)
+        encoded = []
+        while True:
+            block = file.read(self._BASE64_BLOCK_SIZE)
+            if not block:
+                break
+            encoded.append(base64.encodebytes(block))
+        file.seek(0)
 
-        return self._cached_form
+        return b''.join(encoded)
 
     @property
     def form_dict(self):
@@ -801,11 +908,9 @@ class Request(RequestBase):
                     if prop not in json_safe_object:
                         json_safe_object[prop] = []
                     if item.filename:
-                        # Encodestring was changed to encodebytes... ?!?
-                        data = base64.encodebytes(item.file.read())
                         file_obj = {'name': item.filename,
                                     'type': item.type,
-                                    'base64': data}
+                                    'base64': self._base64(item.file)}
                         json_safe_object[prop].append(file_obj)
                     else:
                             json_safe_object[prop].append(
@@ -813,11 +918,9 @@ class Request(RequestBase):
                             )
             else:
                 if field.filename:
-                    # Encodestring was changed to encodebytes... ?!?
-                    data = base64.encodebytes(field.file.read())
                     file_obj = {'name': field.filename,
                                 'type': field.type,
-                                'base64': data}
+                                'base64': self._base64(field.file)}
                     json_safe_object[prop] = file_obj
                 else:
                     json_safe_object[prop] = parse_form_field(field.value)
@@ -834,20 +937,26 @@ class Request(RequestBase):
 
     @property
     def headers(self):
+        """Case-insensitive dict of request headers.
+
+        Built once per request from the WSGI environ.
+        """
         if self._cached_headers is not None:
             return self._cached_headers
 
-        self._cached_headers = {}
-        for header in self.env:
-            if header.startswith('HTTP_'):
-                orig_header = split(header, '_')[1].replace('_', '-')
-                self._cached_headers[orig_header] = self.env[header]
-            if self.content_type:
-                self._cached_headers['Content-Type'] = self.content_type
-            if self.content_length:
-                self._cached_headers['Content-Length'] = self.content_length
+        headers = CiDict()
+        for key, value in self.env.items():
+            if key.startswith('HTTP_'):
+                headers[key[5:].replace('_', '-').title()] = value
+
+        if self.content_type:
+            headers['Content-Type'] = self.content_type
+        if self.content_length:
+            headers['Content-Length'] = self.content_length
 
-        return self._cached_headers
+        self._cached_headers = headers
+
+        return headers
 
     def get_header(self, name, required=False, default=None):
         """Retrieve the raw string value for the given header.
@@ -872,7 +981,7 @@ class Request(RequestBase):
             HTTPMissingHeader: The header was not found in the request, but
                 it was required.
         """
-        wsgi_name = name.upper().replace('-', '_')
+        wsgi_name = _wsgi_header(name)
 
         try:
             return self.env['HTTP_' + wsgi_name]
@@ -1367,17 +1476,8 @@ class Request(RequestBase):
     @property
     def cookies(self):
         if self._cached_cookies is None:
-            cookie_header = self.get_header('Cookie', default='')
-            parser = SimpleCookie()
-            for cookie_part in cookie_header.split('; '):
-                try:
-                    parser.load(cookie_part)
-                except CookieError:
-                    log.error('Invalid Cookie: %s' % cookie_part)
-            cookies = {}
-            for morsel in parser.values():
-                cookies[morsel.key] = morsel.value
-            self._cached_cookies = cookies
+            self._cached_cookies = _parse_cookies(
+                self.get_header('Cookie', default=''))
 
         return self._cached_cookies.copy()
 
@@ -1397,16 +1497,11 @@ class Request(RequestBase):
         """Returns True if mobile client is used.
         """
         if self._cached_is_mobile is None:
-            agent = self.user_agent.lower()
-            devices = ('iphone',
-                       'android',)
-
-            for device in devices:
-                if device in agent:
-                    self._cached_is_mobile = True
-                    break
-
-            self._cached_is_mobile = False
+            agent = self.user_agent
+            if agent:
+                self._cached_is_mobile = _classify_agent(agent)[0]
+            else:
+                self._cached_is_mobile = False
 
         return self._cached_is_mobile
 
@@ -1415,21 +1510,11 @@ class Request(RequestBase):
         """Returns True if client is bot.
         """
         if self._cached_is_bot is None:
-            agent = self.user_agent.lower()
-            bots = ('google',
-                    'bot',
-                    'bingpreview',
-                    'yandex',
-                    'yahoo',
-                    'slurp',
-                    'baidu',)
-
-            for bot in bots:
-                if bot in agent:
-                    self._cached_is_bot = True
-                    break
-
-            self._cached_is_bot = False
+            agent = self.user_agent
+            if agent:
+                self._cached_is_bot = _classify_agent(agent)[1]
+            else:
+                self._cached_is_bot = False
 
         return self._cached_is_bot
 
@@ -41,10 +41,19 @@ from luxon.utils.encoding import if_unicode_to_bytes
 from luxon.utils.http import (parse_cache_control_header,
                               ETags)
 from luxon.utils import js
+from luxon.utils.compress import compress, compress_iter, compressible
 
 GMT_TIMEZONE = TimezoneGMT()
 
 
+def _is_file(stream):
+    try:
+        stream.fileno()
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
 class Response(Redirects):
     """Represents an HTTP response to a client request.
 
@@ -74,6 +83,8 @@ class Response(Redirects):
     )
     _STREAM_BLOCK_SIZE = 8 * 1024  # 8 KiB
     _DEFAULT_ENCODING = 'UTF-8'
+    # JSON encoding of dict and list bodies. 'pretty', 'compact' or 'stream'.
+    _JSON_ENCODER = 'pretty'
 
     __slots__ = (
         'content_type',
@@ -84,6 +95,8 @@ class Response(Redirects):
         '_cookies',
         '_start_response',
         '_etags',
+        '_file_wrapper',
+        '_compression',
     )
 
     def __init__(self, environ, start_response):
@@ -94,6 +107,12 @@ class Response(Redirects):
 
         self._start_response = start_response
 
+        # Server provided wsgi.file_wrapper for file like response bodies.
+        self._file_wrapper = environ.get('wsgi.file_wrapper')
+
+        # Content encoding negotiated for response body.
+        self._compression = None
+
         # Default Response Status Used internally.
         self._http_response_status_code = 204
 
@@ -139,8 +158,12 @@ class Response(Redirects):
         Accepts following objects:
             'str', and 'bytes', if str will be encoded to bytes.
             file, iter like objects must return bytes.
+            async iter like objects must return bytes, ASGI only.
             OrderedDict, dict and list will be translated json
-            and encoded to 'UTF-8'
+            and encoded to 'UTF-8'. Indented by default, the 'json_encoder'
+            option in the 'application' section of settings.ini selects
+            'compact' output or 'stream' to encode compact output in chunks
+            while the response is sent.
 
         Args:
             obj (object): Any valid object for response body.
@@ -157,13 +180,23 @@ class Response(Redirects):
         elif isinstance(obj, (OrderedDict, dict, list, tuple,)):
             # If JSON serializeable object.
             self.content_type = const.APPLICATION_JSON
-            self._stream = if_unicode_to_bytes(js.dumps(obj))
+            if self._JSON_ENCODER == 'stream':
+                # NOTE(cfrademan): Encoded while the response is iterated,
+                # sent without Content-Length.
+                self._stream = js.iterdumps(obj, self._STREAM_BLOCK_SIZE)
+            elif self._JSON_ENCODER == 'compact':
+                self._stream = if_unicode_to_bytes(js.dumps(obj,
+                                                            indent=None))
+            else:
+                self._stream = if_unicode_to_bytes(js.dumps(obj))
         elif hasattr(obj, 'json'):
             # If JSON serializeable object.
             self.content_type = const.APPLICATION_JSON
             self._stream = if_unicode_to_bytes(obj.json)
-        elif hasattr(obj, 'read') or hasattr(obj, '__iter__'):
-            # If body content behaves like file.
+        elif (hasattr(obj, 'read') or hasattr(obj, '__iter__') or
+                hasattr(obj, '__aiter__')):
+            # If body content behaves like file, iterable or asynchronous
+            # iterable. (ASGI only)
             if self.content_type is None:
                 self.content_type = const.APPLICATION_OCTET_STREAM
             self._stream = obj
@@ -194,6 +227,83 @@ class Response(Redirects):
 
         return length
 
+    def compress(self, encoding, level=6, min_size=1024):
+        """Compress response body using content encoding.
+
+        Compression is applied when the response is returned to the server.
+        Bodiless and partial responses, bodies smaller than min_size, bodies
+        with a Content-Encoding already set and already compressed content
+        types are sent as is.
+
+        Bytes bodies are compressed in full to provide Content-Length. File
+        and iterable bodies are compressed incrementally while iterated and
+        sent without Content-Length.
+
+        Args:
+            encoding (str): Content encoding 'br', 'gzip' or 'deflate'.
+                None disables compression.
+
+        Keyword Args:
+            level (int): Compression level.
+            min_size (int): Minimum body size in bytes for compression.
+        """
+        if encoding is None:
+            self._compression = None
+        else:
+            self._compression = (encoding, level, min_size,)
+
+    def _compress(self):
+        # NOTE(cfrademan): Called from __call__ once status, headers and body
+        # are final. Returns True if body will be compressed.
+        status = self._http_response_status_code
+        if (status in self._BODILESS_STATUS_CODES or status == 206 or
+                self._stream is None or
+                hasattr(self._stream, '__aiter__') or
+                'Content-Encoding' in self._headers or
+                not compressible(self.content_type)):
+            return False
+
+        encoding, level, min_size = self._compression
+        stream = self._stream
+
+        if isinstance(stream, BytesIO):
+            stream = stream.getvalue()
+
+        if isinstance(stream, bytes):
+            if len(stream) < min_size:
+                return False
+            self._stream = compress(stream, encoding, level)
+            self._content_length = len(self._stream)
+        else:
+            length = self.content_length
+            if length is not None and int(length) < min_size:
+                return False
+            # Length of compressed stream is unknown.
+            self._content_length = None
+            self._stream = self._iter_compressed(stream, encoding, level)
+            self._headers.pop('Content-Length', None)
+
+        self._headers['Content-Encoding'] = encoding
+
+        vary = self._headers.get('Vary')
+        if not vary:
+            self._headers['Vary'] = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            self._headers['Vary'] = vary + ', Accept-Encoding'
+
+        # NOTE(cfrademan): Strong ETags promise byte identical bodies, the
+        # compressed body differs from the identity body. Like nginx we
+        # weaken strong ETags, conditional requests still match since
+        # If-None-Match uses weak comparison.
+        etag = self._headers.get('Etag')
+        if etag:
+            self._headers['Etag'] = ','.join(
+                [tag if tag.lstrip().startswith('W/')
+                 else 'W/' + tag.strip()
+                 for tag in etag.split(',')])
+
+        return True
+
     @property
     def status(self):
         return self._http_response_status_code
@@ -498,6 +608,12 @@ class Response(Redirects):
             self._cookies[name]['path'] = path
 
     def __call__(self):
+        # Compress body with negotiated content encoding.
+        if self._compression is not None:
+            compressed = self._compress()
+        else:
+            compressed = False
+
         # Localized for a little more speed.
         status = self.status
         headers = self._headers
@@ -512,9 +628,10 @@ class Response(Redirects):
             if content_type is not None:
                 headers['Content-Type'] = content_type
 
-        elif (content_type is None and
-                status not in self._BODILESS_STATUS_CODES):
-            headers['Content-Type'] = self._DEFAULT_CONTENT_TYPE
+        elif status not in self._BODILESS_STATUS_CODES:
+            # Streamed body without known length.
+            headers['Content-Type'] = (content_type or
+                                       self._DEFAULT_CONTENT_TYPE)
 
         headers = list(self._headers.items())
 
@@ -527,36 +644,58 @@ class Response(Redirects):
                              const.HTTP_STATUS_CODES[status]),
                              headers)
 
+        # NOTE(cfrademan): Files are handed to the server using
+        # wsgi.file_wrapper, allowing the server to use os.sendfile
+        # instead of copying the file through Python.
+        if (self._file_wrapper is not None and
+                not compressed and
+                status not in self._BODILESS_STATUS_CODES and
+                _is_file(self._stream)):
+            return self._file_wrapper(self._stream, self._STREAM_BLOCK_SIZE)
+
         return self
 
     def __iter__(self):
-        stream = self._stream
-        status = self.status
+        if self.status not in self._BODILESS_STATUS_CODES:
+            yield from self._iter_stream(self._stream)
+
+        yield b''
 
+    def _iter_stream(self, stream):
         _STREAM_BLOCK_SIZE = self._STREAM_BLOCK_SIZE
 
-        if status not in self._BODILESS_STATUS_CODES:
-            try:
-                # Rewind file like object to beginning
-                stream.seek(0)
-            except AttributeError:
-                pass
-
-            try:
-                while True:
-                    chunk = stream.read(_STREAM_BLOCK_SIZE)
-                    if not chunk:
-                        break
-                    yield chunk
-            except AttributeError:
-                # If iterable body...
-                try:
-                    for i in range(0, len(stream), _STREAM_BLOCK_SIZE):
-                        yield stream[i:i + _STREAM_BLOCK_SIZE]
-                except TypeError:
-                    pass
+        try:
+            # Rewind file like object to beginning
+            stream.seek(0)
+        except AttributeError:
+            pass
 
-        yield b''
+        try:
+            read = stream.read
+        except AttributeError:
+            read = None
+
+        if read is not None:
+            while True:
+                chunk = read(_STREAM_BLOCK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        elif isinstance(stream, (bytes, bytearray,)):
+            for i in range(0, len(stream), _STREAM_BLOCK_SIZE):
+                yield stream[i:i + _STREAM_BLOCK_SIZE]
+        elif stream is not None:
+            # If iterable body...
+            for chunk in stream:
+                yield if_unicode_to_bytes(chunk)
+
+    def _iter_compressed(self, stream, encoding, level):
+        try:
+            yield from compress_iter(self._iter_stream(stream),
+                                     encoding, level)
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
 
     def close(self):
         if hasattr(self._stream, 'close'):
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import mimetypes
+from threading import Lock
+from datetime import datetime, timezone
+
+from luxon import constants as const
+from luxon.utils.http import etagger
+from luxon.utils.compress import accept_encodings
+from luxon.exceptions import HTTPRangeNotSatisfiable, HTTPInvalidHeader
+
+# Precompressed siblings in order of preference. (encoding, extension)
+PRECOMPRESSED = (('br', '.br'),
+                 ('gzip', '.gz'),)
+
+# Maximum entries in stat / ETag metadata cache.
+MAX_ENTRIES = 4096
+
+_entries = {}
+_entries_lock = Lock()
+
+
+class FileRange(object):
+    """File object limited to byte range.
+
+    Positioned at the start of the range, reads stop at the end of the range.
+    fileno() is not provided, servers using os.sendfile through
+    wsgi.file_wrapper would send the file up to the end.
+
+    Args:
+        file (obj): Binary file object.
+        start (int): First byte of range.
+        length (int): Bytes in range.
+    """
+    __slots__ = ('_file', '_start', '_length', '_position')
+
+    def __init__(self, file, start, length):
+        self._file = file
+        self._start = start
+        self._length = length
+        self._position = 0
+        file.seek(start)
+
+    def __len__(self):
+        return self._length
+
+    def seek(self, offset):
+        self._position = max(min(offset, self._length), 0)
+        self._file.seek(self._start + self._position)
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self._file.read(size)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _entry(path):
+    # NOTE(cfrademan): Metadata cache keyed by path, validated with mtime and
+    # size from os.stat on every lookup. Siblings are resolved when the
+    # original file changes.
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size,)
+
+    entry = _entries.get(path)
+    if entry is not None and entry[0] == version:
+        return entry
+
+    content_type, encoding = mimetypes.guess_type(path)
+    if content_type is None:
+        content_type = const.APPLICATION_OCTET_STREAM
+    elif encoding is not None:
+        content_type += ';charset=%s' % encoding
+
+    etag = etagger(path, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    variants = {None: (path, stat.st_size, etag,)}
+    for encoding, extension in PRECOMPRESSED:
+        try:
+            sibling = os.stat(path + extension)
+        except FileNotFoundError:
+            continue
+        if sibling.st_mtime_ns >= stat.st_mtime_ns:
+            variants[encoding] = (path + extension,
+                                  sibling.st_size,
+                                  etag + '-' + encoding,)
+
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime),
+                                           tz=timezone.utc)
+
+    entry = (version, content_type, last_modified, variants,)
+
+    with _entries_lock:
+        if len(_entries) >= MAX_ENTRIES:
+            _entries.clear()
+        _entries[path] = entry
+
+    return entry
+
+
+def _range(req, etag, last_modified, size):
+    if req.range is None or req.range_unit != 'bytes':
+        return None
+
+    # If-Range with validator that does not match serves full file.
+    if_range = req.if_range
+    if if_range:
+        if_range = if_range.strip()
+        if if_range.startswith('W/'):
+            if_range = if_range[2:]
+        if if_range.startswith('"'):
+            if if_range.strip('"') != etag:
+                return None
+        else:
+            try:
+                if req.get_header_as_datetime('If-Range') != last_modified:
+                    return None
+            except HTTPInvalidHeader:
+                return None
+
+    first, last = req.range
+    if first < 0:
+        start = max(size + first, 0)
+        end = size - 1
+    else:
+        start = first
+        end = size - 1 if last < 0 else min(last, size - 1)
+
+    if start >= size or start > end:
+        raise HTTPRangeNotSatisfiable(size)
+
+    return (start, end,)
+
+
+def static_file(req, resp, path):
+    """Serve static file.
+
+    Sets content type, length, ETag and Last-Modified on the response and
+    returns an open file object as the response body. The file is never
+    read into memory, servers providing wsgi.file_wrapper transmit it with
+    os.sendfile where possible.
+
+    If the client accepts 'br' or 'gzip' encoding and a newer precompressed
+    sibling exists (e.g. 'app.js.br' or 'app.js.gz') it is served with the
+    Content-Encoding header.
+
+    Single byte ranges are supported using Request.range and If-Range,
+    ranges are read from the file instead of using os.sendfile.
+
+    Args:
+        req (obj): Request object.
+        resp (obj): Response object.
+        path (str): Path to file.
+
+    Returns:
+        File object for Response body.
+
+    Raises:
+        FileNotFoundError: No such file.
+        HTTPRangeNotSatisfiable: Range outside of file.
+    """
+    version, content_type, last_modified, variants = _entry(path)
+
+    encoding = None
+    if len(variants) > 1:
+        accepted = accept_encodings(req.get_header('Accept-Encoding'))
+        for encoding, extension in PRECOMPRESSED:
+            if encoding in variants and accepted.get(encoding, 0) > 0:
+                break
+        else:
+            encoding = None
+        resp.set_header('Vary', 'Accept-Encoding')
+
+    variant_path, size, etag = variants[encoding]
+
+    try:
+        sfile = open(variant_path, 'rb')
+    except FileNotFoundError:
+        # Sibling removed since cached.
+        _entries.pop(path, None)
+        raise
+
+    try:
+        resp.content_type = content_type
+        resp.etag = etag
+        resp.last_modified = last_modified
+        resp.set_header('Accept-Ranges', 'bytes')
+        if encoding is not None:
+            resp.set_header('Content-Encoding', encoding)
+
+        byte_range = _range(req, etag, last_modified, size)
+    except Exception:
+        sfile.close()
+        raise
+
+    if byte_range is None:
+        resp.content_length = size
+        return sfile
+
+    start, end = byte_range
+    resp.status = 206
+    resp.set_header('Content-Range', 'bytes %s-%s/%s' % (start, end, size))
+    resp.content_length = end - start + 1
+
+    return FileRange(sfile, start, end - start + 1)
@@ -28,16 +28,18 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 import sys
+import pickle
+import struct
 import logging
 import logging.handlers
+import threading
 import multiprocessing
 import traceback
+from collections import deque
 
 from luxon import g
 from luxon.utils.system import switch
-from luxon.core.networking.sock import (Pipe,
-                                        recv_pickle,
-                                        send_pickle)
+from luxon.core.networking.sock import Pipe
 from luxon.exceptions import NoContextError
 from luxon.utils.singleton import NamedSingleton
 from luxon.utils.formatting import format_seconds
@@ -233,29 +235,214 @@ def configure(config, config_section, logger):
             logger.addHandler(handler)
 
 
-class MPLoggerSocketQueue(object):
-    def __init__(self, sock):
+# NOTE(cfrademan): Only LogRecord fields required by formatters and filters
+# are sent to the receiver. 'msg' is the fully formatted message including
+# exception / stack text. Order is the frame format, append only.
+_RECORD_FIELDS = ('name', 'msg', 'levelno', 'levelname', 'created', 'msecs',
+                  'relativeCreated', 'process', 'processName', 'thread',
+                  'threadName', 'pathname', 'filename', 'module', 'funcName',
+                  'lineno')
+
+_FRAME_HEADER = struct.Struct('!I')
+
+_message_format = logging.Formatter()
+
+
+def send_frame(sock, records):
+    """Send records as single length-prefixed frame.
+
+    Args:
+        sock (obj): luxon.core.networking.sock.Socket object.
+        records (list): Tuples of values for _RECORD_FIELDS.
+    """
+    payload = pickle.dumps(records, 4)
+    sock.write(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """Receive frame of records.
+
+    Args:
+        sock (obj): luxon.core.networking.sock.Socket object.
+
+    Returns:
+        list: LogRecord objects.
+    """
+    length = _FRAME_HEADER.unpack(sock.read(_FRAME_HEADER.size))[0]
+    return [logging.makeLogRecord(dict(zip(_RECORD_FIELDS, values)))
+            for values in pickle.loads(sock.read(length))]
+
+
+class MPLoggerHandler(logging.Handler):
+    """Batched MPLogger transport.
+
+    Records are placed in a bounded in-process buffer and written to the
+    receiver by a background thread. Records are coalesced into a single
+    frame per flush interval or once the buffered messages exceed
+    flush_bytes. Writing to the socket is never done by the logging thread.
+
+    When the buffer is full records are dropped, or with block the logging
+    thread waits for space in the buffer. Dropped records are counted and
+    reported to the receiver with a warning.
+
+    Args:
+        sock (obj): luxon.core.networking.sock.Socket object.
+
+    Keyword Args:
+        flush_interval (float): Seconds between flushes.
+        flush_bytes (int): Buffered message bytes to trigger flush.
+        max_records (int): Maximum records buffered.
+        block (bool): Wait for space in buffer instead of dropping records.
+    """
+    def __init__(self, sock, flush_interval=0.1, flush_bytes=65536,
+                 max_records=10000, block=False):
+        super().__init__()
         self._sock = sock
+        self._flush_interval = flush_interval
+        self._flush_bytes = flush_bytes
+        self._max_records = max_records
+        self._block = block
+        self._buffer = deque()
+        self._buffered = 0
+        self._sending = False
+        self._closed = False
+        self._available = threading.Condition()
+        self._sent = 0
+        self._frames = 0
+        self._dropped = 0
+        self._reported = 0
+        self._thread = threading.Thread(target=self._flusher,
+                                        name='MPLogger',
+                                        daemon=True)
+        self._thread.start()
+
+    def _values(self, record):
+        values = [getattr(record, field, None) for field in _RECORD_FIELDS]
+        values[1] = _message_format.format(record)
+        return tuple(values)
+
+    def emit(self, record):
+        try:
+            values = self._values(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._available:
+            if self._closed:
+                self._dropped += 1
+                return
+
+            while len(self._buffer) >= self._max_records:
+                if not self._block or self._closed:
+                    self._dropped += 1
+                    return
+                self._available.wait()
+
+            self._buffer.append(values)
+            self._buffered += len(values[1])
+            if self._buffered >= self._flush_bytes:
+                self._available.notify_all()
+
+    def _flusher(self):
+        while True:
+            with self._available:
+                self._available.wait_for(
+                    lambda: (self._closed or
+                             self._buffered >= self._flush_bytes),
+                    self._flush_interval)
+                records = list(self._buffer)
+                self._buffer.clear()
+                self._buffered = 0
+                dropped = self._dropped - self._reported
+                self._reported = self._dropped
+                self._sending = True
+                closed = self._closed
+                self._available.notify_all()
+
+            if dropped:
+                records.append(self._values(logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0,
+                    "MPLogger dropped '%s' records" % dropped,
+                    None, None)))
 
-    def get(self):
-        return recv_pickle(self._sock)
+            try:
+                if records:
+                    send_frame(self._sock, records)
+                    self._sent += len(records)
+                    self._frames += 1
+            except Exception:
+                with self._available:
+                    self._dropped += len(records)
+                if not closed:
+                    print('MPLogger Whoops! Problem:', file=sys.stderr)
+                    traceback.print_exc(file=sys.stderr)
+            finally:
+                with self._available:
+                    self._sending = False
+                    self._available.notify_all()
+
+            if closed:
+                return
 
-    def put(self, msg):
-        send_pickle(self._sock, msg)
+    @property
+    def stats(self):
+        """Transport statistics.
 
-    def put_nowait(self, msg):
-        send_pickle(self._sock, msg)
+        Returns:
+            dict: buffered, sent, frames and dropped records.
+        """
+        return {'buffered': len(self._buffer),
+                'sent': self._sent,
+                'frames': self._frames,
+                'dropped': self._dropped}
 
     def flush(self):
-        return True
+        """Wait for buffered records to be sent."""
+        with self._available:
+            self._buffered = max(self._buffered, self._flush_bytes)
+            self._available.notify_all()
+            self._available.wait_for(
+                lambda: (not self._thread.is_alive() or
+                         (not self._buffer and not self._sending)))
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            self._available.notify_all()
+        self._thread.join()
+        super().close()
+
+
+def _transport_config():
+    # NOTE(cfrademan): MPLogger transport options from [mplogger] section
+    # in settings.ini when used within application context.
+    config = {}
+    try:
+        section = 'mplogger'
+        app_config = g.app.config
+        if app_config.has_section(section):
+            config['flush_interval'] = app_config.getfloat(
+                section, 'flush_interval', fallback=0.1)
+            config['flush_bytes'] = app_config.getint(
+                section, 'flush_bytes', fallback=65536)
+            config['max_records'] = app_config.getint(
+                section, 'max_records', fallback=10000)
+            config['block'] = app_config.get(
+                section, 'policy', fallback='drop').lower() == 'block'
+    except NoContextError:
+        pass
+
+    return config
 
 
 class MPLogger(object):
     # Multiprocessing queues are too slow and limited to 32786.
-    # Using Socket Socket Pipe with Queue wrapper interface.
-    def __init__(self, name, queue=None):
+    # Using Socket Socket Pipe with batched MPLoggerHandler transport.
+    def __init__(self, name, queue=None, **kwargs):
         self._running = False
         self._log_thread = None
+        self._handler = None
         self._name = name
         self._client = queue
         if self._name == "__main__":
@@ -265,8 +452,10 @@ class MPLogger(object):
             if not queue:
                 raise ValueError('MPLogger for Process requires queue')
             root = logging.getLogger()
-            queue = MPLoggerSocketQueue(self._client)
-            root.handlers = [logging.handlers.QueueHandler(queue)]
+            self._handler = MPLoggerHandler(self._client,
+                                            **{**_transport_config(),
+                                               **kwargs})
+            root.handlers = [self._handler]
 
             for logger in logging.Logger.manager.loggerDict:
                 sub_logger = logging.Logger.manager.loggerDict[logger]
@@ -279,14 +468,17 @@ class MPLogger(object):
     def queue(self):
         return self._client
 
-    def receive(self):
-        def handle(logger, record):
-            def log(msg):
-                record.msg = msg
-                logger.handle(record)
+    @property
+    def stats(self):
+        """Transport statistics for Process MPLogger.
 
-            return log
+        Returns:
+            dict: buffered, sent, frames and dropped records.
+        """
+        if self._handler:
+            return self._handler.stats
 
+    def receive(self):
         def receiver():
             self._running = True
 
@@ -306,14 +498,10 @@ class MPLogger(object):
             while self._running:
                 try:
                     while self._running:
-                        queue = MPLoggerSocketQueue(self._server)
-                        record = queue.get()
-                        if record is None:
-                            break
-                        # Get Logger
-                        logger = logging.getLogger(record.name)
-                        logger_facility = handle(logger, record)
-                        logger_facility(record.msg)
+                        for record in recv_frame(self._server):
+                            # Get Logger
+                            logger = logging.getLogger(record.name)
+                            logger.handle(record)
                 except (KeyboardInterrupt, SystemExit):
                     self._running = False
                 except Exception:
@@ -329,6 +517,11 @@ class MPLogger(object):
             self._log_thread.start()
 
     def close(self):
+        if self._handler:
+            # Process MPLogger, send remaining buffered records.
+            self._handler.close()
+            return
+
         self._running = False
         self._log_thread.terminate()
         # self._client.close()
@@ -0,0 +1,741 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Dave Kruger.
+# All rights reserved.
+#
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import mmap
+import json
+import struct
+import bisect
+import hashlib
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from luxon.core.logger import GetLogger
+
+log = GetLogger(__name__)
+
+# Default histogram buckets for durations in seconds.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                    10.0,)
+
+# Default histogram buckets for sizes in bytes.
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576,
+                4194304,)
+
+# Content type of text exposition format.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Shared region header. (keys bytes used, cells used)
+_HEADER = struct.Struct('<qq')
+# Shared region layout. (magic, owner pid, workers, cells, keys bytes)
+_LAYOUT = struct.Struct('<8sqqqq')
+_MAGIC = b'luxonmtr'
+# Key log entry length.
+_ENTRY = struct.Struct('<I')
+# Process id for worker slot.
+_PID = struct.Struct('<q')
+
+
+def server_workers():
+    """Number of server worker processes.
+
+    Read from the WEB_CONCURRENCY environment variable set by 'luxon -s'
+    and honoured by gunicorn.
+
+    Returns:
+        int: Worker processes or None when unknown.
+    """
+    try:
+        workers = int(os.environ['WEB_CONCURRENCY'])
+    except (KeyError, ValueError):
+        return None
+    return workers if workers > 0 else None
+
+
+def region_path(key):
+    """Path of named shared memory region.
+
+    Processes using the same key, such as the application path, share the
+    region.
+
+    Args:
+        key (str): Region key.
+
+    Returns:
+        str: Path in /dev/shm or the temporary directory.
+    """
+    if os.path.isdir('/dev/shm'):
+        directory = '/dev/shm'
+    else:
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, 'luxon_metrics_%s' %
+                        hashlib.sha1(key.encode()).hexdigest()[:16])
+
+
+class _FileLock(object):
+    # Lock shared by processes mapping the same file.
+    __slots__ = ('_fd', '_lock',)
+
+    def __init__(self, fd):
+        self._fd = fd
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except Exception:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, type, value, traceback):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\')
+            .replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+def _labels(labels, extra=None):
+    if extra is not None:
+        labels = labels + (extra,)
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (name, _escape(value),)
+                             for name, value in labels)
+
+
+def _number(value):
+    try:
+        if value == int(value):
+            return str(int(value))
+    except (OverflowError, ValueError):
+        pass
+    return repr(value)
+
+
+class Metric(object):
+    """Metric base class.
+
+    Metrics are created with the registry and record nothing until the
+    registry is setup.
+
+    Args:
+        registry (Registry): Registry of metric.
+        name (str): Metric name.
+        help (str): Metric description.
+    """
+    __slots__ = ('registry', 'name', 'help',)
+    TYPE = None
+
+    def __init__(self, registry, name, help):
+        self.registry = registry
+        self.name = name
+        self.help = help
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.name)
+
+    @property
+    def size(self):
+        """Number of cells used for each set of labels.
+        """
+        return 1
+
+
+class Counter(Metric):
+    """Counter metric.
+
+    Monotonically increasing value, summed across workers.
+    """
+    __slots__ = ()
+    TYPE = 'counter'
+
+    def inc(self, value=1, **labels):
+        """Increment counter.
+
+        Keyword Args:
+            value (int/float): Value added.
+            labels (str): Label values.
+        """
+        registry = self.registry
+        if registry._values is not None:
+            registry._add(self, labels, 0, value)
+
+
+class Gauge(Metric):
+    """Gauge metric.
+
+    Each worker sets its own value, exposed as sum across workers.
+    """
+    __slots__ = ()
+    TYPE = 'gauge'
+
+    def set(self, value, **labels):
+        """Set gauge.
+
+        Args:
+            value (int/float): Value of gauge for this worker.
+
+        Keyword Args:
+            labels (str): Label values.
+        """
+        registry = self.registry
+        if registry._values is not None:
+            registry._set(self, labels, value)
+
+    def inc(self, value=1, **labels):
+        registry = self.registry
+        if registry._values is not None:
+            registry._add(self, labels, 0, value)
+
+    def dec(self, value=1, **labels):
+        registry = self.registry
+        if registry._values is not None:
+            registry._add(self, labels, 0, -value)
+
+
+class Histogram(Metric):
+    """Histogram metric with fixed buckets.
+
+    Keyword Args:
+        buckets (tuple): Sorted upper bounds of buckets.
+    """
+    __slots__ = ('buckets',)
+    TYPE = 'histogram'
+
+    def __init__(self, registry, name, help, buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, help)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+
+    @property
+    def size(self):
+        # Buckets, +Inf bucket, sum and count.
+        return len(self.buckets) + 3
+
+    def observe(self, value, **labels):
+        """Observe value.
+
+        Args:
+            value (int/float): Observed value.
+
+        Keyword Args:
+            labels (str): Label values.
+        """
+        registry = self.registry
+        if registry._values is not None:
+            registry._observe(self, labels, value)
+
+
+class Registry(object):
+    """Metrics registry.
+
+    Counters, gauges and histograms are stored in a shared memory region.
+    Each worker records in its own slot and the exposition is aggregated
+    across all workers.
+
+    Without a path the region is anonymous and only shared with processes
+    forked after setup. Servers loading the application in each worker
+    require a named region, processes setting up the same path attach to
+    it.
+
+    .. code:: python
+
+        from luxon.core.metrics import registry
+
+        jobs = registry.counter('jobs_total', 'Jobs processed.')
+        jobs.inc(queue='default')
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._mmap = None
+        self._path = None
+        self._fd = None
+        self._values = None
+        self._workers = 0
+        self._cells_max = 0
+        self._pids_offset = 0
+        self._keys_offset = 0
+        self._keys_size = 0
+        self._lock = threading.Lock()
+        self._shared_lock = None
+        self._slot = None
+        self._cells = {}
+        self._entries = []
+        self._read = 0
+        self._full = False
+
+    @property
+    def enabled(self):
+        return self._values is not None
+
+    def setup(self, cells=4096, workers=None, keys_size=262144,
+              path=None):
+        """Allocate shared memory region.
+
+        Has no effect when already setup.
+
+        Keyword Args:
+            cells (int): Values per worker. Counters and gauges use one
+                cell for each set of labels, histograms one for each bucket
+                and three more.
+            workers (int): Maximum number of processes recording metrics.
+                (default: twice the server workers)
+            keys_size (int): Bytes for metric names and labels.
+            path (str): File of named region. (default: anonymous)
+
+        Raises:
+            ValueError: Less workers than server worker processes or named
+                region in use with other layout.
+        """
+        if self._values is not None:
+            return
+
+        server = server_workers()
+        if not workers:
+            # NOTE(cfrademan): Slots of exited processes are reused, new
+            # workers started during a reload overlap with old workers.
+            workers = (server or os.cpu_count() * 4 + 1) * 2
+        elif server is not None and workers < server:
+            raise ValueError("Metrics workers %s less than %s server"
+                             " workers" % (workers, server,))
+
+        # NOTE(cfrademan): Values are aligned on 8 bytes.
+        keys_size = (keys_size + 7) // 8 * 8
+        pids_offset = _HEADER.size + _LAYOUT.size
+        keys_offset = pids_offset + workers * _PID.size
+        values_offset = keys_offset + keys_size
+        size = values_offset + cells * workers * 8
+        layout = (_MAGIC, os.getpid(), workers, cells, keys_size,)
+
+        if path is not None and fcntl is None:
+            log.warning('Metrics region not named, requires fcntl')
+            path = None
+
+        if path is not None:
+            self._attach(path, size, layout)
+        else:
+            self._mmap = mmap.mmap(-1, size)
+            _LAYOUT.pack_into(self._mmap, _HEADER.size, *layout)
+            try:
+                import multiprocessing
+                self._shared_lock = multiprocessing.Lock()
+            except (ImportError, OSError):
+                # NOTE(cfrademan): Platforms without shared semaphores only
+                # aggregate metrics for threads of this process.
+                log.warning('Metrics not shared between processes,'
+                            ' no shared semaphores')
+                self._shared_lock = threading.Lock()
+
+        self._workers = workers
+        self._cells_max = cells
+        self._pids_offset = pids_offset
+        self._keys_offset = keys_offset
+        self._keys_size = keys_size
+
+        os.register_at_fork(after_in_child=self._forked)
+
+        self._values = memoryview(self._mmap)[values_offset:].cast('d')
+
+    def _attach(self, path, size, layout):
+        # Map named region, initialized when not used by running processes.
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        lock = _FileLock(fd)
+        try:
+            with lock:
+                current = None
+                running = False
+                if os.fstat(fd).st_size >= _HEADER.size + _LAYOUT.size:
+                    current = _LAYOUT.unpack(os.pread(fd, _LAYOUT.size,
+                                                      _HEADER.size))
+                if current is not None and current[0] == _MAGIC:
+                    pids = [current[1]]
+                    pids.extend(pid for pid, in _PID.iter_unpack(
+                        os.pread(fd, current[2] * _PID.size,
+                                 _HEADER.size + _LAYOUT.size)))
+                    running = any(_alive(pid) for pid in pids if pid != 0)
+
+                if running and current[2:] != layout[2:]:
+                    raise ValueError("Metrics region '%s' in use with"
+                                     " other layout" % path)
+                elif not running:
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, _LAYOUT.pack(*layout), _HEADER.size)
+
+                self._mmap = mmap.mmap(fd, size)
+        except Exception:
+            os.close(fd)
+            raise
+
+        self._path = path
+        self._fd = fd
+        self._shared_lock = lock
+
+    def _forked(self):
+        self._lock = threading.Lock()
+        self._slot = None
+        if self._fd is not None:
+            # NOTE(cfrademan): Locks are held by open file descriptions,
+            # inherited descriptors would share the lock of the parent.
+            os.close(self._fd)
+            self._fd = os.open(self._path, os.O_RDWR)
+            self._shared_lock = _FileLock(self._fd)
+
+    def _metric(self, cls, name, help, *args):
+        try:
+            metric = self._metrics[name]
+        except KeyError:
+            metric = self._metrics[name] = cls(self, name, help, *args)
+            return metric
+
+        if not isinstance(metric, cls):
+            raise ValueError("Metric '%s' already defined as %s" %
+                             (name, metric.TYPE,))
+        return metric
+
+    def counter(self, name, help=''):
+        """Define counter.
+
+        Returns existing metric when already defined.
+
+        Args:
+            name (str): Metric name.
+
+        Keyword Args:
+            help (str): Metric description.
+
+        Returns:
+            Counter object.
+        """
+        return self._metric(Counter, name, help)
+
+    def gauge(self, name, help=''):
+        """Define gauge.
+
+        Returns existing metric when already defined.
+
+        Args:
+            name (str): Metric name.
+
+        Keyword Args:
+            help (str): Metric description.
+
+        Returns:
+            Gauge object.
+        """
+        return self._metric(Gauge, name, help)
+
+    def histogram(self, name, help='', buckets=DURATION_BUCKETS):
+        """Define histogram.
+
+        Returns existing metric when already defined.
+
+        Args:
+            name (str): Metric name.
+
+        Keyword Args:
+            help (str): Metric description.
+            buckets (tuple): Upper bounds of buckets.
+
+        Returns:
+            Histogram object.
+        """
+        return self._metric(Histogram, name, help, buckets)
+
+    def _sync(self):
+        # Read key log entries added by other processes.
+        # Must hold shared lock.
+        keys_used, cells_used = _HEADER.unpack_from(self._mmap, 0)
+        offset = self._read
+        while offset < keys_used:
+            length, = _ENTRY.unpack_from(self._mmap,
+                                         self._keys_offset + offset)
+            start = self._keys_offset + offset + _ENTRY.size
+            entry = json.loads(self._mmap[start:start + length].decode())
+            labels = tuple(tuple(label) for label in entry['labels'])
+            self._cells[(entry['name'], labels,)] = entry['cell']
+            self._entries.append((entry['name'], entry['type'],
+                                  entry['help'], labels, entry['cell'],
+                                  entry['buckets'],))
+            offset += _ENTRY.size + length
+        self._read = offset
+        return keys_used, cells_used
+
+    def _allocate(self, metric, labels):
+        with self._shared_lock:
+            keys_used, cells_used = self._sync()
+            try:
+                return self._cells[(metric.name, labels,)]
+            except KeyError:
+                pass
+
+            entry = json.dumps({'name': metric.name,
+                                'type': metric.TYPE,
+                                'help': metric.help,
+                                'labels': labels,
+                                'cell': cells_used,
+                                'buckets': getattr(metric, 'buckets', None)},
+                               separators=(',', ':')).encode()
+            length = _ENTRY.size + len(entry)
+
+            if (cells_used + metric.size > self._cells_max or
+                    keys_used + length > self._keys_size):
+                if not self._full:
+                    log.warning('Metrics region full, not recording'
+                                " '%s'" % metric.name)
+                    self._full = True
+                self._cells[(metric.name, labels,)] = None
+                return None
+
+            offset = self._keys_offset + keys_used
+            _ENTRY.pack_into(self._mmap, offset, len(entry))
+            self._mmap[offset + _ENTRY.size:offset + length] = entry
+            _HEADER.pack_into(self._mmap, 0, keys_used + length,
+                              cells_used + metric.size)
+
+            self._sync()
+            return self._cells[(metric.name, labels,)]
+
+    def _claim(self):
+        # Claim worker slot for this process. Must hold local lock.
+        pid = os.getpid()
+        with self._shared_lock:
+            self._sync()
+            free = None
+            for slot in range(self._workers):
+                slot_pid, = _PID.unpack_from(
+                    self._mmap, self._pids_offset + slot * _PID.size)
+                if slot_pid == 0:
+                    free = slot
+                    break
+                elif free is None and not _alive(slot_pid):
+                    free = slot
+
+            if free is None:
+                log.warning('Metrics worker slots exhausted,'
+                            ' not recording for process %s' % pid)
+                self._slot = -1
+                return -1
+
+            _PID.pack_into(self._mmap, self._pids_offset + free * _PID.size,
+                           pid)
+
+            # NOTE(cfrademan): Counters and histograms of exited processes
+            # are kept, gauges only apply to running processes.
+            for name, type, help, labels, cell, buckets in self._entries:
+                if type == 'gauge':
+                    self._values[cell * self._workers + free] = 0
+
+        self._slot = free
+        return free
+
+    def _cell(self, metric, labels):
+        labels = tuple(sorted((label, str(value),)
+                              for label, value in labels.items()))
+        try:
+            return self._cells[(metric.name, labels,)]
+        except KeyError:
+            return self._allocate(metric, labels)
+
+    def _add(self, metric, labels, offset, value):
+        cell = self._cell(metric, labels)
+        if cell is None:
+            return
+        with self._lock:
+            slot = self._slot
+            if slot is None:
+                slot = self._claim()
+            if slot < 0:
+                return
+            self._values[(cell + offset) * self._workers + slot] += value
+
+    def _set(self, metric, labels, value):
+        cell = self._cell(metric, labels)
+        if cell is None:
+            return
+        with self._lock:
+            slot = self._slot
+            if slot is None:
+                slot = self._claim()
+            if slot < 0:
+                return
+            self._values[cell * self._workers + slot] = value
+
+    def _observe(self, metric, labels, value):
+        cell = self._cell(metric, labels)
+        if cell is None:
+            return
+        buckets = len(metric.buckets)
+        bucket = bisect.bisect_left(metric.buckets, value)
+        workers = self._workers
+        values = self._values
+        with self._lock:
+            slot = self._slot
+            if slot is None:
+                slot = self._claim()
+            if slot < 0:
+                return
+            values[(cell + bucket) * workers + slot] += 1
+            values[(cell + buckets + 1) * workers + slot] += value
+            values[(cell + buckets + 2) * workers + slot] += 1
+
+    def value(self, name, **labels):
+        """Value of counter or gauge summed across workers.
+
+        Args:
+            name (str): Metric name.
+
+        Keyword Args:
+            labels (str): Label values.
+
+        Returns:
+            float: Value or None when not recorded.
+        """
+        if self._values is None:
+            return None
+        with self._shared_lock:
+            self._sync()
+        labels = tuple(sorted((label, str(value),)
+                              for label, value in labels.items()))
+        cell = self._cells.get((name, labels,))
+        if cell is None:
+            return None
+        if isinstance(self._metrics.get(name), Gauge):
+            return self._sum(cell, self._running())
+        return self._sum(cell)
+
+    def _sum(self, cell, slots=None):
+        workers = self._workers
+        values = self._values[cell * workers:(cell + 1) * workers]
+        if slots is None:
+            return sum(values)
+        return sum(values[slot] for slot in slots)
+
+    def _running(self):
+        # Slots of running processes.
+        slots = []
+        for slot in range(self._workers):
+            pid, = _PID.unpack_from(self._mmap,
+                                    self._pids_offset + slot * _PID.size)
+            if pid != 0 and _alive(pid):
+                slots.append(slot)
+        return slots
+
+    def exposition(self):
+        """Metrics in text exposition format.
+
+        Returns:
+            str: Metrics of all workers.
+        """
+        if self._values is None:
+            return ''
+
+        with self._shared_lock:
+            self._sync()
+
+        # NOTE(cfrademan): Gauges of exited processes are not included.
+        running = self._running()
+
+        metrics = {}
+        for entry in self._entries:
+            metrics.setdefault(entry[0], []).append(entry)
+
+        lines = []
+        for name in sorted(metrics):
+            type, help = metrics[name][0][1:3]
+            if help:
+                help = help.replace('\\', '\\\\').replace('\n', '\\n')
+                lines.append('# HELP %s %s' % (name, help,))
+            lines.append('# TYPE %s %s' % (name, type,))
+
+            for name, type, help, labels, cell, buckets in metrics[name]:
+                if type == 'histogram':
+                    total = 0
+                    for i, bucket in enumerate(buckets + ['+Inf']):
+                        total += self._sum(cell + i)
+                        if bucket != '+Inf':
+                            bucket = _number(bucket)
+                        lines.append('%s_bucket%s %s' % (
+                            name,
+                            _labels(labels, ('le', bucket,)),
+                            _number(total),))
+                    lines.append('%s_sum%s %s' % (
+                        name,
+                        _labels(labels),
+                        _number(self._sum(cell + len(buckets) + 1)),))
+                    lines.append('%s_count%s %s' % (
+                        name,
+                        _labels(labels),
+                        _number(self._sum(cell + len(buckets) + 2)),))
+                elif type == 'gauge':
+                    lines.append('%s%s %s' % (
+                        name,
+                        _labels(labels),
+                        _number(self._sum(cell, running)),))
+                else:
+                    lines.append('%s%s %s' % (name,
+                                              _labels(labels),
+                                              _number(self._sum(cell)),))
+
+        lines.append('')
+        return '\n'.join(lines)
+
+
+# Process wide registry, luxon metrics and hooks use this registry.
+registry = Registry()
+
+
+def metrics(req, resp):
+    """Metrics of all workers in text exposition format."""
+    resp.content_type = CONTENT_TYPE
+    return registry.exposition()
@@ -29,18 +29,52 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 
 import re
+import ast
+import builtins
 
 from luxon.utils.timer import Timer
 from luxon.core.logger import GetLogger
 
 log = GetLogger(__name__)
 
+# MATCH : expression used within rule statements.
+_INTERPOLATION_RE = re.compile(r"\$[a-z_\-:]+", re.IGNORECASE)
+
+_BUILTINS = frozenset(dir(builtins))
+
+
+def _arguments(condition):
+    # NOTE(cfrademan): Names referenced by the condition become keyword only
+    # arguments of the rule function. Builtins and names bound within the
+    # condition itself (comprehensions) are not arguments.
+    loaded = set()
+    stored = set()
+    for node in ast.walk(ast.parse(condition, mode='eval')):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loaded.add(node.id)
+            else:
+                stored.add(node.id)
+        elif isinstance(node, ast.arg):
+            stored.add(node.arg)
+
+    return sorted(loaded - stored - _BUILTINS - {'_rule'})
+
 
 def compiler(dict_rule_set):
     """Policy Rules Compiler.
 
-    Compiles rule set into python executable machine code for enhanced
-    performance during conditional matching.
+    Compiles rule set into table of python functions for enhanced
+    performance during conditional matching. Compilation happens once, each
+    rule is then validated with a plain function call.
+
+    Each rule function has the signature:
+        rule(_rule, **kwargs)
+
+    Where '_rule' is a callable used to validate other rules referenced with
+    '$rule' interpolation, and the kwargs are the policy environment such as
+    'req'. Names referenced within the condition are required keyword
+    arguments.
 
     Example of rule_set in dict format:
 
@@ -55,16 +89,13 @@ def compiler(dict_rule_set):
 
     Args:
         dict_rule_set (dict): Rule Set loaded from JSON file for example.
+
+    Returns:
+        tuple: (dict of rule name to function, dict_rule_set)
     """
 
     with Timer() as elapsed:
-        # MATCH : expression used within rule statements.
-        interpolation_match = re.compile(r"\$[a-z_\-:]+", re.IGNORECASE)
-
-        # Build Rules - Need todo this before compiling.
-        # Some rules reference others.
-        rule_set = '_validate_result = False\n'
-        rule_set += '_rules = {}\n\n'
+        rules = {}
 
         for rule in dict_rule_set:
             # Validate Rules.
@@ -74,39 +105,34 @@ def compiler(dict_rule_set):
                 continue
 
             log.info('Build rule %s = %s' % (rule, dict_rule_set[rule]))
-            condition = dict_rule_set[rule]
-
-            build_rule = ('def ' + rule.replace(':', '_') +
-                          '():\n    return ' +
-                          condition + '\n')
 
-            # Correct build_rule for interpolation.
-            # Any string with '$value' is an expression.
-            for expr in interpolation_match.findall(build_rule):
+            def interpolate(match):
+                # Any string with '$value' is an expression.
+                expr = match.group(0)
                 if expr[1:] not in dict_rule_set:
                     log.error("Missing rule for interpolation of '" + expr +
                               "' in rule '" + rule + "' skipping.")
-                    build_rule = build_rule.replace(expr, 'False')
-                    continue
-
-                build_rule = build_rule.replace(expr, expr.replace(':',
-                                                                   '_')[1:] +
-                                                '()')
-
-            # Add Rule to _rules dictionary for validation to select rule.
-            build_rule += "_rules['" + rule + "'] = " + rule.replace(':', '_')
-            build_rule += '\n\n'
-
-            rule_set += build_rule
-
-        rule_set += '_validate_result = _rules[_validate_rule]()\n'
-
-        # Compile Rules
-        try:
-            compiled = compile(rule_set, 'policy.json.compiled', 'exec')
-            log.info('%s Rules compile completed.' % len(dict_rule_set),
-                     timer=elapsed())
-
-            return (compiled, dict_rule_set)
-        except Exception:
-            raise ValueError("Failed compiling rule_set")
+                    return 'False'
+                return '_rule(%r)' % expr[1:]
+
+            condition = _INTERPOLATION_RE.sub(interpolate,
+                                              dict_rule_set[rule])
+
+            # Compile Rule
+            try:
+                arguments = _arguments(condition)
+                build_rule = 'lambda _rule, '
+                if arguments:
+                    build_rule += '*, ' + ', '.join(arguments) + ', '
+                build_rule += '**_kwargs: (\n' + condition + '\n)'
+                rules[rule] = eval(compile(build_rule,
+                                           'policy.json:' + rule,
+                                           'eval'), {})
+            except Exception:
+                raise ValueError("Failed compiling rule_set rule '%s'" %
+                                 rule) from None
+
+        log.info('%s Rules compile completed.' % len(dict_rule_set),
+                 timer=elapsed())
+
+        return (rules, dict_rule_set)
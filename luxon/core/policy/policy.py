@@ -28,7 +28,6 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 
-from luxon.utils.timer import Timer
 from luxon.core.logger import GetLogger
 from luxon.core.policy import compiler
 from luxon.exceptions import AccessDeniedError
@@ -57,19 +56,39 @@ class Policy(object):
         By default following kwargs are given to policy runtime in wsgi:
             * req being equel to the Request Object for the request.
 
+    Results of rules are memoized for the lifetime of the Policy object,
+    which is the lifetime of the request in wsgi. Rules referenced by other
+    rules are only evaluated once. Use clear() if the environment changes,
+    the request clears its policy when credentials change.
+
     Keyword Args:
         rule_set (dict): Rule Set in dict loaded from JSON file for example.
     """
     __slots__ = ('_kwargs',
-                 '_compiled',
-                 '_rule_set')
+                 '_rules',
+                 '_rule_set',
+                 '_results')
 
     def __init__(self, rule_set=None, **kwargs):
         self._kwargs = kwargs
+        self._results = {}
         if isinstance(rule_set, dict):
-            self._compiled, self._rule_set = compiler(rule_set)
+            self._rules, self._rule_set = compiler(rule_set)
         else:
-            self._compiled, self._rule_set = rule_set
+            self._rules, self._rule_set = rule_set
+
+    def clear(self):
+        """Clear memoized rule results."""
+        self._results.clear()
+
+    def _evaluate(self, rule):
+        try:
+            return self._results[rule]
+        except KeyError:
+            val = self._rules[rule](self._evaluate, **self._kwargs)
+            self._results[rule] = val
+            log.debug('Rule %s validated to %s.' % (rule, val))
+            return val
 
     def validate(self, rule, access_denied_raise=False):
         """Validate Access to view.
@@ -77,28 +96,20 @@ class Policy(object):
         Args:
             view (str): View Name
         """
+        try:
+            return self._results[rule]
+        except KeyError:
+            pass
+
         # Default Value
         val = False
 
-        if rule not in self._rule_set:
+        if rule not in self._rules:
             log.error("No such rule '%s'" % rule)
             return val
 
-        # Import bit, ensures save environment...
-        exec_globals = {'__builtins__': {}}
-        exec_globals = {'_validate_rule': rule}
-
-        # Add Policy environment Kwargs to be referenced in rule_set.
-        exec_globals.update(self._kwargs)
-
         try:
-            with Timer() as elapsed:
-                # Execute compiled rule_set code.
-                exec(self._compiled, exec_globals, exec_globals)
-                # Value from compiled code.
-                val = exec_globals['_validate_result']
-            log.info('Rule %s validated to %s.' % (rule, val),
-                     timer=elapsed())
+            val = self._evaluate(rule)
         except AccessDeniedError as e:
             if access_denied_raise:
                 raise
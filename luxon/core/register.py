@@ -31,6 +31,7 @@ import traceback
 from luxon import g
 
 from luxon import router
+from luxon.constants import WEBSOCKET
 from luxon.core.logger import GetLogger
 
 log = GetLogger(__name__)
@@ -57,6 +58,49 @@ class Register(object):
 
         return resource_wrapper
 
+    def websocket(self, route, tag=None):
+        """Register WebSocket resource. (ASGI only)
+
+        The resource is a coroutine function receiving the Request and
+        luxon.core.handlers.asgi.websocket.WebSocket objects.
+
+        .. code:: python
+
+            @register.websocket('/v1/echo')
+            async def echo(req, ws):
+                await ws.accept()
+                async for message in ws:
+                    await ws.send(message)
+        """
+        def resource_wrapper(func):
+            router.add(WEBSOCKET, route, func, tag)
+            return func
+
+        return resource_wrapper
+
+    def trusted(self, *fields):
+        """JSON sanitization policy for resource.
+
+        By default HTML tags are stripped from strings in JSON request
+        payloads. Without fields the payload is trusted and not sanitized,
+        otherwise values of the object keys provided are not sanitized.
+
+        .. code:: python
+
+            @register.resource('POST', '/v1/page')
+            @register.trusted('html')
+            def page(req, resp):
+                return req.json
+        """
+        def trusted_wrapper(func):
+            if fields:
+                func.json_trusted = frozenset(fields)
+            else:
+                func.json_trusted = True
+            return func
+
+        return trusted_wrapper
+
     def resources(self, *args, name=None, **kwargs):
         def resource_wrapper(cls):
             if name is not None:
@@ -88,17 +132,44 @@ class Register(object):
         return model_wrapper
 
     def middleware(self, middleware_class, *args, **kwargs):
+        """Register middleware.
+
+        Middleware applies to all requests, unless it declares 'routes',
+        'tags' or 'methods' attributes. Scoped middleware only runs for
+        routes matching all of them. Its 'pre' method is processed after
+        routing, before the route tag is validated with policy.
+
+        .. code:: python
+
+            class Session(object):
+                tags = ('users:view', 'users:admin',)
+
+                def pre(self, req, resp):
+                    ...
+
+            register.middleware(Session)
+        """
         try:
             middleware_obj = middleware_class(*args, **kwargs)
 
-            if hasattr(middleware_obj, 'pre'):
-                _middleware_pre.append(middleware_obj.pre)
+            pre = getattr(middleware_obj, 'pre', None)
+            resource = getattr(middleware_obj, 'resource', None)
+            post = getattr(middleware_obj, 'post', None)
+            routes = getattr(middleware_obj, 'routes', None)
+            tags = getattr(middleware_obj, 'tags', None)
+            methods = getattr(middleware_obj, 'methods', None)
+
+            if routes is None and tags is None and methods is None:
+                if pre is not None:
+                    _middleware_pre.append(pre)
+
+                if resource is not None:
+                    _middleware_resource.append(resource)
 
-            if hasattr(middleware_obj, 'resource'):
-                _middleware_resource.append(middleware_obj.resource)
+                if post is not None:
+                    _middleware_post.append(post)
 
-            if hasattr(middleware_obj, 'post'):
-                _middleware_post.append(middleware_obj.post)
+            router.middleware(pre, resource, post, routes, tags, methods)
         except Exception:
             trace = str(traceback.format_exc())
             log.critical("%s" % trace)
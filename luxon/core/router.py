@@ -47,23 +47,151 @@ log = GetLogger(__name__)
 # at all.
 retype = type(re.compile('hello, world'))
 
+# NOTE(cfrademan): Patterns with their own named groups, backreferences or
+# flags can not be safely embedded in a larger alternation. Group numbers
+# shift and names may clash. These are matched on their own instead.
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class RegexRouter(object):
+    """Regex Route Matcher.
+
+    Merges regex routes for a single method into as few compiled
+    alternations as possible, each alternative wrapped in its own named
+    group. The winning group is mapped back to the route tuple, so a miss
+    costs a single match call instead of one per route.
+
+    Routes are tried in the order they were added, the first registered
+    route to match wins.
+    """
+    __slots__ = ('_routes', '_matchers')
+
+    def __init__(self):
+        self._routes = []
+        self._matchers = None
+
+    def __iter__(self):
+        return iter(self._routes)
+
+    def __len__(self):
+        return len(self._routes)
+
+    def append(self, route):
+        """Add route tuple.
+
+        Args:
+            route (tuple): (resource, method, kwargs, route, tag, cache)
+                where route is the compiled regular expression.
+        """
+        self._routes.append(route)
+        # Recompile on next find.
+        self._matchers = None
+
+    @staticmethod
+    def _combinable(expr):
+        if expr.groupindex:
+            return False
+        if expr.flags != re.compile('').flags:
+            return False
+        if _BACKREF_RE.search(expr.pattern):
+            return False
+        return True
+
+    def _compile(self):
+        matchers = []
+        alternates = []
+        names = {}
+
+        def merge():
+            if alternates:
+                matchers.append((re.compile('|'.join(alternates)),
+                                 dict(names)))
+                alternates.clear()
+                names.clear()
+
+        for route in self._routes:
+            expr = route[3]
+            if self._combinable(expr):
+                name = '_r%s' % len(names)
+                alternates.append('(?P<%s>%s)' % (name, expr.pattern))
+                names[name] = route
+            else:
+                merge()
+                matchers.append((expr, route))
+
+        merge()
+
+        self._matchers = matchers
+
+        return matchers
+
+    def find(self, route):
+        """Find route tuple for path.
+
+        Args:
+            route (str): The requested path to route.
+
+        Returns:
+            Route tuple or None if no routes match.
+        """
+        matchers = self._matchers
+        if matchers is None:
+            matchers = self._compile()
+
+        for expr, found in matchers:
+            match = expr.match(route)
+            if match:
+                if isinstance(found, dict):
+                    return found[match.lastgroup]
+                return found
+
+        return None
+
+
+def _scope(values, normalize=None):
+    if values is None:
+        return None
+    values = to_tuple(values)
+    if normalize is not None:
+        values = [normalize(value) for value in values]
+    return frozenset(values)
+
+
+def _route_name(route):
+    if isinstance(route, retype):
+        return route.pattern
+    elif route[0:6].lower() == "regex:":
+        return route[6:]
+    return route.strip('/')
+
 
 class Router(object):
     """ Simple Router Interface.
 
     The router is used to index and return views based on url and method.
 
+    Each route has a middleware chain. The chain is resolved when the route
+    or middleware is added, only middleware that applies to the route is
+    processed for requests to it.
+
     Attributes:
         routes (list): List of tuples containing routes.
             e.g. [ ( 'GET', '/test', 'rule1', resource_view_object), ]
     """
-    __slots__ = ('_routers', '_routes', '_regex_routes', '_methods')
+    __slots__ = ('_routers', '_routes', '_regex_routes', '_methods',
+                 '_middleware', '_chains', '_chain')
 
     def __init__(self):
         self._routers = {}
         self._routes = {}
         self._regex_routes = {}
         self._methods = set([])
+        # Middleware (pre, resource, post, routes, tags, methods).
+        self._middleware = []
+        # Middleware chains for routes (pre, resource, post).
+        self._chains = {}
+        # Middleware chain when no route found.
+        self._chain = ((), [], [],)
 
     @property
     def methods(self):
@@ -118,6 +246,87 @@ class Router(object):
 
         return routes
 
+    def middleware(self, pre=None, resource=None, post=None, routes=None,
+                   tags=None, methods=None):
+        """Add middleware to route middleware chains.
+
+        Middleware without routes, tags and methods applies to all
+        requests. Otherwise the middleware only applies to routes matching
+        all of the given routes, tags and methods.
+
+        Keyword Args:
+            pre (function): Middleware processed before policy validation.
+                Only used when scoped, unscoped 'pre' middleware is
+                processed before routing.
+            resource (function): Middleware processed before resource.
+            post (function): Middleware processed after resource.
+            routes (list): Routes as registered. (URI Templates)
+            tags (list): Route tags.
+            methods (list): Route methods.
+        """
+        routes = _scope(routes, _route_name)
+        tags = _scope(tags)
+        methods = _scope(methods, str.upper)
+        middleware = (pre, resource, post, routes, tags, methods,)
+        self._middleware.append(middleware)
+
+        if routes is None and tags is None and methods is None:
+            self._extend(self._chain, middleware, scoped=False)
+
+        for route in self._routes.values():
+            if self._applies(middleware, route[1], route[3], route[4]):
+                self._extend(self._chains[(route[1], route[3],)],
+                             middleware)
+
+    @staticmethod
+    def _applies(middleware, method, route, tag):
+        pre, resource, post, routes, tags, methods = middleware
+        if routes is not None and _route_name(route) not in routes:
+            return False
+        if tags is not None and tag not in tags:
+            return False
+        if methods is not None and method not in methods:
+            return False
+        return True
+
+    @staticmethod
+    def _extend(chain, middleware, scoped=None):
+        pre, resource, post, routes, tags, methods = middleware
+        if scoped is None:
+            scoped = (routes is not None or
+                      tags is not None or
+                      methods is not None)
+
+        if pre is not None and scoped:
+            chain[0].append(pre)
+        if resource is not None:
+            chain[1].append(resource)
+        if post is not None:
+            chain[2].append(post)
+
+    def _resolve(self, method, route, tag):
+        chain = ([], [], [],)
+        for middleware in self._middleware:
+            if self._applies(middleware, method, route, tag):
+                self._extend(chain, middleware)
+        self._chains[(method, route,)] = chain
+
+    def chain(self, method=None, route=None):
+        """Middleware chain for route.
+
+        Args:
+            method (str): Route method as returned by find.
+            route (str): Route as returned by find.
+
+        Returns:
+            tuple: Lists of (pre, resource, post) middleware methods. Pre
+                only contains route scoped middleware.
+        """
+        try:
+            return self._chains[(method, route,)]
+        except KeyError:
+            return self._chain
+
     def find(self, method, route):
         """Route based on Request Object.
 
@@ -145,9 +354,9 @@ class Router(object):
         except KeyError:
             pass
         try:
-            for regex_route in self._regex_routes[method]:
-                if regex_route[3].match(route):
-                    return regex_route
+            found = self._regex_routes[method].find(route)
+            if found is not None:
+                return found
         except KeyError:
             pass
 
@@ -208,7 +417,7 @@ class Router(object):
                                                                tag,
                                                                cache)
                 except KeyError:
-                    self._regex_routes[method] = []
+                    self._regex_routes[method] = RegexRouter()
                     route = re.compile(route)
                     self._routes['%s:%s' % (method, route)] = (resource,
                                                                method,
@@ -222,6 +431,7 @@ class Router(object):
                     raise exceptions.Error("Bad RE expression for route '%s'" %
                                            route
                                            + ". (%s)" % e)
+                self._resolve(method, route, tag)
         else:
             route = route.strip('/')
             for method in methods:
@@ -255,6 +465,7 @@ class Router(object):
                                                                route,
                                                                tag,
                                                                cache)
+                self._resolve(method, route, tag)
         self._methods.add(method)
         log.info('Added Route: %s' % route +
                  ' Methods: %s' % str(methods) +
@@ -29,13 +29,13 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 import os
 import re
-import mimetypes
 
 from luxon import g
 from luxon import metadata
 from luxon import register
 from luxon import constants as const
 from luxon.structs.htmldoc import HTMLDoc
+from luxon.core.handlers.wsgi.static import static_file
 
 
 @register.resource(['GET', 'POST'],
@@ -52,14 +52,7 @@ def static(req, resp):
     sfile_path = static_path_re.sub('', sfile_path)
     sfile_path = g.app.path.rstrip('/') + '/static' + sfile_path
     if os.path.isfile(sfile_path):
-        sfile = open(sfile_path, 'rb').read()
-        resp.content_type = const.APPLICATION_OCTET_STREAM
-        mime_type = mimetypes.guess_type(sfile_path)
-        if mime_type[0] is not None:
-            resp.content_type = mime_type[0]
-            if mime_type[1] is not None:
-                resp.content_type += ';charset=%s' % mime_type[1]
-        return sfile
+        return static_file(req, resp, sfile_path)
     elif os.path.isdir(sfile_path):
         page = HTMLDoc()
         resp.content_type = const.TEXT_HTML
@@ -45,7 +45,10 @@ def server(app_root=None, ip='127.0.0.1', port='8000'):
         exit()
 
     def number_of_workers():
-        return (multiprocessing.cpu_count() * 4) + 1
+        try:
+            return int(os.environ['WEB_CONCURRENCY'])
+        except (KeyError, ValueError):
+            return (multiprocessing.cpu_count() * 4) + 1
 
     class StandaloneApplication(gunicorn.app.base.BaseApplication):
         def __init__(self, app, options=None):
@@ -65,11 +68,14 @@ def server(app_root=None, ip='127.0.0.1', port='8000'):
 
     print('Loading Application %s' % app_root)
 
+    workers = number_of_workers()
     options = {
         'bind': '%s:%s' % (ip, port),
-        'workers': number_of_workers(),
+        'workers': workers,
         'capture_output': True
     }
+    # Application sizes per worker resources such as metrics on startup.
+    os.environ['WEB_CONCURRENCY'] = str(workers)
     app_root = os.path.abspath(app_root)
     site.addsitedir(os.path.join(os.getcwd(), '../'))
 
@@ -32,6 +32,7 @@ from luxon.core.register import _models
 from luxon.core.register import _sa_models
 from luxon.structs.models.sqlmodel import SQLModel
 from luxon.helpers.sql import sql
+from luxon.core.db.base import schema
 from logging import getLogger
 
 from sqlalchemy.ext.declarative import declarative_base
@@ -75,6 +76,7 @@ def drop_tables(conn):
         if issubclass(Model, SQLModel):
             if conn.has_table(Model.model_name):
                 conn.execute('DROP TABLE %s' % Model.model_name)
+                schema.invalidate(Model.model_name)
 
 
 def create_tables():
@@ -104,6 +106,8 @@ def restore_tables(conn, backup):
     for Model in _models:
         if issubclass(Model, SQLModel):
             if Model.model_name in backup:
-                conn.insert(Model.model_name, backup[Model.model_name])
+                conn.insert(Model.model_name, backup[Model.model_name],
+                            bulk=True)
             else:
-                conn.insert(Model.model_name, Model.db_default_rows)
+                conn.insert(Model.model_name, Model.db_default_rows,
+                            bulk=True)
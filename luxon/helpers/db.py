@@ -30,25 +30,112 @@
 import os
 
 from luxon import g
+from luxon.exceptions import NoContextError
 from luxon.utils.pool import Pool
 from luxon.core.db.mysql import connect
+from luxon.core.db.replicas import Replicas, Replica
 
-_cached_pool = {}
+_cached_router = {}
 
+# Request context key when reads are pinned to write endpoint.
+PINNED = 'db_pinned'
 
-def _get_conn():
+
+def _get_conn(host, port):
     """_get_conn function for internal use
 
-    Returns a connect object populated with the information under
-    the 'database' section
+    Returns a function returning connect object populated with the
+    information under the 'database' section for host.
     """
     kwargs = g.app.config.kwargs('database')
-    if kwargs.get('type') == 'mysql':
-        return connect(kwargs.get('host', '127.0.0.1'),
+
+    def get_conn():
+        return connect(host,
                        kwargs.get('username', 'tachyonic'),
                        kwargs.get('password', 'password'),
                        kwargs.get('database', 'tachyonic'),
-                       port=int(kwargs.get('port', 3306)))
+                       port=port)
+
+    get_conn.__name__ = 'mysql %s:%s' % (host, port,)
+    return get_conn
+
+
+def _pool(host, port):
+    kwargs = g.app.config.kwargs('database')
+    return Pool(
+        _get_conn(host, port),
+        pool_size=int(kwargs.get('pool_size', 64)),
+        max_overflow=int(kwargs.get('max_overflow', 0)),
+        timeout=float(kwargs.get('pool_timeout', 5)),
+        ping_idle=float(kwargs.get('pool_ping_idle', 30)),
+        max_lifetime=float(
+            kwargs.get('pool_max_lifetime', 0)) or None,
+        idle_timeout=float(
+            kwargs.get('pool_idle_timeout', 0)) or None)
+
+
+def _replica(endpoint, port):
+    # Endpoint as host[:port[:weight]]
+    endpoint = endpoint.strip().split(':')
+    host = endpoint[0]
+    if len(endpoint) > 1 and endpoint[1]:
+        port = int(endpoint[1])
+    weight = int(endpoint[2]) if len(endpoint) > 2 else 1
+    return Replica('%s:%s' % (host, port,), _pool(host, port), weight)
+
+
+def router():
+    """Function router - returns database Replicas router for process.
+
+    Write endpoint is 'write' and 'write_port', defaulting to 'host' and
+    'port'. Read replicas are 'read' as comma seperated host:port:weight
+    endpoints. When only 'write' is set, 'host' is used for reads.
+
+    Returns:
+        Replicas object.
+    """
+    global _cached_router
+    pid = os.getpid()
+    try:
+        return _cached_router[pid]
+    except KeyError:
+        pass
+
+    kwargs = g.app.config.kwargs('database')
+    host = kwargs.get('host', '127.0.0.1')
+    port = int(kwargs.get('port', 3306))
+    write_host = kwargs.get('write', host)
+    write_port = int(kwargs.get('write_port', port))
+
+    replicas = []
+    if kwargs.get('read'):
+        for endpoint in kwargs['read'].split(','):
+            if endpoint.strip():
+                replicas.append(_replica(endpoint, port))
+    elif (write_host, write_port,) != (host, port,):
+        replicas.append(_replica(host, port))
+
+    _cached_router[pid] = Replicas(
+        _pool(write_host, write_port),
+        replicas,
+        balance=kwargs.get('read_balance', 'round_robin'),
+        eject=float(kwargs.get('read_eject', 30)),
+        max_lag=float(kwargs.get('read_max_lag', 0)) or None,
+        lag_interval=float(kwargs.get('read_lag_interval', 5)))
+
+    return _cached_router[pid]
+
+
+def pinned():
+    """Reads pinned to write endpoint for current request.
+
+    Reads are pinned once dbw() is used for the request, to read data
+    written before replicated.
+    """
+    try:
+        return g.current_request.context.get(PINNED, False)
+    except NoContextError:
+        return False
 
 
 def db():
@@ -63,25 +150,35 @@ def db():
         * mysql
         * sqlite3
 
+    For MySQL connections are from read replicas when configured, refer
+    to router. Once dbw() is used for a request, the rest of the request
+    uses the write endpoint.
+
+    For SQLite3 each thread reuses its own connection, refer to
+    luxon.core.db.sqlite.thread_connect.
+
     Returns:
          Database Connection object
     """
     kwargs = g.app.config.kwargs('database')
-    global _cached_pool
     if kwargs.get('type') == 'mysql':
-        if _cached_pool.get(os.getpid()) is None:
-            _cached_pool[os.getpid()] = Pool(
-                _get_conn,
-                pool_size=kwargs.get('pool_size', 64),
-                max_overflow=kwargs.get('max_overflow', 0))
-        return _cached_pool[os.getpid()]()
+        if pinned():
+            return router().write()
+        return router().read()
     elif kwargs.get('type') == 'sqlite3':
-        from luxon.core.db.sqlite import connect
+        from luxon.core.db.sqlite import thread_connect
         db = "sqlite3.db"
 
         db = (os.path.abspath(os.path.join(
             g.app.path,
             db)))
-        return connect(db)
+        return thread_connect(
+            db,
+            journal_mode=kwargs.get('sqlite_journal_mode', 'wal'),
+            synchronous=kwargs.get('sqlite_synchronous', 'normal'),
+            busy_timeout=int(kwargs.get('sqlite_busy_timeout', 5000)),
+            cache_size=int(kwargs.get('sqlite_cache_size', -8000)),
+            mmap_size=int(kwargs.get('sqlite_mmap_size', 67108864)),
+            statements=int(kwargs.get('sqlite_statements', 256)))
     else:
         raise TypeError('Unknown Database type defined in configuration')
@@ -27,30 +27,9 @@
 # CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
-import os
-
 from luxon import g
-from luxon.utils.pool import Pool
-from luxon.core.db.mysql import connect
-
-_cached_pool = {}
-
-
-def _get_conn():
-    """_get_conn function for internal use
-
-    Returns a connect object populated with the information under
-    the 'database' section
-    """
-    kwargs = g.app.config.kwargs('database')
-    if kwargs.get('type') == 'mysql':
-        return connect(kwargs.get('write',
-                                  kwargs.get('host', '127.0.0.1')),
-                       kwargs.get('username', 'tachyonic'),
-                       kwargs.get('password', 'password'),
-                       kwargs.get('database', 'tachyonic'),
-                       port=int(kwargs.get('write_port',
-                                           kwargs.get('port', 3306))))
+from luxon.exceptions import NoContextError
+from luxon.helpers.db import db, router, PINNED
 
 
 def dbw():
@@ -60,19 +39,21 @@ def dbw():
 
     Database types and parameters obtained from settings.ini file.
 
-    Write only database connection for MariaDB / MySQL Only.
+    Write database connection for MariaDB / MySQL, the same as db() for
+    sqlite3. Reads using db() for the rest of the request also use the
+    write endpoint.
 
     Returns:
          Database Connection object
     """
     kwargs = g.app.config.kwargs('database')
-    global _cached_pool
     if kwargs.get('type') == 'mysql':
-        if _cached_pool.get(os.getpid()) is None:
-            _cached_pool[os.getpid()] = Pool(
-                _get_conn,
-                pool_size=kwargs.get('pool_size', 64),
-                max_overflow=kwargs.get('max_overflow', 0))
-        return _cached_pool[os.getpid()]()
+        try:
+            g.current_request.context[PINNED] = True
+        except NoContextError:
+            pass
+        return router().write()
+    elif kwargs.get('type') == 'sqlite3':
+        return db()
     else:
         raise TypeError('Unknown Database type defined in configuration')
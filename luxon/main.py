@@ -41,12 +41,13 @@ from datetime import timedelta
 
 from luxon import metadata
 from luxon.core.servers.web import server as web_server
-from luxon import db
+from luxon import dbw
 from luxon.utils.rsa import RSAKey
 from luxon.utils.crypto import Crypto
 from luxon.utils.files import mkdir
 from luxon.utils.pkg import Module
 from luxon.core.utils import models
+from luxon.core.db.base import schema
 from luxon.utils.files import Open, chmod, exists, ls, rm, joinpath
 from luxon.core.config import Config
 from luxon.utils.timezone import now
@@ -163,7 +164,10 @@ def db_crud(args):
 
     # Backup Database model tables.
     backups = {}
-    with db() as conn:
+    with dbw() as conn:
+        # Tables may have changed since loaded by application.
+        schema.invalidate()
+
         # Backup Tables.
         backups = models.backup_tables(conn)
 
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Christiaan Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+from luxon.utils.compress import negotiate, ENCODINGS
+
+
+class Compress(object):
+    """Response compression middleware.
+
+    Negotiates content encoding from the Accept-Encoding request header and
+    compresses the response body as it is returned to the server.
+    Brotli ('br') is only offered when the 'brotli' package is installed.
+
+    .. code:: python
+
+        from luxon import register
+        from luxon.middleware.compress import Compress
+
+        register.middleware(Compress, min_size=1024)
+
+    Keyword Args:
+        level (int): Compression level.
+        min_size (int): Minimum body size in bytes for compression.
+        encodings (tuple): Supported encodings in order of preference.
+    """
+    __slots__ = ('_level', '_min_size', '_encodings',)
+
+    def __init__(self, level=6, min_size=1024, encodings=ENCODINGS):
+        self._level = level
+        self._min_size = min_size
+        self._encodings = encodings
+
+    def pre(self, req, resp):
+        encoding = negotiate(req.get_header('Accept-Encoding'),
+                             self._encodings)
+        if encoding is not None:
+            resp.compress(encoding, self._level, self._min_size)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2019 Christiaan Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import re
+import hmac
+import time
+import cProfile
+from random import random
+
+from luxon import g
+from luxon.core.logger import GetLogger
+from luxon.core.router import retype
+
+log = GetLogger(__name__)
+
+# Characters not used in profile file names.
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def _safe(value, length=64):
+    return _UNSAFE.sub('_', str(value)).strip('_')[:length]
+
+
+class Profile(object):
+    """Request profiling middleware.
+
+    Profiles a sample of requests with cProfile. Requests carrying the
+    trusted header with the configured token are always profiled. Each
+    profile is written as a pstats file named after the request time, id,
+    method, route and tag. Only the newest 'backups' files are kept.
+
+    Requests not selected only cost a random number, unless the header
+    is configured.
+
+    .. code:: python
+
+        from luxon import register
+        from luxon.middleware.profile import Profile
+
+        register.middleware(Profile, rate=0.001,
+                            header='X-Profile', token='secret')
+
+    Profiles can be viewed with pstats, snakeviz or converted with
+    gprof2dot.
+
+    Keyword Args:
+        rate (float): Fraction of requests profiled. (0 to 1)
+        header (str): Request header to profile request.
+        token (str): Value of header required to profile request.
+        path (str): Directory of profiles. (default: app tmp/profile)
+        backups (int): Maximum number of profiles kept.
+        routes (list): Only profile routes. (URI Templates)
+        tags (list): Only profile routes with tags.
+        methods (list): Only profile methods.
+    """
+    __slots__ = ('_rate', '_header', '_token', '_path', '_backups',
+                 'routes', 'tags', 'methods',)
+
+    def __init__(self, rate=0.01, header=None, token=None, path=None,
+                 backups=100, routes=None, tags=None, methods=None):
+        if header is not None and not token:
+            # NOTE(cfrademan): Without token anyone could profile requests.
+            raise ValueError("Profile header requires token")
+
+        self._rate = rate
+        self._header = header
+        self._token = token.encode() if token else None
+        self._path = path
+        self._backups = backups
+        self.routes = routes
+        self.tags = tags
+        self.methods = methods
+
+    def _selected(self, req):
+        if self._header is not None:
+            value = req.get_header(self._header)
+            if value and hmac.compare_digest(value.encode(), self._token):
+                return True
+        return self._rate > 0 and random() < self._rate
+
+    def pre(self, req, resp):
+        if not self._selected(req):
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this thread.
+            return
+
+        req.context['profile'] = profile
+
+    def post(self, req, resp, error):
+        profile = req.context.pop('profile', None)
+        if profile is None:
+            return
+
+        profile.disable()
+
+        route = req.route_template
+        if route is None:
+            route = req.route
+        elif isinstance(route, retype):
+            route = route.pattern
+
+        path = self._path
+        if path is None:
+            path = os.path.join(g.app.path, 'tmp', 'profile')
+
+        name = '%s_%s_%s_%s' % (time.strftime('%Y%m%d%H%M%S'),
+                                req.id,
+                                req.method,
+                                _safe(route) or 'root')
+        if req.tag:
+            name += '_' + _safe(req.tag)
+        name = os.path.join(path, name + '.pstats')
+
+        try:
+            os.makedirs(path, exist_ok=True)
+            profile.dump_stats(name)
+            self._rotate(path)
+        except OSError as e:
+            log.error("Unable to write profile '%s' (%s)" % (name, e,))
+            return
+
+        log.info("Profiled request '%s %s' route '%s' tag '%s'"
+                 " written to '%s'" % (req.method, req.route, route,
+                                       req.tag, name,))
+
+    def _rotate(self, path):
+        # NOTE(cfrademan): File names start with time, sorting by name
+        # orders them from oldest to newest.
+        profiles = sorted(name for name in os.listdir(path)
+                          if name.endswith('.pstats'))
+        for name in profiles[:max(len(profiles) - self._backups, 0)]:
+            try:
+                os.unlink(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
@@ -27,7 +27,7 @@
 # CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
-from luxon import db
+from luxon import dbw
 
 
 class Mysql(object):
@@ -39,7 +39,7 @@ class Mysql(object):
         name = self._model.model_name
         model_fields = self._model.fields
 
-        with db() as conn:
+        with dbw() as conn:
             if conn.has_table(name):
                 # NOTE(cfrademan): Drop exisiting name..
                 conn.execute("DROP TABLE %s" % name)
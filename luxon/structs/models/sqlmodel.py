@@ -29,11 +29,13 @@
 # THE POSSIBILITY OF SUCH DAMAGE.
 from luxon import g
 from luxon import db
+from luxon import dbw
 from luxon.structs.models.model import Model
 from luxon.structs.models.fields.sqlfields import SQLFields
 from luxon import exceptions
 from luxon.utils.imports import get_class
 from luxon.utils.sql import build_where
+from luxon.core.db.base import schema
 from luxon.exceptions import SQLIntegrityError, ValidationError, FieldError
 
 
@@ -115,7 +117,7 @@ class SQLModel(Model, SQLFields):
         transaction = self._pre_commit()[1]
 
         try:
-            conn = db()
+            conn = dbw()
             for field in self.fields:
                 # Another laggy bit of code to process.
                 # However needed to check for duplicates with None values...
@@ -225,3 +227,4 @@ class SQLModel(Model, SQLFields):
         driver = get_class('luxon.structs.models.sql.%s:%s' %
                            (api, driver_cls,))(cls)
         driver.create()
+        schema.invalidate(cls.model_name)
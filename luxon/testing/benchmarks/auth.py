@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import timeit
+import tempfile
+
+from authlib.jose import jwt
+
+from luxon import g
+from luxon.core.app import App
+from luxon.core.auth import Auth, auth_cache_info, auth_cache_clear
+from luxon.utils.rsa import RSAKey
+
+
+def _app(path):
+    rsakey = RSAKey()
+    with open(path + '/private.pem', 'w') as f:
+        f.write(rsakey.generate_private_key())
+    with open(path + '/public.pem', 'w') as f:
+        f.write(rsakey.public_key)
+    g.app = App("Benchmark", path=path, ini=False)
+
+
+def benchmark(number=1000):
+    """Compare authenticated request credentials with and without caches.
+
+    Each call emulates RequestBase.credentials for a request carrying a
+    token. Uncached reads both keys from disk and verifies the token with the
+    PEM, as every request did prior to the key store and token cache.
+
+    Keyword Args:
+        number (int): Number of requests to time.
+
+    Returns:
+        tuple: (uncached, cached) requests per second.
+    """
+    auth = Auth(expire=3600)
+    auth.new('benchmark', roles=['Administrator'])
+    token = auth.token
+
+    def credentials():
+        auth = Auth()
+        auth.token = token
+        return auth.user_id
+
+    def uncached():
+        with open(g.app.path + '/private.pem', 'rb') as f:
+            f.read()
+        with open(g.app.path + '/public.pem', 'rb') as f:
+            claims = jwt.decode(token, f.read())
+        claims.validate()
+        return claims.get('user_id')
+
+    uncached_time = timeit.timeit(uncached, number=number)
+    auth_cache_clear()
+    credentials()
+    cached_time = timeit.timeit(credentials, number=number)
+
+    return (number / uncached_time, number / cached_time)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as path:
+        _app(path)
+        uncached, cached = benchmark()
+    print('%18s %18s %8s' % ('uncached (req/s)', 'cached (req/s)',
+                             'speedup'))
+    print('%18.0f %18.0f %7.1fx' % (uncached, cached, cached / uncached))
+    print(auth_cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import sys
+import json
+import time
+import platform
+from statistics import mean
+
+from luxon.utils.timezone import now
+
+
+def measure(func, number=1000, warmup=100):
+    """Measure function calls.
+
+    Args:
+        func (callable): Function to call without arguments.
+
+    Keyword Args:
+        number (int): Number of calls to measure.
+        warmup (int): Number of calls before measuring.
+
+    Returns:
+        dict: ops (calls per second), mean, p50, p95 and p99 latency in
+              microseconds.
+    """
+    for _ in range(warmup):
+        func()
+
+    timer = time.perf_counter
+    latencies = []
+    for _ in range(number):
+        start = timer()
+        func()
+        latencies.append(timer() - start)
+
+    latencies.sort()
+
+    def percentile(percent):
+        return latencies[min(int(number * percent / 100), number - 1)] * 1e6
+
+    return {'ops': number / sum(latencies),
+            'mean': mean(latencies) * 1e6,
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99)}
+
+
+def save(results, path):
+    """Save results as JSON baseline.
+
+    Args:
+        results (dict): Benchmark name to measure() result.
+        path (str): Path to JSON file.
+    """
+    baseline = {'created': now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results}
+
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+
+
+def load(path):
+    """Load results from JSON baseline.
+
+    Args:
+        path (str): Path to JSON file.
+
+    Returns:
+        dict: Benchmark name to measure() result.
+    """
+    with open(path, 'r') as f:
+        return json.load(f)['results']
+
+
+def compare(baseline, results, threshold=10.0):
+    """Compare results with baseline.
+
+    A benchmark has regressed when its calls per second dropped by more than
+    threshold percent. Benchmarks not in both are ignored.
+
+    Args:
+        baseline (dict): Baseline results.
+        results (dict): Current results.
+
+    Keyword Args:
+        threshold (float): Regression threshold in percent.
+
+    Returns:
+        list: Tuples of (name, baseline ops, ops, change percent, regressed).
+    """
+    comparison = []
+    for name in results:
+        if name not in baseline:
+            continue
+
+        before = baseline[name]['ops']
+        after = results[name]['ops']
+        change = 100 * (after - before) / before
+        comparison.append((name, before, after, change,
+                           change < -threshold,))
+
+    return comparison
+
+
+def report(results, comparison=None, file=sys.stdout):
+    """Print results and comparison.
+
+    Args:
+        results (dict): Benchmark name to measure() result.
+
+    Keyword Args:
+        comparison (list): Result of compare().
+        file (obj): Output stream.
+    """
+    print('%-28s %12s %10s %10s %10s %10s' % ('benchmark', 'ops/s',
+                                              'mean (us)', 'p50 (us)',
+                                              'p95 (us)', 'p99 (us)'),
+          file=file)
+    for name, result in results.items():
+        print('%-28s %12.0f %10.2f %10.2f %10.2f %10.2f' % (
+            name, result['ops'], result['mean'], result['p50'],
+            result['p95'], result['p99']), file=file)
+
+    if comparison:
+        print('', file=file)
+        print('%-28s %12s %12s %9s' % ('benchmark', 'baseline ops/s',
+                                       'ops/s', 'change'), file=file)
+        for name, before, after, change, regressed in comparison:
+            print('%-28s %12.0f %12.0f %8.1f%%%s' % (
+                name, before, after, change,
+                ' REGRESSION' if regressed else ''), file=file)
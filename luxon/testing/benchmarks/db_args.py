@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import timeit
+
+from luxon.core.db.base.args import (args_to, args_cache_clear,
+                                     args_cache_info)
+
+CAST_MAP = ()
+
+
+def _query(placeholders):
+    return ('SELECT * FROM benchmark WHERE ' +
+            ' AND '.join(['col%s = %%s' % i for i in range(placeholders)]))
+
+
+def benchmark(placeholders, number=10000):
+    """Compare cached and uncached query placeholder translation.
+
+    Uncached clears the translation cache before every call, which costs
+    the same as translating the query on every execute.
+
+    Args:
+        placeholders (int): Number of placeholders in query.
+
+    Keyword Args:
+        number (int): Number of calls to time.
+
+    Returns:
+        tuple: (uncached, cached) seconds per call.
+    """
+    query = _query(placeholders)
+    args = list(range(placeholders))
+
+    def uncached():
+        args_cache_clear()
+        args_to(query, args, 'qmark', CAST_MAP)
+
+    def cached():
+        args_to(query, args, 'qmark', CAST_MAP)
+
+    uncached_time = timeit.timeit(uncached, number=number) / number
+    args_cache_clear()
+    cached_time = timeit.timeit(cached, number=number) / number
+
+    return (uncached_time, cached_time)
+
+
+def main():
+    print('%12s %14s %14s %8s' % ('placeholders', 'uncached (us)',
+                                  'cached (us)', 'speedup'))
+    for placeholders in (1, 10, 100):
+        uncached, cached = benchmark(placeholders)
+        print('%12s %14.2f %14.2f %7.1fx' % (placeholders,
+                                             uncached * 1000000,
+                                             cached * 1000000,
+                                             uncached / cached))
+    print(args_cache_info())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import timeit
+from datetime import datetime
+
+from luxon.core.db.base.parse import Decoder, parse_row
+
+COLUMNS = ('id', 'name', 'email', 'enabled', 'created', 'updated',
+           'domain', 'tenant_id', 'region', 'notes',)
+
+
+def _rows(count):
+    created = datetime(2020, 1, 2, 3, 4, 5)
+    return [(row, 'name %s' % row, 'user%s@example.com' % row, 1, created,
+             None, 'default', 'tenant', 'region', 'notes')
+            for row in range(count)]
+
+
+def benchmark(count, number=20):
+    """Compare per-row parse_row with bulk decoding.
+
+    Per-row decoding builds a dict for each row and checks the type of
+    every value, bulk decoding resolves datetime columns once.
+
+    Args:
+        count (int): Rows in result set.
+
+    Keyword Args:
+        number (int): Number of result sets to time.
+
+    Returns:
+        tuple: (per row, bulk) seconds per result set.
+    """
+    rows = _rows(count)
+
+    def per_row():
+        [parse_row(dict(zip(COLUMNS, row))) for row in rows]
+
+    def bulk():
+        Decoder(COLUMNS)(rows)
+
+    per_row_time = timeit.timeit(per_row, number=number) / number
+    bulk_time = timeit.timeit(bulk, number=number) / number
+
+    return (per_row_time, bulk_time)
+
+
+def main():
+    print('%8s %14s %14s %8s' % ('rows', 'per row (ms)',
+                                 'bulk (ms)', 'speedup'))
+    for count in (10, 1000, 10000):
+        per_row, bulk = benchmark(count)
+        print('%8s %14.3f %14.3f %7.1fx' % (count,
+                                            per_row * 1000,
+                                            bulk * 1000,
+                                            per_row / bulk))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import gc
+import time
+import tracemalloc
+from array import array
+import math
+
+from luxon.utils.sharding import build_ring, numpy
+
+RING_POWERS = range(16, 25)
+
+
+def build_ring_per_slot(nodes, ring_power):
+    """Reference ring builder filling one slot at a time.
+
+    This is the original algorithem prior to bulk filling, used to compare
+    build time and memory usage and to validate identical placement.
+
+    Args:
+        nodes (list): List of nodes. ( weight, node_id )
+        ring_power (int): Bits of ring size.
+
+    Returns:
+        array: Ring.
+    """
+    ring = array('L')
+    slots = 2 ** ring_power
+
+    total_weight = sum([node[0] for node in nodes])
+
+    slot = 0
+    for node in nodes:
+        weight = node[0]
+        desired = math.ceil(slots / total_weight * weight)
+
+        for _ in range(int(math.ceil(desired))):
+            if slot == slots:
+                break
+
+            ring.append(node[1])
+            slot += 1
+
+    return ring
+
+
+def _measure(builder, *args, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    ring = builder(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (ring, elapsed, peak, len(ring) * ring.itemsize)
+
+
+def benchmark(ring_power, nodes=4096):
+    """Compare per slot and bulk ring builders.
+
+    Args:
+        ring_power (int): Bits of ring size.
+
+    Keyword Args:
+        nodes (int): Number of equally weighted nodes.
+
+    Returns:
+        dict: Backend to (seconds, peak bytes, ring bytes).
+    """
+    nodes = [(1.0, node_id) for node_id in range(nodes)]
+    results = {}
+
+    reference, *results['per-slot'] = _measure(build_ring_per_slot,
+                                               nodes, ring_power)
+    backends = ['array']
+    if numpy is not None:
+        backends.append('numpy')
+
+    for backend in backends:
+        ring, *results[backend] = _measure(build_ring, nodes, ring_power,
+                                           backend=backend)
+        if ring != array(ring.typecode, reference):
+            raise AssertionError("Ring placement differs for '%s'" %
+                                 backend)
+
+    return results
+
+
+def main():
+    print('%5s %10s %10s %12s %12s' % ('power', 'builder', 'time (s)',
+                                       'peak (KiB)', 'ring (KiB)'))
+    for ring_power in RING_POWERS:
+        for builder, result in benchmark(ring_power).items():
+            elapsed, peak, size = result
+            print('%5s %10s %10.3f %12d %12d' % (ring_power, builder,
+                                                 elapsed,
+                                                 peak / 1024,
+                                                 size / 1024))
+
+
+if __name__ == '__main__':
+    main()
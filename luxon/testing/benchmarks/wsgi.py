@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import sys
+import json
+import argparse
+import tempfile
+from collections import OrderedDict
+
+from luxon import g
+from luxon import router
+from luxon import register
+from luxon.core.register import _middleware_pre
+from luxon.core.handlers.wsgi import Wsgi
+from luxon.core.handlers.wsgi.request import Request
+from luxon.core.handlers.wsgi.response import Response
+from luxon.helpers.policy import policy
+from luxon.testing.wsgi.mock import StartResponseMock
+from luxon.testing.wsgi.request import environ
+from luxon.testing.benchmarks.baseline import (measure, save, load,
+                                               compare, report)
+
+SETTINGS = """[application]
+name = Benchmark
+log_level = ERROR
+log_stdout = False
+"""
+
+POLICY = {'benchmark:view': "req.method == 'GET' and $benchmark:login",
+          'benchmark:login': "req.route.startswith('/benchmark')"}
+
+BOUNDARY = '---------------------------88571074919314010861842727997'
+
+FORM = ('--%s\r\n' % BOUNDARY +
+        'Content-Disposition: form-data; name="text"\r\n\r\n' +
+        'benchmark\r\n' +
+        '--%s\r\n' % BOUNDARY +
+        'Content-Disposition: form-data; name="file"; filename="file"\r\n' +
+        'Content-Type: application/octet-stream\r\n\r\n' +
+        'benchmark' * 100 + '\r\n' +
+        '--%s--\r\n' % BOUNDARY)
+
+HEADERS = {'Accept': 'application/json',
+           'Accept-Encoding': 'gzip, deflate, br',
+           'Accept-Language': 'en-US,en;q=0.5',
+           'Cache-Control': 'no-cache',
+           'Connection': 'keep-alive',
+           'Cookie': 'tachyonic.org=a8f5f167f44f4964e6c998dee827110c',
+           'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:68.0)' +
+                         ' Gecko/20100101 Firefox/68.0',
+           'X-Auth-Token': 'benchmark',
+           'X-Tenant-Id': 'benchmark'}
+
+DOCUMENT = {'id': 'a8f5f167-f44f-4964-e6c9-98dee827110c',
+            'name': 'Benchmark',
+            'enabled': True,
+            'ratio': 0.5,
+            'tags': ['wsgi', 'benchmark', 'luxon'],
+            'metadata': {'created': '2020-01-01 00:00:00',
+                         'items': list(range(20))}}
+
+PAYLOAD = json.dumps({'payload': [DOCUMENT] * 10})
+
+
+class Middleware(object):
+    def pre(self, req, resp):
+        pass
+
+    def resource(self, req, resp):
+        pass
+
+    def post(self, req, resp, error):
+        pass
+
+
+def view(req, resp, **kwargs):
+    return DOCUMENT
+
+
+def setup(path):
+    """Create benchmark application.
+
+    Args:
+        path (str): Application root for 'settings.ini' and 'policy.json'.
+
+    Returns:
+        obj: WSGI application.
+    """
+    with open(path + '/settings.ini', 'w') as f:
+        f.write(SETTINGS)
+
+    with open(path + '/policy.json', 'w') as f:
+        json.dump(POLICY, f)
+
+    app = Wsgi(__name__, path)
+
+    router.add('GET', '/benchmark/static', view)
+    router.add('GET', '/benchmark/template/{id}/{name}', view)
+    router.add('GET', 'regex:^/benchmark/regex/[0-9]+$', view)
+    router.add('GET', '/benchmark/policy', view, tag='benchmark:view')
+
+    register.middleware(Middleware)
+
+    return app
+
+
+def _request(env):
+    env['wsgi.input'].seek(0)
+    return Request(env, StartResponseMock())
+
+
+def benchmarks(app):
+    """WSGI hot-path benchmarks.
+
+    Names are prefixed by phase, 'request' measures complete requests.
+
+    Args:
+        app (obj): WSGI application from setup().
+
+    Returns:
+        OrderedDict: Benchmark name to function.
+    """
+    cases = OrderedDict()
+
+    def app_request(path):
+        env = environ(path=path, headers=HEADERS)
+
+        def run():
+            for chunk in app(env.copy(), StartResponseMock()):
+                pass
+
+        return run
+
+    cases['request.static'] = app_request('/benchmark/static')
+    cases['request.template'] = app_request('/benchmark/template/1/luxon')
+    cases['request.regex'] = app_request('/benchmark/regex/1')
+    cases['request.policy'] = app_request('/benchmark/policy')
+
+    cases['router.static'] = lambda: router.find(
+        'GET', '/benchmark/static')
+    cases['router.template'] = lambda: router.find(
+        'GET', '/benchmark/template/1/luxon')
+    cases['router.regex'] = lambda: router.find(
+        'GET', '/benchmark/regex/1')
+
+    get_env = environ(path='/benchmark/static', headers=HEADERS)
+    json_env = environ(method='POST', path='/benchmark/static',
+                       headers={**HEADERS,
+                                'Content-Type': 'application/json',
+                                'Content-Length': str(len(PAYLOAD))},
+                       body=PAYLOAD)
+    form_env = environ(method='POST', path='/benchmark/static',
+                       headers={**HEADERS,
+                                'Content-Type': 'multipart/form-data; ' +
+                                                'boundary=' + BOUNDARY,
+                                'Content-Length': str(len(FORM))},
+                       body=FORM)
+
+    cases['request.init'] = lambda: _request(get_env)
+    cases['request.headers'] = lambda: _request(get_env).headers
+    cases['request.json'] = lambda: _request(json_env).json
+    cases['request.form'] = lambda: _request(form_env).form
+
+    def response_json():
+        Response(get_env, StartResponseMock()).body(DOCUMENT)
+
+    cases['response.json'] = response_json
+
+    def middleware():
+        req = _request(get_env)
+        resp = Response(get_env, StartResponseMock())
+        for middleware in _middleware_pre:
+            middleware(req, resp)
+        req.middleware = router.chain('GET', '/benchmark/static')
+        for middleware in req.middleware[0]:
+            middleware(req, resp)
+        for middleware in req.middleware[1]:
+            middleware(req, resp)
+        for middleware in reversed(req.middleware[2]):
+            middleware(req, resp, False)
+
+    cases['middleware.dispatch'] = middleware
+
+    policy_env = environ(path='/benchmark/policy', headers=HEADERS)
+
+    def policy_validate():
+        policy(req=_request(policy_env), g=g).validate('benchmark:view')
+
+    cases['policy.validate'] = policy_validate
+
+    return cases
+
+
+def run(number=1000, warmup=100, match=None):
+    """Run WSGI benchmarks.
+
+    Keyword Args:
+        number (int): Calls measured per benchmark.
+        warmup (int): Calls before measuring.
+        match (str): Only run benchmarks with names containing match.
+
+    Returns:
+        OrderedDict: Benchmark name to measure() result.
+    """
+    results = OrderedDict()
+    with tempfile.TemporaryDirectory() as path:
+        app = setup(path)
+        for name, func in benchmarks(app).items():
+            if match and match not in name:
+                continue
+            results[name] = measure(func, number, warmup)
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m luxon.testing.benchmarks.wsgi',
+        description='Luxon WSGI hot-path benchmarks')
+    parser.add_argument('-n', '--number', type=int, default=1000,
+                        help='Calls measured per benchmark')
+    parser.add_argument('-w', '--warmup', type=int, default=100,
+                        help='Calls before measuring')
+    parser.add_argument('-m', '--match',
+                        help='Only benchmarks with names containing MATCH')
+    parser.add_argument('-s', '--save',
+                        help='Save results as JSON baseline')
+    parser.add_argument('-b', '--baseline',
+                        help='Compare results with JSON baseline')
+    parser.add_argument('-t', '--threshold', type=float, default=10.0,
+                        help='Regression threshold percent (default 10)')
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.warmup, args.match)
+
+    comparison = None
+    if args.baseline and os.path.isfile(args.baseline):
+        comparison = compare(load(args.baseline), results, args.threshold)
+
+    report(results, comparison)
+
+    if args.save:
+        save(results, args.save)
+
+    if comparison and any(regressed for *_, regressed in comparison):
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -37,50 +37,78 @@ from luxon.testing.wsgi.mock import StartResponseMock
 from luxon.testing.wsgi.result import Result
 
 
+def environ(method='GET', path='/', query_string='', headers={},
+            body=None, wsgierrors=sys.stdout, protocol='http',
+            file_wrapper=None):
+    """Mock WSGI environ for request.
+
+    Keyword Args:
+        method (str): HTTP Method.
+        path (str): Request route.
+        query_string (str): Query string without '?'.
+        headers (dict): HTTP Request Headers.
+        body (str/bytes): Request body.
+        wsgierrors (obj): Stream for 'wsgi.errors'.
+        protocol (str): URL scheme.
+        file_wrapper (callable): Server 'wsgi.file_wrapper'.
+
+    Returns:
+        dict: WSGI environ.
+    """
+    if not path.startswith('/'):
+        raise ValueError("path must start with '/'")
+
+    if query_string and query_string.startswith('?'):
+        raise ValueError("query_string should not start with '?'")
+
+    if '?' in path:
+        raise ValueError(
+            'path may not contain a query string. Please use the '
+            'query_string parameter instead.'
+        )
+
+    env = {}
+    env['REQUEST_METHOD'] = method.upper()
+    env['HTTP_HOST'] = 'tachyonic.org'
+    env['SCRIPT_NAME'] = '/wsgi'
+    env['PATH_INFO'] = path
+    env['SERVER_NAME'] = 'tachyonic.org'
+    env['SERVER_PORT'] = '80'
+    env['SRRVER_PROTOCOL'] = 'HTTP/1/1'
+    env['QUERY_STRING'] = query_string
+    env['wsgi.errors'] = wsgierrors
+    env['wsgi.input'] = BytesIO()
+    if body is not None:
+        body = if_unicode_to_bytes(body)
+        env['wsgi.input'].write(body)
+        env['wsgi.input'].seek(0)
+        env['CONTENT_LENGTH'] = str(len(body))
+    env['wsgi.multiprocess'] = True
+    env['wsgi.multithread'] = True
+    env['wsgi.run_once'] = False
+    env['wsgi.url_scheme'] = protocol
+    env['wsgi.version'] = (1, 0)
+    if file_wrapper is not None:
+        env['wsgi.file_wrapper'] = file_wrapper
+
+    for header in headers:
+        if header.lower() == 'content-type':
+            env['CONTENT_TYPE'] = headers[header]
+        elif header.lower() == 'content-length':
+            env['CONTENT_LENGTH'] = headers[header]
+        else:
+            wsgi_name = 'HTTP_' + header.upper().replace('-', '_')
+            env[wsgi_name] = headers[header]
+
+    return env
+
+
 def request(app, method='GET', path='/', query_string='',
             headers={}, body=None, file_wrapper=None,
             wsgierrors=sys.stdout, protocol='http'):
 
-        if not path.startswith('/'):
-            raise ValueError("path must start with '/'")
-
-        if query_string and query_string.startswith('?'):
-            raise ValueError("query_string should not start with '?'")
-
-        if '?' in path:
-            raise ValueError(
-                'path may not contain a query string. Please use the '
-                'query_string parameter instead.'
-            )
-
-        env = {}
-        env['REQUEST_METHOD'] = method.upper()
-        env['HTTP_HOST'] = 'tachyonic.org'
-        env['SCRIPT_NAME'] = '/wsgi'
-        env['PATH_INFO'] = path
-        env['SERVER_NAME'] = 'tachyonic.org'
-        env['SERVER_PORT'] = '80'
-        env['SRRVER_PROTOCOL'] = 'HTTP/1/1'
-        env['QUERY_STRING'] = query_string
-        env['wsgi.errors'] = wsgierrors
-        env['wsgi.input'] = BytesIO()
-        if body is not None:
-            env['wsgi.input'].write(if_unicode_to_bytes(body))
-            env['wsgi.input'].seek(0)
-        env['wsgi.multiprocess'] = True
-        env['wsgi.multithread'] = True
-        env['wsgi.run_once'] = False
-        env['wsgi.url_scheme'] = protocol
-        env['wsgi.version'] = (1, 0)
-
-        for header in headers:
-            if header.lower() == 'content-type':
-                env['CONTENT_TYPE'] = headers[header]
-            elif header.lower() == 'content-length':
-                env['CONTENT_LENGTH'] = headers[header]
-            else:
-                wsgi_name = 'HTTP_' + header.upper().replace('-', '_')
-                env[wsgi_name] = headers[header]
+        env = environ(method, path, query_string, headers, body,
+                      wsgierrors, protocol, file_wrapper)
 
         srmock = StartResponseMock()
 
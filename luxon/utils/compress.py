@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Supported content encodings in order of preference.
+if brotli is not None:
+    ENCODINGS = ('br', 'gzip', 'deflate',)
+else:
+    ENCODINGS = ('gzip', 'deflate',)
+
+# Content types not worth compressing. Prefixes end with '/'.
+INCOMPRESSIBLE = ('image/',
+                  'audio/',
+                  'video/',
+                  'font/woff',
+                  'application/zip',
+                  'application/gzip',
+                  'application/x-gzip',
+                  'application/x-bzip2',
+                  'application/x-xz',
+                  'application/x-7z-compressed',
+                  'application/x-rar-compressed',
+                  'application/pdf',
+                  'application/octet-stream',)
+
+# Compressible exceptions to INCOMPRESSIBLE prefixes.
+_COMPRESSIBLE = ('image/svg+xml',
+                 'image/x-icon',
+                 'image/bmp',)
+
+
+def accept_encodings(header):
+    """Parse Accept-Encoding header.
+
+    Args:
+        header (str): Value of Accept-Encoding header.
+
+    Returns:
+        dict: Lower case encoding as key and quality value as float.
+    """
+    encodings = {}
+    if header:
+        for value in header.split(','):
+            encoding, _, params = value.partition(';')
+            encoding = encoding.strip().lower()
+            if not encoding:
+                continue
+            quality = 1.0
+            params = params.replace(' ', '')
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    continue
+            encodings[encoding] = quality
+
+    return encodings
+
+
+def negotiate(header, encodings=ENCODINGS):
+    """Select content encoding for response.
+
+    The encoding with highest quality value wins, ties are resolved by order
+    of preference in encodings. Encodings with a quality of 0 are never
+    selected.
+
+    Args:
+        header (str): Value of Accept-Encoding header.
+        encodings (tuple): Supported encodings in order of preference.
+
+    Returns:
+        str: Selected encoding or None for identity.
+    """
+    accepted = accept_encodings(header)
+    wildcard = accepted.get('*', 0)
+
+    selected = None
+    selected_quality = 0
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > selected_quality:
+            selected = encoding
+            selected_quality = quality
+
+    return selected
+
+
+def compressible(content_type):
+    """Whether content type benefits from compression.
+
+    Args:
+        content_type (str): Mime type, parameters are ignored.
+
+    Returns:
+        bool: False for already compressed formats.
+    """
+    if not content_type:
+        return True
+
+    content_type = content_type.partition(';')[0].strip().lower()
+    if content_type in _COMPRESSIBLE:
+        return True
+
+    return not content_type.startswith(INCOMPRESSIBLE)
+
+
+class Compressor(object):
+    """Incremental compressor for content encoding.
+
+    Args:
+        encoding (str): 'br', 'gzip' or 'deflate'.
+
+    Keyword Args:
+        level (int): Compression level 1 to 9. For brotli used as quality.
+    """
+    __slots__ = ('_compress', '_flush',)
+
+    def __init__(self, encoding, level=6):
+        if encoding == 'gzip':
+            obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._compress = obj.compress
+            self._flush = obj.flush
+        elif encoding == 'deflate':
+            obj = zlib.compressobj(level, zlib.DEFLATED, 15)
+            self._compress = obj.compress
+            self._flush = obj.flush
+        elif encoding == 'br' and brotli is not None:
+            obj = brotli.Compressor(quality=min(level, 11))
+            self._compress = obj.process
+            self._flush = obj.finish
+        else:
+            raise ValueError("Unsupported content encoding '%s'" % encoding)
+
+    def compress(self, data):
+        """Compress chunk of data.
+
+        Output may be buffered internally and returned by later calls.
+        """
+        return self._compress(data)
+
+    def flush(self):
+        """Finish stream and return remaining compressed data.
+        """
+        return self._flush()
+
+
+def compress(data, encoding, level=6):
+    """Compress bytes using content encoding.
+
+    Args:
+        data (bytes): Data to compress.
+        encoding (str): 'br', 'gzip' or 'deflate'.
+
+    Keyword Args:
+        level (int): Compression level.
+
+    Returns:
+        bytes: Compressed data.
+    """
+    compressor = Compressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_iter(chunks, encoding, level=6):
+    """Compress iterable of bytes incrementally.
+
+    Empty outputs are not yielded, chunks are yielded as the compressor
+    emits them.
+
+    Args:
+        chunks (iterable): Bytes chunks.
+        encoding (str): 'br', 'gzip' or 'deflate'.
+
+    Keyword Args:
+        level (int): Compression level.
+
+    Returns:
+        Generator of compressed bytes.
+    """
+    compressor = Compressor(encoding, level)
+    for chunk in chunks:
+        if chunk:
+            chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    yield compressor.flush()
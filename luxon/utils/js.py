@@ -36,6 +36,11 @@ from luxon.exceptions import JSONDecodeError
 from luxon.utils.timezone import format_datetime, to_user
 from luxon.utils.html5 import strip_tags
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class _JsonEncoder(json.JSONEncoder):
     """Custom encoder.
@@ -71,41 +76,148 @@ class _JsonEncoder(json.JSONEncoder):
             return json.JSONEncoder.default(self, o)
 
 
-def parse_load(parse):
-    if isinstance(parse, list):
-        for i, obj in enumerate(parse):
-            parse[i] = parse_load(obj)
-        return parse
-    elif isinstance(parse, dict):
-        for obj in parse:
-            parse[obj] = parse_load(parse[obj])
-        return parse
-    else:
-        if isinstance(parse, str):
-            parse = strip_tags(parse)
-        return parse
+def _json_loads(json_text):
+    if isinstance(json_text, bytes):
+        # JSON requires str not bytes hence decode.
+        json_text = json_text.decode('UTF-8')
+    return json.loads(json_text)
+
+
+def _orjson_loads(json_text):
+    try:
+        return orjson.loads(json_text)
+    except orjson.JSONDecodeError:
+        # NOTE(cfrademan): orjson is stricter than json. (e.g. NaN and
+        # integers larger than 64 bit) Retry with json to keep results and
+        # errors identical.
+        return _json_loads(json_text)
+
+
+# Decode engines available by name.
+engines = {'json': _json_loads}
+if orjson is not None:
+    engines['orjson'] = _orjson_loads
+
+_engine = 'orjson' if orjson is not None else 'json'
+
+
+def set_engine(name, loads=None):
+    """Set engine used to decode JSON documents.
+
+    The C-accelerated 'orjson' engine is used by default when the 'orjson'
+    package is installed, otherwise 'json' from the standard library.
+
+    Args:
+        name (str): Name of engine.
+
+    Keyword Args:
+        loads (callable): Register engine with name. Receives str or bytes
+            document and returns python object. Must raise
+            json.decoder.JSONDecodeError on invalid documents.
+    """
+    global _engine
+
+    if loads is not None:
+        engines[name] = loads
+    elif name not in engines:
+        raise ValueError("Unknown JSON decode engine '%s'" % name)
+
+    _engine = name
+
+
+def sanitize(value):
+    """Strip HTML tags from string.
+
+    Strings without '<' or '&' are returned as is, otherwise
+    luxon.utils.html5.strip_tags is used.
+
+    Args:
+        value (str): String to sanitize.
+
+    Returns:
+        str: Sanitized string.
+    """
+    if '<' in value or '&' in value:
+        return strip_tags(value)
+
+    return value
+
+
+def _sanitize(parse, trusted, nested):
+    # NOTE(cfrademan): Only strings within objects are sanitized, strings
+    # in a top level array or a top level string are not.
+    if isinstance(parse, dict):
+        for key, value in parse.items():
+            if trusted is not None and key in trusted:
+                continue
+            if isinstance(value, str):
+                if '<' in value or '&' in value:
+                    parse[key] = strip_tags(value)
+            elif isinstance(value, (dict, list,)):
+                _sanitize(value, trusted, True)
+    elif isinstance(parse, list):
+        for i, value in enumerate(parse):
+            if isinstance(value, str):
+                if nested and ('<' in value or '&' in value):
+                    parse[i] = strip_tags(value)
+            elif isinstance(value, (dict, list,)):
+                _sanitize(value, trusted, nested)
+
+    return parse
+
+
+def parse_load(parse, trusted=None):
+    """Sanitize strings within deserialized JSON document.
+
+    Args:
+        parse (obj): Deserialized document, modified in place.
 
+    Keyword Args:
+        trusted (set): Object keys of which values are not sanitized.
 
-def loads(json_text, **kwargs):
+    Returns:
+        Sanitized document.
+    """
+    return _sanitize(parse, trusted, False)
+
+
+def loads(json_text, sanitize=True, trusted=None, **kwargs):
     """Deserializes a json document to a python object.
 
+    HTML tags are stripped from strings within objects unless sanitize
+    is False. Values of object keys in trusted are not sanitized.
+
     Args:
         json_text (str/bytes): document to be deserialized.
 
+    Keyword Args:
+        sanitize (bool): Strip HTML tags from strings.
+        trusted (set): Object keys of which values are not sanitized.
+
+    Other keyword arguments are passed to json.loads of the standard
+    library, bypassing the decode engine.
+
     Returns:
         python object.
 
     """
-    if isinstance(json_text, bytes):
-        # JSON requires str not bytes hence decode.
-        json_text = json_text.decode('UTF-8')
     try:
-        obj = json.loads(json_text, object_hook=parse_load, **kwargs)
-        return obj
+        if kwargs:
+            if isinstance(json_text, bytes):
+                # JSON requires str not bytes hence decode.
+                json_text = json_text.decode('UTF-8')
+            obj = json.loads(json_text, **kwargs)
+        else:
+            obj = engines[_engine](json_text)
 
     except json.decoder.JSONDecodeError as e:
         raise JSONDecodeError(e) from None
 
+    if sanitize:
+        return _sanitize(obj, trusted, False)
+
+    return obj
+
 
 def dumps(obj, indent=4):
     """Serializes an object as a JSON formatted stream.
@@ -113,7 +225,101 @@ def dumps(obj, indent=4):
     Args:
         obj(obj): object to be serialized.
 
+    Keyword Args:
+        indent (int): Indentation of nested levels. None provides compact
+            output without whitespace.
+
     Returns:
         JSON formatted stream.
     """
+    if indent is None:
+        return json.dumps(obj, separators=(',', ':'), cls=_JsonEncoder)
+
     return json.dumps(obj, indent=indent, cls=_JsonEncoder)
+
+
+# Compact encoder for iterdumps.
+_compact_encoder = _JsonEncoder(separators=(',', ':'))
+
+# Nested container levels iterated by iterdumps.
+_STREAM_DEPTH = 2
+
+
+def _key(key):
+    if isinstance(key, str):
+        return _compact_encoder.encode(key)
+    elif key is None or isinstance(key, (bool, int, float,)):
+        # Same conversion as json for non string keys.
+        return '"%s"' % json.dumps(key)
+    else:
+        raise TypeError('keys must be str, int, float, bool or None, '
+                        'not %s' % key.__class__.__name__)
+
+
+def _iterencode(obj, depth, chunk_size):
+    encode = _compact_encoder.encode
+
+    if isinstance(obj, dict):
+        yield '{'
+        first = True
+        for key, value in obj.items():
+            if first:
+                first = False
+                yield _key(key) + ':'
+            else:
+                yield ',' + _key(key) + ':'
+            if depth > 1 and isinstance(value, (dict, list, tuple,)):
+                yield from _iterencode(value, depth - 1, chunk_size)
+            else:
+                yield encode(value)
+        yield '}'
+    elif isinstance(obj, (list, tuple,)):
+        # NOTE(cfrademan): Items are encoded in batches, one call to the C
+        # encoder per batch. The batch size adapts to produce approximately
+        # chunk_size of output.
+        yield '['
+        batch = 16
+        start = 0
+        length = len(obj)
+        while start < length:
+            encoded = encode(obj[start:start + batch])
+            if start > 0:
+                yield ','
+            yield encoded[1:-1]
+            start += batch
+            batch = min(max(int(batch * chunk_size / len(encoded)), 1),
+                        4096)
+        yield ']'
+    else:
+        yield encode(obj)
+
+
+def iterdumps(obj, chunk_size=8192):
+    """Serializes an object as compact JSON in chunks.
+
+    Output is identical to dumps(obj, indent=None). Arrays in the outer
+    levels are encoded in batches of items with the C accelerated encoder
+    and yielded in chunks of approximately chunk_size, keeping memory usage
+    independent of the size of large collections.
+
+    Args:
+        obj(obj): object to be serialized.
+
+    Keyword Args:
+        chunk_size (int): Minimum size of chunks.
+
+    Returns:
+        Generator of UTF-8 encoded bytes.
+    """
+    buffer = []
+    size = 0
+    for part in _iterencode(obj, _STREAM_DEPTH, chunk_size):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('UTF-8')
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield ''.join(buffer).encode('UTF-8')
@@ -173,7 +173,7 @@ class Process(object):
 
     def _new(self):
         def _process(log_queue, *args, **kwargs):
-            MPLogger(self._name, log_queue)
+            mplogger = MPLogger(self._name, log_queue)
 
             try:
                 self._target(*args, **kwargs)
@@ -184,6 +184,9 @@ class Process(object):
             except Exception:
                 log.critical('Process ended (Unhandled Exception)'
                              '\n%s' % str(traceback.format_exc()))
+            finally:
+                # Send buffered log records before process exits.
+                mplogger.close()
 
         return PYProcess(target=_process,
                          name=self._name,
@@ -1,209 +1,413 @@
-# -*- coding: utf-8 -*-
-#
-# Copyright (c) 2018 Dave Kruger.
-# All rights reserved.
-#
-# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
-# All rights reserved.
-#
-# Redistribution and use in source and binary forms, with or without
-# modification, are permitted provided that the following conditions are met:
-#
-# * Redistributions of source code must retain the above copyright notice, this
-#   list of conditions and the following disclaimer.
-#
-# * Redistributions in binary form must reproduce the above copyright notice,
-#   this list of conditions and the following disclaimer in the documentation
-#   and/or other materials provided with the distribution.
-#
-# * Neither the name of the copyright holders nor the names of its
-#   contributors may be used to endorse or promote products derived from
-#   this software without specific prior written permission.
-#
-# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
-# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
-# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
-# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
-# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
-# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
-# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
-# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
-# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
-# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
-# THE POSSIBILITY OF SUCH DAMAGE.
-import queue
-import atexit
-
-from luxon.core.logger import GetLogger
-from luxon.exceptions import PoolExhausted
-from luxon.utils.objects import object_name
-
-log = GetLogger(__name__)
-
-
-def _log(msg, obj, pool):
-    log.debug('%s: %s (COUNT: %s, MAX_POOL_SIZE: %s, MAX_OVERFLOW %s' %
-              (msg, object_name(obj), pool._count,
-               pool._pool_size, pool._max_overflow))
-
-
-class ProxyObject(object):
-    """ Class ProxyObject
-
-    Class that creates objects with same attributes as
-    the original, but is also aware of object pool.
-
-    When the close() method is called on the Proxy object,
-    it will not really be closed, and instead simply returned
-    to the pool.
-
-    Unless the pool limit has been reached, in which case the real
-    close() method will be called on the object.
-
-    Args:
-        obj (obj): original (proxied) object.
-        pool (Pool): queue.Queue object which is the pool.
-    """
-
-    def __init__(self, obj, pool):
-        self._obj = obj
-        self._pool = pool
-
-    def __getattr__(self, attr):
-        if self._obj is None:
-            raise ReferenceError('Object already returned to pool %s'
-                                 % self._pool)
-
-        if attr[0] == '_':
-            return self.__dict__[attr]
-        else:
-            return getattr(self._obj, attr)
-
-    def __setattr__(self, attr, value):
-        if attr[0] == '_':
-            self.__dict__[attr] = value
-        else:
-            setattr(self._obj, attr, value)
-
-    def _close_or_return(self):
-        """ Method _close_or_return().
-
-        Internal Method that either returns the object to the pool,
-        or closes the proxied object in the case where the pool_size
-        has been reached.
-        """
-        if self._pool._count <= self._pool._pool_size:
-            _log('Returning object to pool', self._obj, self._pool)
-            try:
-                self._obj.clean_up()
-            except AttributeError:
-                pass
-            self._pool._queue.put(self._obj)
-        else:
-            try:
-                self._obj.close()
-            except AttributeError:
-                pass
-            # Since we have closed the connection,
-            # we can now decrease spawn count to allow
-            # for one more instance.
-            self._pool._count -= 1
-
-        # In order to prevent the use of the connector object after
-        # its returned, the proxied object is deleted.
-        self._obj = None
-
-    def close(self):
-        """ Method close()
-
-        Put back in queue this proxy object.
-        But only if we have not exceeded pool_size.
-        """
-        self._close_or_return()
-
-    def __enter__(self):
-        # Used when entering the with statement.
-        return self
-
-    def __exit__(self, type, value, traceback):
-        # When exiting the with statement.
-        self._close_or_return()
-
-
-class Pool(object):
-    """ Class Pool.
-
-    Pool manager for any objects such as db connections.
-
-    Specify pool_size and max_overflow when creating the pool object.
-    Call it to obtain a connector object. If one is available in the pool,
-    it will be returned, otherwise a new object will be created and returned.
-
-    Args:
-        get_obj_func (obj): The function that creates and returns the connector object.
-        pool_size (int): Length of the queue. At any given time no more than this many objects will
-                         exist in the queue.
-        max_overflow (int): How many objects can be created over an
-                            above the pool size. The maximum
-                            number of objects that will exist at any given time equals the sum of pool_size
-                            and max_overflow. When the number of created objects exceed the pool_size, the next object
-                            to be closed will really be closed and not returned to the pool.
-
-    Example:
-        .. code:: python
-
-            def someFunc():
-                return some_connector_object
-
-            pool = Pool(someFunc, pool_size=10, max_overflow=10)
-
-            conn = pool()
-            conn.someMethod()
-            conn.close()
-
-        or
-
-        .. code:: python
-
-            with pool() as conn:
-                conn.someMethod()
-    """
-
-    def __init__(self, get_obj_func, pool_size=10, max_overflow=10):
-        self._pool_size = pool_size
-        self._max_overflow = max_overflow
-        self._queue = queue.Queue(maxsize=pool_size)
-        self._get_obj_func = get_obj_func
-        self._count = 0
-
-    def __call__(self):
-        count = self._count
-        pool_size = self._pool_size
-        max_pool_size = pool_size + self._max_overflow
-        if count < max_pool_size:
-            q = self._queue
-
-            # First trying to get object from the pool
-            # (connector obj returned from from get_obj_func)
-            try:
-                # if in queue, grab it there
-                _get_obj = q.get(False)
-                try:
-                    _get_obj.ping()
-                except AttributeError:
-                    pass
-                _log('Using object from pool', _get_obj, self)
-            except queue.Empty:
-                # If not in queue
-                # create new conn object.
-                _get_obj = self._get_obj_func()
-                self._count += 1
-                _log('Created new object', _get_obj, self)
-                try:
-                    atexit.register(_get_obj.close)
-                except AttributeError:
-                    pass
-
-            return ProxyObject(_get_obj, self)
-        else:
-            raise PoolExhausted(self._get_obj_func.__name__, self._count)
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 Dave Kruger.
+# All rights reserved.
+#
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import queue
+import atexit
+from functools import partial
+from threading import Lock, Condition
+from time import monotonic
+
+from luxon.core.logger import GetLogger
+from luxon.core.metrics import registry
+from luxon.exceptions import PoolExhausted
+from luxon.utils.objects import object_name
+
+log = GetLogger(__name__)
+
+_CHECKOUT = registry.histogram('luxon_pool_checkout_seconds',
+                               'Seconds to check out object from pool.')
+_IN_USE = registry.gauge('luxon_pool_in_use',
+                         'Objects checked out of pool.')
+_EXHAUSTED = registry.counter('luxon_pool_exhausted_total',
+                              'Checkouts failed with pool exhausted.')
+_EVICTIONS = registry.counter('luxon_pool_evictions_total',
+                              'Objects closed instead of reused.')
+
+
+def _log(msg, obj, pool):
+    log.debug('%s: %s (COUNT: %s, MAX_POOL_SIZE: %s, MAX_OVERFLOW %s' %
+              (msg, object_name(obj), pool._count,
+               pool._pool_size, pool._max_overflow))
+
+
+def _close(obj):
+    try:
+        obj.close()
+    except AttributeError:
+        pass
+
+
+class ProxyObject(object):
+    """ Class ProxyObject
+
+    Class that creates objects with same attributes as
+    the original, but is also aware of object pool.
+
+    When the close() method is called on the Proxy object,
+    it will not really be closed, and instead simply returned
+    to the pool.
+
+    Unless the pool limit has been reached, in which case the real
+    close() method will be called on the object.
+
+    Objects providing a defer(func) method returning True are returned to
+    the pool once they call func, such as database connections with open
+    streaming cursors.
+
+    Args:
+        obj (obj): original (proxied) object.
+        pool (Pool): queue.Queue object which is the pool.
+
+    Keyword Args:
+        created (float): monotonic time when object was created.
+    """
+
+    def __init__(self, obj, pool, created=None):
+        self._obj = obj
+        self._pool = pool
+        self._created = created
+
+    def __getattr__(self, attr):
+        if self._obj is None:
+            raise ReferenceError('Object already returned to pool %s'
+                                 % self._pool)
+
+        if attr[0] == '_':
+            return self.__dict__[attr]
+        else:
+            return getattr(self._obj, attr)
+
+    def __setattr__(self, attr, value):
+        if attr[0] == '_':
+            self.__dict__[attr] = value
+        else:
+            setattr(self._obj, attr, value)
+
+    def _close_or_return(self):
+        """ Method _close_or_return().
+
+        Internal Method that either returns the object to the pool,
+        or closes the proxied object in the case where the pool_size
+        has been reached or the object exceeded its maximum lifetime.
+        """
+        pool = self._pool
+        obj = self._obj
+
+        # In order to prevent the use of the connector object after
+        # its returned, the proxied object is deleted.
+        self._obj = None
+
+        # Objects in use, such as connections with open streaming cursors,
+        # are returned once released.
+        try:
+            if obj.defer(partial(pool._return, obj, self._created)):
+                return
+        except AttributeError:
+            pass
+
+        pool._return(obj, self._created)
+
+    def close(self):
+        """ Method close()
+
+        Put back in queue this proxy object.
+        But only if we have not exceeded pool_size.
+        """
+        self._close_or_return()
+
+    def __enter__(self):
+        # Used when entering the with statement.
+        return self
+
+    def __exit__(self, type, value, traceback):
+        # When exiting the with statement.
+        self._close_or_return()
+
+
+class Pool(object):
+    """ Class Pool.
+
+    Pool manager for any objects such as db connections.
+
+    Specify pool_size and max_overflow when creating the pool object.
+    Call it to obtain a connector object. If one is available in the pool,
+    it will be returned, otherwise a new object will be created and returned.
+
+    When the pool is exhausted, checkout waits up to timeout seconds for an
+    object to be returned before raising PoolExhausted.
+
+    Objects idle in the pool for longer than ping_idle seconds are checked
+    with their ping() method before use. Objects older than max_lifetime or
+    idle for longer than idle_timeout seconds are closed instead of reused.
+
+    Args:
+        get_obj_func (obj): The function that creates and returns the connector object.
+        pool_size (int): Length of the queue. At any given time no more than this many objects will
+                         exist in the queue.
+        max_overflow (int): How many objects can be created over an
+                            above the pool size. The maximum
+                            number of objects that will exist at any given time equals the sum of pool_size
+                            and max_overflow. When the number of created objects exceed the pool_size, the next object
+                            to be closed will really be closed and not returned to the pool.
+
+    Keyword Args:
+        timeout (float): Seconds to wait for an object when the pool is
+                         exhausted. (default 0, do not wait)
+        ping_idle (float): Seconds an object can be idle before it is
+                           pinged on checkout. (default 0, always ping)
+        max_lifetime (float): Seconds after creation when an object is
+                              closed instead of reused. (default None)
+        idle_timeout (float): Seconds an object can be idle in the pool
+                              before it is closed. (default None)
+
+    Example:
+        .. code:: python
+
+            def someFunc():
+                return some_connector_object
+
+            pool = Pool(someFunc, pool_size=10, max_overflow=10)
+
+            conn = pool()
+            conn.someMethod()
+            conn.close()
+
+        or
+
+        .. code:: python
+
+            with pool() as conn:
+                conn.someMethod()
+    """
+
+    def __init__(self, get_obj_func, pool_size=10, max_overflow=10,
+                 timeout=0, ping_idle=0, max_lifetime=None,
+                 idle_timeout=None):
+        self._pool_size = pool_size
+        self._max_overflow = max_overflow
+        self._queue = queue.Queue(maxsize=pool_size)
+        self._get_obj_func = get_obj_func
+        self._count = 0
+        self._timeout = timeout
+        self._ping_idle = ping_idle
+        self._max_lifetime = max_lifetime
+        self._idle_timeout = idle_timeout
+        self._lock = Lock()
+        self._available = Condition(self._lock)
+
+        # Statistics
+        self._waits = 0
+        self._wait_time = 0.0
+        self._evictions = 0
+        self._ping_failures = 0
+        self._exhausted = 0
+
+        atexit.register(self.close)
+
+    @property
+    def stats(self):
+        """Pool statistics.
+
+        Returns:
+            dict: in_use, idle, waits, wait_time, evictions, ping_failures
+                and exhausted.
+        """
+        with self._lock:
+            idle = self._queue.qsize()
+            return {'in_use': self._count - idle,
+                    'idle': idle,
+                    'waits': self._waits,
+                    'wait_time': self._wait_time,
+                    'evictions': self._evictions,
+                    'ping_failures': self._ping_failures,
+                    'exhausted': self._exhausted}
+
+    def _expired(self, created, now):
+        return (self._max_lifetime is not None and
+                created is not None and
+                now - created > self._max_lifetime)
+
+    def _evict(self, obj):
+        _log('Evicting object from pool', obj, self)
+        with self._lock:
+            self._count -= 1
+            self._evictions += 1
+            self._available.notify()
+        _EVICTIONS.inc(pool=self._get_obj_func.__name__)
+        _close(obj)
+
+    def _in_use(self):
+        # Update in use gauge metric.
+        _IN_USE.set(self._count - self._queue.qsize(),
+                    pool=self._get_obj_func.__name__)
+
+    def _return(self, obj, created):
+        # Checkin object returned by proxy.
+        self._checkin(obj, created)
+
+        if registry.enabled:
+            self._in_use()
+
+    def _checkin(self, obj, created):
+        with self._lock:
+            keep = self._count <= self._pool_size
+            if not keep:
+                # Since we are closing the object, we can now decrease
+                # spawn count to allow for one more instance.
+                self._count -= 1
+                self._available.notify()
+
+        if keep:
+            if obj is None:
+                return
+
+            if self._expired(created, monotonic()):
+                self._evict(obj)
+                return
+
+            _log('Returning object to pool', obj, self)
+            try:
+                obj.clean_up()
+            except AttributeError:
+                pass
+
+            with self._lock:
+                self._queue.put_nowait((obj, created, monotonic(),))
+                self._available.notify()
+        elif obj is not None:
+            _close(obj)
+
+    def _checkout(self):
+        # Returns (obj, created, idle_since) from pool, or (None, None, None)
+        # when reserved to create new object.
+        max_pool_size = self._pool_size + self._max_overflow
+        deadline = None
+        started = None
+
+        with self._lock:
+            while True:
+                try:
+                    return self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+                if self._count < max_pool_size:
+                    self._count += 1
+                    return (None, None, None)
+
+                now = monotonic()
+                if deadline is None:
+                    deadline = now + (self._timeout or 0)
+
+                if now >= deadline:
+                    if started is not None:
+                        self._wait_time += now - started
+                    self._exhausted += 1
+                    _EXHAUSTED.inc(pool=self._get_obj_func.__name__)
+                    raise PoolExhausted(self._get_obj_func.__name__,
+                                        self._count)
+
+                if started is None:
+                    started = now
+                    self._waits += 1
+
+                self._available.wait(deadline - now)
+
+                if started is not None:
+                    now = monotonic()
+                    self._wait_time += now - started
+                    started = now
+
+    def __call__(self):
+        if registry.enabled:
+            start = monotonic()
+            obj = self._get()
+            _CHECKOUT.observe(monotonic() - start,
+                              pool=self._get_obj_func.__name__)
+            self._in_use()
+            return obj
+
+        return self._get()
+
+    def _get(self):
+        while True:
+            obj, created, idle_since = self._checkout()
+
+            if obj is None:
+                # If not in queue create new conn object.
+                try:
+                    obj = self._get_obj_func()
+                except Exception:
+                    with self._lock:
+                        self._count -= 1
+                        self._available.notify()
+                    raise
+
+                _log('Created new object', obj, self)
+                return ProxyObject(obj, self, monotonic())
+
+            now = monotonic()
+            if (self._expired(created, now) or
+                    (self._idle_timeout is not None and
+                     now - idle_since > self._idle_timeout)):
+                self._evict(obj)
+                continue
+
+            if now - idle_since >= self._ping_idle:
+                try:
+                    if obj.ping() is False:
+                        # Object reconnected itself.
+                        with self._lock:
+                            self._ping_failures += 1
+                except AttributeError:
+                    pass
+                except Exception:
+                    with self._lock:
+                        self._ping_failures += 1
+                    self._evict(obj)
+                    continue
+
+            _log('Using object from pool', obj, self)
+            return ProxyObject(obj, self, created)
+
+    def close(self):
+        """Close all idle objects in pool.
+        """
+        while True:
+            with self._lock:
+                try:
+                    obj, created, idle_since = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+                self._count -= 1
+            _close(obj)
@@ -41,6 +41,11 @@ from uuid import uuid4
 from hashlib import md5
 from struct import unpack_from
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from luxon import GetLogger
 from luxon.utils.encoding import if_bytes_to_unicode
 from luxon.utils.objects import save, load
@@ -154,12 +159,69 @@ def get_slot(ring_power, data_id):
         md5(data_id.encode()).digest())[0] >> slot_shift
 
 
-def build_ring(nodes, ring_power, replica=None):
+def ring_typecode(max_value):
+    """Narrowest array typecode for ring slots.
+
+    Ring slots only reference node slots in the NodesTree, which are small
+    positive integers. Storing them in the narrowest unsigned typecode that
+    fits reduces the ring from 8 bytes per slot ('L') to typically 1 or 2
+    bytes per slot.
+
+    Args:
+        max_value (int): Largest node slot referenced by the ring.
+
+    Returns:
+        str: Array typecode ('B', 'H', 'I', 'L' or 'Q').
+
+    Raises:
+        ValueError: Value too large for any unsigned array typecode.
+    """
+    for typecode in ('B', 'H', 'I', 'L', 'Q'):
+        if max_value < 2 ** (8 * array(typecode).itemsize):
+            return typecode
+
+    raise ValueError("Node slot too large for ring '%s'" % max_value)
+
+
+def ring_slot_counts(nodes, ring_power):
+    """Slots occupied by each node in ring.
+
+    Calculates the contiguous range each node occupies within the ring. Nodes
+    are placed in order and each node takes ceil(slots / total weight *
+    weight) slots, the last node is truncated to the end of the ring.
+
+    Args:
+        nodes (list): List of nodes. ( weight, node_id )
+        ring_power (int): Bits of ring size.
+
+    Returns:
+        list: List of ( node_id, slots ) in ring order.
+    """
+    slots = 2 ** ring_power
+    counts = []
+
+    # Calculate Total Weight for all nodes.
+    total_weight = sum([node[0] for node in nodes])
+
+    remaining = slots
+    for node in nodes:
+        if remaining == 0:
+            break
+        weight = node[0]
+        desired = int(math.ceil(slots / total_weight * weight))
+        count = max(min(desired, remaining), 0)
+        counts.append((node[1], count,))
+        remaining -= count
+
+    return counts
+
+
+def build_ring(nodes, ring_power, replica=None, backend=None):
     """Build ring with slots.
 
     The slots are references to nodes and the total number of slots is
     determined by the ring_power. If the slot power is 16(bits) then
-    65536 slots will be placed in a list known as the ring.
+    65536 slots will be placed in a array known as the ring.
 
     If we have 2 nodes, and the ring_power is 16bits. Then node 1 will be
     placed in items range of 0 to 32767 and node 2 will be in items range
@@ -170,17 +232,25 @@ def build_ring(nodes, ring_power, replica=None):
     Nodes are required to be a list / tuple. ( weight, node_id )
 
     Example of nodes list:
-        [  ( 1.0, '1' ), ( 1.0, '2' ) ]
+        [  ( 1.0, 1 ), ( 1.0, 2 ) ]
 
     The weight determines how to evenly distribute the nodes in the ring.
     If node 1 has double the weight of node 2, then effectively node 1 will
     occupy two thirds of the ring, while node 2 will only have one third of the
     ring.
 
+    Each node occupies a contiguous range of slots, the ring is therefor
+    filled in bulk per node rather than per slot. Node ids are stored in the
+    narrowest unsigned array typecode that fits, see ring_typecode().
+
+    The 'numpy' backend requires NumPy, it produces the exact same ring. The
+    ring returned is always an array.array to ensure saved rings can be
+    loaded without NumPy.
+
     Example usage:
         .. code:: python
 
-            nodes = [ ( 1.0, '1' ), ( 1.0, '2' ), ]
+            nodes = [ ( 1.0, 1 ), ( 1.0, 2 ), ]
 
             ring = build_ring(nodes, 2)
 
@@ -191,38 +261,26 @@ def build_ring(nodes, ring_power, replica=None):
         nodes (list): List of nodes.
         ring_power (int): Bits of ring size.
         replica (int): Replica for informational purposes (logging).
+        backend (str): 'array' (default) or 'numpy'.
 
     Returns:
-        list: Ring.
+        array: Ring.
     """
-    ring = array('L')
-    slots = 2 ** ring_power
-
-    check_percent = [check for check in range(0, slots, math.ceil(slots / 4))]
-
-    # Calculate Total Weight for all nodes.
-    total_weight = sum([node[0] for node in nodes])
-
-    # Iterate through all slots and create ring.
-    slot = 0
-    for node in nodes:
-        weight = node[0]
-        desired = math.ceil(slots / total_weight * weight)
-
-        for _ in range(int(math.ceil(desired))):
-            if slot in check_percent:
-                percent_complete = round(100 * (float(slot)/float(slots)), 2)
-                if replica is not None:
-                    log.info("Building Replica Ring '%s' Completed '%s%s'" %
-                             (replica, percent_complete, '%',))
-                else:
-                    log.info("Building Ring Completed '%s%s'" %
-                             (percent_complete, '%',))
-            if slot == slots:
-                break
-
-            ring.append(node[1])
-            slot += 1
+    counts = ring_slot_counts(nodes, ring_power)
+    typecode = ring_typecode(max([node[0] for node in counts], default=0))
+
+    if backend is None or backend == 'array':
+        ring = array(typecode)
+        for node_id, count in counts:
+            ring.extend(array(typecode, (node_id,)) * count)
+    elif backend == 'numpy':
+        if numpy is None:
+            raise ImportError("Requires NumPy - pip install numpy")
+        ring = array(typecode, numpy.repeat(
+            numpy.array([node[0] for node in counts], dtype=typecode),
+            [node[1] for node in counts]).tobytes())
+    else:
+        raise ValueError("Invalid ring backend '%s'" % backend)
 
     if replica is not None:
         log.info("Building Replica Ring '%s' Completed '100%s'" %
@@ -864,10 +922,13 @@ class Ring(object):
 
         return tuple(snapshots)
 
-    def build(self):
+    def build(self, backend=None):
         """Build/Rebalance ring.
 
         Build composite Ring, which consists of 'replica' rings.
+
+        Args:
+            backend (str): Ring builder backend 'array' (default) or 'numpy'.
         """
         log.info("Building Ring: Replicas '%s' Zones '%s' Nodes '%s' " %
                  (self._replicas,
@@ -884,7 +945,8 @@ class Ring(object):
         for replica in range(1 + self._replicas):
             slot2node = build_ring(nodes[replica],
                                    self._ring_power,
-                                   replica)
+                                   replica,
+                                   backend=backend)
             if slot2node:
                 replicas.append(slot2node)
 
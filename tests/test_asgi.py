@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import json
+import asyncio
+
+import pytest
+
+from luxon import g
+from luxon import register
+
+
+@pytest.fixture(scope="module")
+def app():
+    from luxon.core.handlers.asgi import Asgi
+    app_root = os.path.abspath(os.path.dirname(__file__))
+    return Asgi(__name__, app_root + '/wsgi')
+
+
+def call(app, scope, messages):
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    return sent
+
+
+def scope(path, method='GET', headers=None, type='http'):
+    headers = [(k.lower().encode(), v.encode())
+               for k, v in (headers or {}).items()]
+    return {'type': type,
+            'http_version': '1.1',
+            'scheme': 'http',
+            'method': method,
+            'path': path,
+            'root_path': '',
+            'query_string': b'',
+            'headers': headers,
+            'client': ('127.0.0.1', 1234),
+            'server': ('localhost', 80)}
+
+
+def request(app, path, method='GET', body=b'', headers=None):
+    sent = call(app, scope(path, method, headers),
+                [{'type': 'http.request', 'body': body}])
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    headers = {k.decode().lower(): v.decode() for k, v in start['headers']}
+    body = b''.join(m.get('body', b'') for m in sent[1:])
+    assert sent[-1].get('more_body', False) is False
+    return start['status'], headers, body
+
+
+def test_asgi_sync(app):
+    @register.resource('POST', '/asgi/sync')
+    def sync(req, resp):
+        return {'json': req.json, 'request': g.current_request is req}
+
+    status, headers, body = request(app, '/asgi/sync', 'POST',
+                                    b'{"a": 1}',
+                                    {'Content-Type': 'application/json'})
+    assert status == 200
+    assert headers['content-type'].startswith('application/json')
+    assert json.loads(body) == {'json': {'a': 1}, 'request': True}
+
+
+def test_asgi_async(app):
+    @register.resource('GET', '/asgi/async/{id}')
+    async def view(req, resp, id):
+        await asyncio.sleep(0)
+        resp.content_type = 'text/plain'
+        return 'id %s' % id
+
+    status, headers, body = request(app, '/asgi/async/5')
+    assert status == 200
+    assert body == b'id 5'
+
+
+def test_asgi_stream(app):
+    @register.resource('GET', '/asgi/stream')
+    async def view(req, resp):
+        async def stream():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield 'chunk%s' % i
+
+        resp.content_type = 'text/plain'
+        return stream()
+
+    sent = call(app, scope('/asgi/stream'),
+                [{'type': 'http.request', 'body': b''}])
+    chunks = [m['body'] for m in sent[1:] if m.get('body')]
+    assert chunks == [b'chunk0', b'chunk1', b'chunk2']
+
+
+def test_asgi_not_found(app):
+    status, headers, body = request(app, '/asgi/missing',
+                                    headers={'Accept': 'application/json'})
+    assert status == 404
+    assert b'Not Found' in body
+
+
+def test_asgi_context(app):
+    @register.resource('GET', '/asgi/context/{id}')
+    async def view(req, resp, id):
+        await asyncio.sleep(0.01)
+        return {'id': id,
+                'route': g.current_request.route}
+
+    sent = {}
+
+    async def run():
+        async def one(i):
+            messages = [{'type': 'http.request', 'body': b''}]
+            result = sent[i] = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                result.append(message)
+
+            await app(scope('/asgi/context/%s' % i), receive, send)
+
+        await asyncio.gather(*[one(i) for i in range(5)])
+
+    asyncio.run(run())
+    for i in range(5):
+        response = json.loads(b''.join(m.get('body', b'')
+                                       for m in sent[i][1:]))
+        assert response == {'id': str(i),
+                            'route': '/asgi/context/%s' % i}
+
+
+def test_asgi_websocket(app):
+    @register.websocket('/asgi/echo')
+    async def echo(req, ws):
+        await ws.accept()
+        async for message in ws:
+            await ws.send(message)
+
+    sent = call(app, scope('/asgi/echo', type='websocket'),
+                [{'type': 'websocket.connect'},
+                 {'type': 'websocket.receive', 'text': 'hello'},
+                 {'type': 'websocket.receive', 'bytes': b'bin'},
+                 {'type': 'websocket.disconnect', 'code': 1000}])
+    assert sent[0]['type'] == 'websocket.accept'
+    assert sent[1] == {'type': 'websocket.send', 'text': 'hello'}
+    assert sent[2] == {'type': 'websocket.send', 'bytes': b'bin'}
+
+
+def test_asgi_websocket_not_found(app):
+    sent = call(app, scope('/asgi/missing', type='websocket'),
+                [{'type': 'websocket.connect'}])
+    assert sent == [{'type': 'websocket.close', 'code': 1008}]
+
+
+def test_asgi_lifespan(app):
+    sent = call(app, {'type': 'lifespan'},
+                [{'type': 'lifespan.startup'},
+                 {'type': 'lifespan.shutdown'}])
+    assert [m['type'] for m in sent] == ['lifespan.startup.complete',
+                                         'lifespan.shutdown.complete']
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+from authlib.jose.rfc7519 import JWTClaims
+
+from luxon import g
+from luxon.core.app import App
+from luxon.core.auth import Auth, TokenCache, auth_cache_info, auth_cache_clear
+from luxon.utils.rsa import RSAKey
+from luxon.utils.timezone import epoch
+
+
+def write_keys(path):
+    rsakey = RSAKey()
+    with open(str(path) + '/private.pem', 'w') as f:
+        f.write(rsakey.generate_private_key(bits=2048))
+    with open(str(path) + '/public.pem', 'w') as f:
+        f.write(rsakey.public_key)
+
+
+@pytest.fixture
+def app(tmp_path):
+    write_keys(tmp_path)
+    g.app = App("UnitTest", path=str(tmp_path), ini='/dev/null')
+    auth_cache_clear()
+    return tmp_path
+
+
+def test_auth_token_cache(app):
+    auth = Auth()
+    auth.new('user', roles=['Admin'])
+    token = auth.token
+
+    auth = Auth()
+    auth.token = token
+    assert auth_cache_info()['misses'] == 1
+    assert auth_cache_info()['tokens'] == 1
+
+    auth = Auth()
+    auth.token = token
+    assert auth_cache_info()['hits'] == 1
+    assert auth.user_id == 'user'
+    assert auth.token == token
+    auth.roles = 'Operations'
+
+    auth = Auth()
+    auth.token = token
+    assert auth.roles == ('Admin',)
+    assert auth_cache_info()['hits'] == 2
+
+
+def test_auth_key_reload(app):
+    auth = Auth()
+    auth.new('user')
+    token = auth.token
+
+    auth = Auth()
+    auth.token = token
+
+    write_keys(app)
+    auth = Auth()
+    with pytest.raises(Exception):
+        auth.token = token
+    assert auth_cache_info()['hits'] == 0
+
+
+def test_token_cache():
+    cache = TokenCache(max_tokens=2)
+    claims = JWTClaims({'user_id': 'user', 'exp': epoch() - 1},
+                       {'alg': 'RS256'})
+    cache.set(b'key', 'expired', claims)
+    assert cache.get(b'key', 'expired') is None
+    assert cache.stats['expired'] == 1
+
+    claims['exp'] = epoch() + 60
+    for token in ('1', '2', '3'):
+        cache.set(b'key', token, claims)
+    assert cache.get(b'key', '1') is None
+    assert cache.get(b'key', '3')['user_id'] == 'user'
+    assert cache.get(b'other', '3') is None
+    assert cache.stats['evictions'] == 1
+
+
+def test_request_policy_credentials(app):
+    from luxon.core.handlers.cmd.request import Request
+
+    auth = Auth()
+    auth.new('user', roles=['Root'])
+    token = auth.token
+
+    req = Request('GET', '/')
+    validate = req.policy.validate
+    assert validate('login') is False
+    assert validate('role:root') is False
+
+    # Rule results change after login within the request.
+    req.credentials.token = token
+    assert validate('login') is True
+    assert validate('role:root') is True
+
+    req.credentials.clear()
+    assert validate('login') is False
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+from luxon.testing.benchmarks.baseline import measure, save, load, compare
+
+
+def test_benchmark_measure():
+    result = measure(lambda: None, number=100, warmup=10)
+    assert result['ops'] > 0
+    assert result['p50'] <= result['p95'] <= result['p99']
+
+
+def test_benchmark_compare(tmp_path):
+    baseline = {'fast': {'ops': 1000.0}, 'slow': {'ops': 1000.0},
+                'removed': {'ops': 1000.0}}
+    path = str(tmp_path) + '/baseline.json'
+    save(baseline, path)
+    assert load(path) == baseline
+
+    results = {'fast': {'ops': 950.0}, 'slow': {'ops': 800.0},
+               'added': {'ops': 1000.0}}
+    comparison = {name: regressed
+                  for name, _, _, _, regressed in compare(load(path),
+                                                          results,
+                                                          threshold=10)}
+    assert comparison == {'fast': False, 'slow': True}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+
+from luxon.core.db.base.args import (args_to, args_cache_info,
+                                     args_cache_clear)
+
+
+def test_args_to():
+    query, args = args_to('SELECT * FROM t WHERE a = %s AND b = %s',
+                          (1, True), 'qmark', ())
+    assert query == 'SELECT * FROM t WHERE a = ? AND b = ?'
+    assert args == [1, 1]
+
+    query, args = args_to('SELECT * FROM t WHERE a = %(a)s AND b = :b',
+                          {'a': 1, 'b': 'b'}, 'format', ())
+    assert query == 'SELECT * FROM t WHERE a = %s AND b = %s'
+    assert args == [1, 'b']
+
+    with pytest.raises(IndexError):
+        args_to('SELECT * FROM t WHERE a = %s', [], 'qmark', ())
+
+    with pytest.raises(TypeError):
+        args_to('SELECT * FROM t WHERE a = :a', [1], 'qmark', ())
+
+    with pytest.raises(KeyError):
+        args_to('SELECT * FROM t WHERE a = :a', {'b': 1}, 'qmark', ())
+
+
+def test_args_to_cache():
+    args_cache_clear()
+    for value in range(3):
+        query, args = args_to('SELECT * FROM t WHERE a = %s', value,
+                              'qmark', ())
+        assert query == 'SELECT * FROM t WHERE a = ?'
+        assert args == [value]
+
+    info = args_cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+from datetime import datetime
+
+import pytest
+
+from luxon import g
+from luxon.core.app import App
+from luxon.core.db.sqlite import Connection
+from luxon.core.db.base.parse import Decoder
+from luxon.utils.timezone import TimezoneUTC
+
+
+@pytest.fixture(scope="module")
+def conn():
+    g.app = App("UnitTest", ini='/dev/null')
+    conn = Connection(':memory:')
+    conn.execute('CREATE TABLE bulk (id INTEGER, name VARCHAR(32))')
+    return conn
+
+
+def test_executemany(conn):
+    conn.executemany('INSERT INTO bulk (id, name) VALUES (%s, %s)',
+                     [(row, 'many') for row in range(10)])
+    conn.executemany('INSERT INTO bulk (id, name) VALUES (%(id)s, %(name)s)',
+                     [{'id': 10, 'name': 'many'}])
+    conn.commit()
+    result = conn.execute("SELECT count(*) AS total FROM bulk" +
+                          " WHERE name = 'many'").fetchall()
+    assert result[0]['total'] == 11
+
+
+def test_insert_bulk(conn):
+    rows = [{'id': row, 'name': 'bulk'} for row in range(2500)]
+    rows.append((2500, 'bulk'))
+    conn.insert('bulk', rows, bulk=True)
+    result = conn.execute("SELECT count(*) AS total FROM bulk" +
+                          " WHERE name = 'bulk'").fetchall()
+    assert result[0]['total'] == 2501
+    result = conn.execute("SELECT * FROM bulk WHERE id = %s",
+                          2500).fetchall()
+    assert result[0]['name'] == 'bulk'
+
+
+def test_fetch_decode(conn):
+    conn.execute('CREATE TABLE decode (id INTEGER, note VARCHAR(32),' +
+                 ' created TIMESTAMP)')
+    created = datetime(2020, 1, 2, 3, 4, 5, tzinfo=TimezoneUTC())
+    conn.executemany('INSERT INTO decode (id, note, created)' +
+                     ' VALUES (%s, %s, %s)',
+                     [(row, None, None if row == 0 else
+                       '2020-01-02 03:04:05')
+                      for row in range(25)])
+    conn.commit()
+
+    crsr = conn.execute('SELECT * FROM decode ORDER BY id')
+    row = crsr.fetchone()
+    assert row == {'id': 0, 'note': None, 'created': None}
+    rows = crsr.fetchmany(10)
+    assert len(rows) == 10
+    assert rows[0]['created'] == created
+    assert len(crsr.fetchall()) == 14
+    assert crsr.fetchmany(10) == []
+    assert crsr.fetchone() is None
+    assert crsr.rownumber == 25
+
+    crsr.BATCH = 7
+    crsr.execute('SELECT id FROM decode ORDER BY id')
+    assert [row['id'] for row in crsr] == list(range(25))
+
+
+def test_decoder():
+    created = datetime(2020, 1, 2, 3, 4, 5)
+    decode = Decoder(('id', 'created',))
+    assert decode([(1, None,)]) == [{'id': 1, 'created': None}]
+    rows = decode([(2, created,)])
+    assert rows[0]['created'].tzinfo is not None
+
+    decode = Decoder(('id', 'created',), types=(3, 12,),
+                     datetime_types=(12,))
+    rows = decode([(1, created,), (2, None,)])
+    assert rows[0]['created'].tzinfo is not None
+    assert rows[1]['created'] is None
+
+
+def test_stream(conn):
+    conn.execute('CREATE TABLE stream (id INTEGER)')
+    conn.insert('stream', [{'id': row} for row in range(50)], bulk=True)
+    conn.commit()
+
+    released = []
+    crsr = conn.stream('SELECT id FROM stream ORDER BY id', batch=8)
+    assert conn.defer(lambda: released.append(True)) is True
+    assert [row['id'] for row in crsr] == list(range(50))
+    assert released == [True]
+    assert conn.defer(lambda: released.append(True)) is False
+
+    with conn.stream('SELECT id FROM stream') as crsr:
+        conn.defer(lambda: released.append(True))
+        assert crsr.fetchone() == {'id': 0}
+    assert released == [True, True]
+
+
+def test_stream_pool():
+    from luxon.core.metrics import registry
+    from luxon.utils.pool import Pool
+
+    registry.setup()
+    pool = Pool(lambda: Connection(':memory:'), pool_size=1, max_overflow=0)
+    proxy = pool()
+    proxy.execute('CREATE TABLE stream (id INTEGER)')
+    proxy.insert('stream', [{'id': row} for row in range(50)], bulk=True)
+    proxy.commit()
+    crsr = proxy.stream('SELECT id FROM stream', batch=8)
+    proxy.close()
+    assert pool.stats['in_use'] == 1
+    assert registry.value('luxon_pool_in_use', pool='<lambda>') == 1
+    assert len(list(crsr)) == 50
+    assert pool.stats['in_use'] == 0
+    assert registry.value('luxon_pool_in_use', pool='<lambda>') == 0
+    pool.close()
+
+
+def test_schema(conn):
+    from luxon.core.db.base import schema
+
+    assert conn.has_table('schema') is False
+    conn.execute('CREATE TABLE schema (id INTEGER, name VARCHAR(32))')
+    # Cached until invalidated.
+    assert conn.has_table('schema') is False
+    schema.invalidate('schema')
+    assert conn.has_table('schema') is True
+    assert conn.has_field('schema', 'name') is True
+    assert conn.has_field('schema', 'missing') is False
+    assert conn.columns('schema') == {'id': 'INTEGER',
+                                      'name': 'VARCHAR(32)'}
+
+    crsr = conn.execute('SELECT id FROM bulk ORDER BY id')
+    assert conn.columns('bulk') == {'id': 'INTEGER', 'name': 'VARCHAR(32)'}
+    assert crsr.fetchone() == {'id': 0}
+
+
+def test_thread_connect(tmp_path):
+    import threading
+    from luxon.core.db.sqlite import thread_connect
+
+    path = str(tmp_path / 'thread.db')
+    kwargs = {'journal_mode': 'wal', 'synchronous': 'normal',
+              'busy_timeout': 1000, 'cache_size': -1000}
+
+    with thread_connect(path, **kwargs) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone() == {
+            'journal_mode': 'wal'}
+        assert conn.execute('PRAGMA busy_timeout').fetchone() == {
+            'timeout': 1000}
+        conn.execute('CREATE TABLE thread (id INTEGER)')
+        conn.commit()
+        with thread_connect(path, **kwargs) as nested:
+            assert nested is conn
+            conn.execute('INSERT INTO thread (id) VALUES (1)')
+        # Not rolled back when nested connection closed.
+        conn.commit()
+
+    assert thread_connect(path) is conn
+    conn.close()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(
+        thread_connect(path).execute('SELECT * FROM thread').fetchall()))
+    thread.start()
+    thread.join()
+    assert other == [[{'id': 1}]]
+
+    with pytest.raises(ValueError):
+        Connection(path, journal_mode='invalid')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import time
+from collections import Counter
+
+import pytest
+
+from luxon.utils.pool import Pool
+from luxon.core.db.replicas import Replicas, Replica
+
+
+class Conn(object):
+    lag = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def replication_lag(self):
+        return Conn.lag
+
+
+def pool(name, fail=None):
+    def get_conn():
+        if fail:
+            raise ConnectionError(name)
+        return Conn(name)
+    return Pool(get_conn, pool_size=10, max_overflow=0)
+
+
+def read(replicas, number):
+    reads = Counter()
+    for i in range(number):
+        conn = replicas.read()
+        reads[conn.name] += 1
+        conn.close()
+    return reads
+
+
+def test_replicas_round_robin():
+    with pytest.raises(ValueError):
+        Replicas(pool('write'), balance='random')
+
+    replicas = Replicas(pool('write'),
+                        [Replica('a', pool('a'), 2),
+                         Replica('b', pool('b'))])
+    assert read(replicas, 30) == {'a': 20, 'b': 10}
+    assert replicas.write().name == 'write'
+
+
+def test_replicas_least_in_use():
+    replicas = Replicas(pool('write'),
+                        [Replica('a', pool('a')),
+                         Replica('b', pool('b'))],
+                        balance='least_in_use')
+    first = replicas.read()
+    second = replicas.read()
+    assert first.name != second.name
+    first.close()
+    second.close()
+
+
+def test_replicas_eject():
+    fail = [True]
+    replicas = Replicas(pool('write'),
+                        [Replica('a', pool('a')),
+                         Replica('b', pool('b', fail=fail))],
+                        eject=0.05)
+    assert read(replicas, 4) == {'a': 4}
+    assert replicas.stats['b']['ejected'] is True
+
+    # All replicas ejected or in use reads from write endpoint.
+    broken = Replicas(pool('write'), [Replica('b', pool('b', fail=fail))])
+    assert read(broken, 2) == {'write': 2}
+
+    time.sleep(0.06)
+    fail.clear()
+    assert read(replicas, 4) == {'a': 2, 'b': 2}
+
+
+def test_replicas_lag():
+    replicas = Replicas(pool('write'),
+                        [Replica('a', pool('a')),
+                         Replica('b', pool('b'))],
+                        max_lag=10, lag_interval=60)
+    Conn.lag = 30
+    try:
+        assert read(replicas, 2) == {'write': 2}
+    finally:
+        Conn.lag = 0
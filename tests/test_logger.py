@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import sys
+import logging
+
+from luxon.core.logger import MPLoggerHandler, recv_frame
+from luxon.core.networking.sock import Pipe
+
+
+def record(msg, *args):
+    return logging.LogRecord('test.mplogger', logging.INFO, __file__, 1,
+                             msg, args, None)
+
+
+def test_mplogger_batch():
+    server, client = Pipe()
+    handler = MPLoggerHandler(client, flush_interval=60, flush_bytes=1024)
+    for no in range(10):
+        handler.handle(record('Message %s', no))
+    handler.flush()
+
+    records = recv_frame(server)
+    assert len(records) == 10
+    assert records[9].getMessage() == 'Message 9'
+    assert records[9].name == 'test.mplogger'
+    assert records[9].levelname == 'INFO'
+    assert handler.stats['frames'] == 1
+    assert handler.stats['sent'] == 10
+
+    try:
+        raise ValueError('Exception Text')
+    except ValueError:
+        handler.handle(logging.LogRecord('test.mplogger', logging.ERROR,
+                                         __file__, 1, 'Failed', None,
+                                         sys.exc_info()))
+    handler.close()
+    records = recv_frame(server)
+    assert 'Exception Text' in records[0].msg
+    assert records[0].exc_info is None
+
+
+def test_mplogger_drop():
+    server, client = Pipe()
+    handler = MPLoggerHandler(client, flush_interval=60, max_records=2)
+    for no in range(5):
+        handler.handle(record('Message %s', no))
+    assert handler.stats['dropped'] == 3
+    handler.close()
+
+    records = recv_frame(server)
+    assert len(records) == 3
+    assert records[2].levelno == logging.WARNING
+    assert "'3'" in records[2].msg
+
+
+def test_mplogger_block():
+    server, client = Pipe()
+    handler = MPLoggerHandler(client, flush_interval=0.01, max_records=1,
+                              block=True)
+    for no in range(5):
+        handler.handle(record('Message %s', no))
+    handler.close()
+    assert handler.stats['dropped'] == 0
+    assert handler.stats['sent'] == 5
+
+    records = []
+    while len(records) < 5:
+        records += recv_frame(server)
+    assert records[4].getMessage() == 'Message 4'
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+
+from luxon.core.policy import Policy, compiler
+from luxon.exceptions import AccessDeniedError
+
+RULE_SET = {'role:admin': "'admin' in roles",
+            'login': "authenticated is True",
+            'both': "$role:admin and $login",
+            'either': "$role:admin or $login",
+            'missing': "$role:none or $login",
+            'count': "counter() > 0",
+            'any': "any(role == 'admin' for role in roles)",
+            'denied': "deny()",
+            'bad rule': "True"}
+
+
+class TestPolicy(object):
+    def test_policy_validate(self):
+        compiled = compiler(RULE_SET)
+        policy = Policy(compiled, roles=['admin'], authenticated=False)
+        assert policy.validate('role:admin') is True
+        assert policy.validate('login') is False
+        assert policy.validate('both') is False
+        assert policy.validate('either') is True
+        assert policy.validate('missing') is False
+        assert policy.validate('any') is True
+        assert policy.validate('bad rule') is False
+        assert policy.validate('unknown') is False
+
+        policy = Policy(RULE_SET, roles=[], authenticated=True)
+        assert policy.validate('both') is False
+        assert policy.validate('either') is True
+
+    def test_policy_missing_kwarg(self):
+        policy = Policy(RULE_SET, authenticated=True)
+        assert policy.validate('role:admin') is False
+        assert policy.validate('login') is True
+
+    def test_policy_memoize(self):
+        calls = []
+
+        def counter():
+            calls.append(1)
+            return len(calls)
+
+        policy = Policy(RULE_SET, counter=counter)
+        assert policy.validate('count') is True
+        assert policy.validate('count') is True
+        assert len(calls) == 1
+        policy.clear()
+        assert policy.validate('count') is True
+        assert len(calls) == 2
+
+    def test_policy_access_denied(self):
+        def deny():
+            raise AccessDeniedError('denied')
+
+        policy = Policy(RULE_SET, deny=deny)
+        assert policy.validate('denied') is False
+        with pytest.raises(AccessDeniedError):
+            policy.validate('denied', access_denied_raise=True)
+
+    def test_policy_compile_error(self):
+        with pytest.raises(ValueError):
+            compiler({'broken': "'admin' in"})
@@ -66,3 +66,64 @@ x = json.dumps(data)
 assert type(x) == str
 
 
+def test_loads_sanitize():
+    doc = ('{"name": "<b>Ryan</b>", "tags": ["<i>a</i>", "b"],'
+           ' "html": "<p>raw</p>", "nested": {"text": "x &amp; y"}}')
+
+    data = json.loads(doc)
+    assert data['name'] == 'Ryan'
+    assert data['tags'] == ['a', 'b']
+    assert data['html'] == 'raw\n'
+    assert data['nested']['text'] == 'x & y'
+
+    data = json.loads(doc, trusted={'html', 'nested'})
+    assert data['name'] == 'Ryan'
+    assert data['html'] == '<p>raw</p>'
+    assert data['nested']['text'] == 'x &amp; y'
+
+    data = json.loads(doc, sanitize=False)
+    assert data['name'] == '<b>Ryan</b>'
+
+    # Strings in top level arrays are not sanitized.
+    data = json.loads('["<b>a</b>", {"b": "<b>b</b>"}]')
+    assert data == ['<b>a</b>', {'b': 'b'}]
+
+    # Documents without markup are decoded as is.
+    plain = '{"a": [1, 2.5, null, true, "text"], "b": {"c": "d"}}'
+    assert json.loads(plain) == json.json.loads(plain)
+    assert json.loads(plain.encode()) == json.json.loads(plain)
+
+    with pytest.raises(json.JSONDecodeError):
+        json.loads('{"a":')
+
+
+def test_set_engine():
+    json.set_engine('test', lambda doc: {'engine': '<b>test</b>'})
+    try:
+        assert json.loads('{}') == {'engine': 'test'}
+    finally:
+        json.set_engine('orjson' if json.orjson else 'json')
+
+    with pytest.raises(ValueError):
+        json.set_engine('unknown')
+
+
+def test_iterdumps():
+    from decimal import Decimal
+    from ipaddress import IPv4Address
+
+    data = {'rows': [{'id': i, 'price': Decimal('1.5'),
+                      'ip': IPv4Address('127.0.0.1'),
+                      'tags': ['a', 'b'], 'empty': {}} for i in range(1000)],
+            2: None, False: 2.5, None: [], 'nested': {'a': [[], {}]}}
+    compact = json.dumps(data, indent=None)
+    assert compact == json.json.dumps(json.json.loads(compact),
+                                      separators=(',', ':'))
+
+    chunks = list(json.iterdumps(data, chunk_size=1024))
+    assert len(chunks) > 1
+    assert b''.join(chunks).decode() == compact
+
+    for obj in ([], {}, [1], 'text', None, ([1, 2],)):
+        assert b''.join(json.iterdumps(obj)).decode() == json.dumps(
+            obj, indent=None)
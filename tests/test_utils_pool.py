@@ -30,6 +30,7 @@
 
 import pytest
 from luxon.utils.pool import *
+from luxon.exceptions import PoolExhausted
 
 
 def test_pool():
@@ -87,3 +88,62 @@ def test_pool():
     conn.close()
     assert pool._count == 3
 
+
+def test_pool_wait():
+    import threading
+
+    class Connect():
+        def close(self):
+            pass
+
+    pool = Pool(Connect, pool_size=1, max_overflow=0, timeout=0.05)
+    conn = pool()
+
+    # Exhausted, waits for timeout.
+    with pytest.raises(PoolExhausted):
+        pool()
+    assert pool.stats['waits'] == 1
+    assert pool.stats['exhausted'] == 1
+    assert pool.stats['in_use'] == 1
+
+    # Returned while waiting.
+    pool._timeout = 5
+    timer = threading.Timer(0.05, conn.close)
+    timer.start()
+    conn = pool()
+    timer.join()
+    assert pool.stats['waits'] == 2
+    assert pool.stats['in_use'] == 1
+    conn.close()
+    assert pool.stats['idle'] == 1
+
+
+def test_pool_lifetime():
+    class Connect():
+        pings = 0
+
+        def ping(self):
+            Connect.pings += 1
+
+        def close(self):
+            pass
+
+    pool = Pool(Connect, pool_size=2, max_overflow=0, ping_idle=60)
+    conn = pool()
+    conn.close()
+    conn = pool()
+    # Not idle long enough to ping.
+    assert Connect.pings == 0
+    conn.close()
+
+    pool._ping_idle = 0
+    conn = pool()
+    assert Connect.pings == 1
+    conn.close()
+
+    pool._max_lifetime = 0
+    conn = pool()
+    conn.close()
+    assert pool.stats['evictions'] >= 1
+    assert pool.stats['idle'] == 0
+    assert pool._count == 0
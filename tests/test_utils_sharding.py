@@ -31,7 +31,8 @@ from pytest import raises
 import pytest
 parametrize = pytest.mark.parametrize
 
-from luxon.utils.sharding import Ring, NodesTree
+from luxon.utils.sharding import Ring, NodesTree, build_ring, ring_typecode
+from luxon.testing.benchmarks.sharding import build_ring_per_slot
 
 
 class TestSharding(object):
@@ -48,3 +49,22 @@ class TestSharding(object):
         for zone in zones:
             assert zone['percent'] == 100
 
+    @parametrize('nodes', [
+        [(1.0, 0), (1.0, 1)],
+        [(2.0, 0), (1.0, 1), (0.5, 7), (3.3, 300)],
+        [(1.0, node) for node in range(1365)],
+        [],
+    ])
+    def test_build_ring(self, nodes):
+        ring = build_ring(nodes, 12)
+        reference = build_ring_per_slot(nodes, 12)
+        assert list(ring) == list(reference)
+        if nodes:
+            assert len(ring) == 2 ** 12
+            assert ring.typecode == ring_typecode(max(n[1] for n in nodes))
+
+    def test_ring_typecode(self):
+        assert ring_typecode(0) == 'B'
+        assert ring_typecode(255) == 'B'
+        assert ring_typecode(256) == 'H'
+        assert ring_typecode(65536) == 'I'
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+
+from luxon import register
+from luxon.core.cache import Cache
+
+calls = []
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+    client = Client(__file__)
+    client.app._cache = Cache()
+    return client
+
+
+def test_wsgi_response_cache(client):
+    @register.resource('GET', '/cached', cache=60)
+    def cached(req, resp):
+        calls.append(req.query_params)
+        return {'calls': len(calls)}
+
+    result = client.get(path='/cached')
+    assert result.status_code == 200
+    assert result.json['calls'] == 1
+    etag = result.headers['etag']
+
+    # Served from cache without invoking resource.
+    result = client.get(path='/cached')
+    assert result.status_code == 200
+    assert result.json['calls'] == 1
+    assert result.headers['etag'] == etag
+    assert len(calls) == 1
+
+    # Different query string, different cache entry.
+    result = client.get(path='/cached', query_string='page=2')
+    assert result.json['calls'] == 2
+
+    # Different token, different cache entry.
+    result = client.get(path='/cached', headers={'X-Tenant-Id': 'tenant'})
+    assert result.json['calls'] == 3
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import gzip
+import zlib
+
+import pytest
+
+from luxon import register
+from luxon.core import register as registry
+from luxon.middleware.compress import Compress
+from luxon.utils.compress import negotiate, compress_iter
+
+CONTENT = [{'id': i, 'name': 'row %s' % i} for i in range(500)]
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+
+    @register.resource('GET', '/compress/json')
+    def json(req, resp):
+        resp.etag = 'rows'
+        return CONTENT
+
+    @register.resource('GET', '/compress/small')
+    def small(req, resp):
+        return 'small'
+
+    @register.resource('GET', '/compress/stream')
+    def stream(req, resp):
+        resp.content_type = 'text/plain'
+        return (('line %s\n' % i).encode() for i in range(5000))
+
+    @register.resource('GET', '/compress/image')
+    def image(req, resp):
+        resp.content_type = 'image/png'
+        return b'0' * 4096
+
+    client = Client(__file__)
+    compress = Compress(min_size=256)
+    registry._middleware_pre.append(compress.pre)
+    yield client
+    registry._middleware_pre.remove(compress.pre)
+
+
+def test_negotiate():
+    assert negotiate(None) is None
+    assert negotiate('gzip, deflate') == 'gzip'
+    assert negotiate('deflate;q=1, gzip;q=0.5') == 'deflate'
+    assert negotiate('gzip;q=0, deflate;q=0') is None
+    assert negotiate('*') is not None
+    assert negotiate('identity') is None
+
+
+def test_compress_iter():
+    chunks = [str(i).encode() * 100 for i in range(100)]
+    compressed = b''.join(compress_iter(chunks, 'gzip'))
+    assert gzip.decompress(compressed) == b''.join(chunks)
+
+
+def test_wsgi_compress(client):
+    result = client.get(path='/compress/json',
+                        headers={'Accept-Encoding': 'gzip'})
+    assert result.status_code == 200
+    assert result.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in result.headers['Vary']
+    assert result.headers['Content-Length'] == str(len(result.content))
+    assert result.headers['Etag'] == 'W/"rows"'
+    identity = client.get(path='/compress/json')
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.headers['Etag'] == '"rows"'
+    assert gzip.decompress(result.content) == identity.content
+
+    result = client.get(path='/compress/json',
+                        headers={'Accept-Encoding': 'deflate'})
+    assert result.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(result.content) == identity.content
+
+
+def test_wsgi_compress_stream(client):
+    result = client.get(path='/compress/stream',
+                        headers={'Accept-Encoding': 'gzip'})
+    assert result.status_code == 200
+    assert result.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in result.headers
+    assert gzip.decompress(result.content) == b''.join(
+        ('line %s\n' % i).encode() for i in range(5000))
+
+
+def test_wsgi_compress_skip(client):
+    result = client.get(path='/compress/small',
+                        headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in result.headers
+    assert result.content == b'small'
+
+    result = client.get(path='/compress/image',
+                        headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in result.headers
+    assert result.content == b'0' * 4096
@@ -182,3 +182,90 @@ def test_wsgi_form_get_all_files(client):
         assert response[i]['name'] == 'file'
         assert response[i]['type'] == 'application/octet-stream'
         assert response[i]['data'] == 'test\n'
+
+
+def _multipart(parts, boundary='luxonboundary'):
+    body = b''
+    for name, filename, data in parts:
+        body += b'--' + boundary.encode() + b'\r\n'
+        if filename:
+            body += ('Content-Disposition: form-data; name="%s";'
+                     ' filename="%s"\r\n' % (name, filename)).encode()
+            body += b'Content-Type: application/octet-stream\r\n'
+        else:
+            body += ('Content-Disposition: form-data;'
+                     ' name="%s"\r\n' % name).encode()
+        body += b'\r\n' + data + b'\r\n'
+    body += b'--' + boundary.encode() + b'--\r\n'
+    return body
+
+
+def test_parse_multipart():
+    from io import BytesIO
+    from luxon.core.handlers.wsgi.form import parse_form
+
+    data = bytes(range(256)) * 64 + b'\r\n--luxonboundar'
+    body = b'preamble\r\n' + _multipart([('text', None, b'value'),
+                                         ('empty', None, b''),
+                                         ('file', 'a.bin', data),
+                                         ('file', 'b.bin', b'')])
+    content_type = 'multipart/form-data; boundary="luxonboundary"'
+
+    for block_size in (1, 7, 64, 65536):
+        form = parse_form(BytesIO(body), content_type, len(body),
+                          block_size=block_size, spool_size=1024)
+        assert form.getfirst('text') == 'value'
+        assert form.getfirst('empty') == ''
+        files = form.getlist('file')
+        assert files == [data, b'']
+        upload = form['file'][0]
+        assert upload.filename == 'a.bin'
+        assert upload.type == 'application/octet-stream'
+        assert upload.size == len(data)
+        # Spooled to disk above spool_size.
+        assert upload.file._rolled is True
+        assert form['file'][1].file._rolled is False
+        form.close()
+
+
+def test_parse_form_limits():
+    from io import BytesIO
+    from luxon.core.handlers.wsgi.form import parse_form
+    from luxon.exceptions import HTTPPayloadTooLarge, HTTPBadRequest
+
+    body = _multipart([('field', None, b'value')] * 3)
+    content_type = 'multipart/form-data; boundary=luxonboundary'
+
+    with pytest.raises(HTTPPayloadTooLarge):
+        parse_form(BytesIO(body), content_type, len(body), max_parts=2)
+
+    stream = BytesIO(body)
+    with pytest.raises(HTTPPayloadTooLarge):
+        parse_form(stream, content_type, len(body), max_size=10)
+    # Never read.
+    assert stream.tell() == 0
+
+    with pytest.raises(HTTPBadRequest):
+        parse_form(BytesIO(body[:-20]), content_type, len(body) - 20)
+
+    body = b'a=1&b=%C3%A9+x&a=2&c'
+    form = parse_form(BytesIO(body), 'application/x-www-form-urlencoded',
+                      len(body), block_size=3)
+    assert form.getlist('a') == ['1', '2']
+    assert form.getfirst('b') == '\xe9 x'
+    assert form.getfirst('c') == ''
+
+    with pytest.raises(HTTPPayloadTooLarge):
+        parse_form(BytesIO(body), 'application/x-www-form-urlencoded',
+                   len(body), max_parts=3)
+
+
+def test_wsgi_form_too_large(client):
+    @register.resource('POST', '/form_too_large')
+    def form_too_large(req, resp):
+        req.form_max_size = 100
+        return req.form_dict
+
+    result = client.post(path='/form_too_large', headers=headers,
+                         body=payload)
+    assert result.status_code == 413
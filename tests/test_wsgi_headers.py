@@ -55,3 +55,46 @@ def test_wsgi_headers(client):
     response = result.json
     assert response['test'] == 'test'
     assert response['user-agent'] == 'chrome'
+
+def test_wsgi_headers_index(client):
+    @register.resource('GET', '/headers_index')
+    def request(req, resp):
+        response = {}
+        response['x-custom'] = req.headers['x-custom']
+        response['X-CUSTOM'] = req.headers['X-CUSTOM']
+        response['same'] = req.headers is req.headers
+        response['is_mobile'] = req.is_mobile
+        response['is_bot'] = req.is_bot
+        response['cookies'] = req.cookies
+        response['a'] = list(req.query_params['a'])
+        response['b'] = req.query_params.get('b')
+        req.query_params['a'].append('modified')
+
+        return response
+
+    headers = {}
+    headers['X-Custom'] = 'value'
+    headers['User-Agent'] = 'Mozilla/5.0 (iPhone; CPU iPhone OS 12_0)'
+    headers['Cookie'] = 'session=abc; theme=dark'
+
+    for i in range(2):
+        result = client.get(path='/headers_index', headers=headers,
+                            query_string='a=1&a=2&b=3')
+        assert result.status_code == 200
+        response = result.json
+        assert response['x-custom'] == 'value'
+        assert response['X-CUSTOM'] == 'value'
+        assert response['same'] is True
+        assert response['is_mobile'] is True
+        assert response['is_bot'] is False
+        assert response['cookies'] == {'session': 'abc', 'theme': 'dark'}
+        # Shared parsed query string is not modified by requests.
+        assert response['a'] == ['1', '2']
+        assert response['b'] == '3'
+
+    headers['User-Agent'] = 'Googlebot/2.1'
+    result = client.get(path='/headers_index', headers=headers,
+                        query_string='a=1&a=2')
+    response = result.json
+    assert response['is_mobile'] is False
+    assert response['is_bot'] is True
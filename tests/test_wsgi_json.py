@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+
+from luxon import register
+
+DOC = '{"name": "<b>Ryan</b>", "html": "<i>raw</i>"}'
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+
+    @register.resource('POST', '/json/sanitized')
+    def sanitized(req, resp):
+        return req.json
+
+    @register.resource('POST', '/json/fields')
+    @register.trusted('html')
+    def fields(req, resp):
+        return req.json
+
+    @register.resource('POST', '/json/trusted')
+    @register.trusted()
+    def trusted(req, resp):
+        return req.json
+
+    return Client(__file__)
+
+
+def test_wsgi_json_trusted(client):
+    result = client.post(path='/json/sanitized', body=DOC)
+    assert result.json == {'name': 'Ryan', 'html': 'raw'}
+
+    result = client.post(path='/json/fields', body=DOC)
+    assert result.json == {'name': 'Ryan', 'html': '<i>raw</i>'}
+
+    result = client.post(path='/json/trusted', body=DOC)
+    assert result.json == {'name': '<b>Ryan</b>', 'html': '<i>raw</i>'}
+
+
+def test_wsgi_json_encoder(client):
+    from luxon.core.handlers.wsgi.response import Response
+
+    @register.resource('GET', '/json/rows')
+    def rows(req, resp):
+        return [{'id': i} for i in range(5000)]
+
+    pretty = client.get(path='/json/rows')
+    assert b'\n    ' in pretty.content
+
+    try:
+        Response._JSON_ENCODER = 'compact'
+        compact = client.get(path='/json/rows')
+        assert compact.headers['Content-Length'] == str(len(compact.content))
+
+        Response._JSON_ENCODER = 'stream'
+        stream = client.get(path='/json/rows')
+        assert 'Content-Length' not in stream.headers
+        assert stream.headers['Content-Type'].startswith('application/json')
+    finally:
+        Response._JSON_ENCODER = 'pretty'
+
+    assert compact.content == stream.content
+    assert b' ' not in stream.content
+    assert stream.json == pretty.json
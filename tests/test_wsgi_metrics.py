@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018 Hieronymus Crouse.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+
+import pytest
+
+from luxon import router
+from luxon.core.metrics import Registry, registry, metrics
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+    return Client(__file__)
+
+
+def test_metrics_registry():
+    metrics = Registry()
+    jobs = metrics.counter('jobs_total', 'Jobs processed.')
+    busy = metrics.gauge('busy', 'Busy workers.')
+    latency = metrics.histogram('latency_seconds', 'Latency.',
+                                buckets=(0.1, 1))
+
+    # Nothing recorded before setup.
+    jobs.inc()
+    assert metrics.exposition() == ''
+
+    metrics.setup(cells=64, workers=8)
+    assert metrics.counter('jobs_total') is jobs
+    with pytest.raises(ValueError):
+        metrics.gauge('jobs_total')
+
+    jobs.inc(queue='a')
+    busy.set(2)
+
+    for i in range(2):
+        pid = os.fork()
+        if pid == 0:
+            jobs.inc(2, queue='a')
+            jobs.inc(queue='b')
+            busy.set(5)
+            latency.observe(0.5, route='/x')
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+    assert metrics.value('jobs_total', queue='a') == 5
+    assert metrics.value('jobs_total', queue='b') == 2
+    # Gauges of exited workers not included.
+    assert metrics.value('busy') == 2
+
+    text = metrics.exposition()
+    assert '# TYPE jobs_total counter' in text
+    assert 'jobs_total{queue="a"} 5\n' in text
+    assert 'busy 2\n' in text
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 0\n' in text
+    assert 'latency_seconds_bucket{route="/x",le="1"} 2\n' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 2\n' in text
+    assert 'latency_seconds_sum{route="/x"} 1\n' in text
+    assert 'latency_seconds_count{route="/x"} 2\n' in text
+
+
+def test_metrics_full():
+    metrics = Registry()
+    metrics.setup(cells=2, workers=1)
+    jobs = metrics.counter('jobs_total')
+    jobs.inc(queue='a')
+    jobs.inc(queue='b')
+    jobs.inc(queue='c')
+    assert metrics.value('jobs_total', queue='b') == 1
+    assert metrics.value('jobs_total', queue='c') is None
+
+
+def test_metrics_named(tmpdir):
+    path = str(tmpdir.join('metrics'))
+    metrics = Registry()
+    metrics.setup(cells=64, workers=8, path=path)
+    metrics.counter('jobs_total').inc()
+    metrics.gauge('busy')
+
+    # Workers loading the application after forking attach to the region.
+    for i in range(2):
+        pid = os.fork()
+        if pid == 0:
+            worker = Registry()
+            worker.setup(cells=64, workers=8, path=path)
+            worker.counter('jobs_total').inc(2)
+            worker.gauge('busy').set(1)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+    assert metrics.value('jobs_total') == 5
+    assert metrics.value('busy') == 0
+
+    # Region in use by running process.
+    with pytest.raises(ValueError):
+        Registry().setup(cells=32, workers=8, path=path)
+
+
+def test_metrics_workers(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '80')
+    metrics = Registry()
+    with pytest.raises(ValueError):
+        metrics.setup(workers=64)
+    metrics.setup()
+    assert metrics._workers == 160
+
+
+def test_wsgi_metrics(client):
+    registry.setup()
+    router.add('GET', '/metrics', metrics)
+
+    router.add('GET', '/metrics/{id}', lambda req, resp, id: id)
+
+    for i in range(3):
+        result = client.get(path='/metrics/%s' % i)
+        assert result.status_code == 200
+
+    result = client.get(path='/metrics')
+    assert result.status_code == 200
+    assert result.headers['Content-Type'].startswith('text/plain')
+    text = result.text
+    assert ('luxon_http_request_duration_seconds_count{method="GET",'
+            'route="/metrics/{id}",status="200"} 3\n') in text
+    assert ('luxon_http_response_size_bytes_sum{method="GET",'
+            'route="/metrics/{id}",status="200"} 3\n') in text
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import pytest
+
+from luxon import register
+from luxon.core.router import Router
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+    return Client(__file__)
+
+
+def view(req, resp):
+    pass
+
+
+def test_router_chain():
+    router = Router()
+
+    def pre(req, resp):
+        pass
+
+    def resource(req, resp):
+        pass
+
+    def post(req, resp, error):
+        pass
+
+    router.add('GET', '/chain/static', view)
+    router.middleware(pre, resource, post)
+    router.middleware(pre, resource, post, tags='chain:view')
+    router.add('GET', '/chain/{id}', view, tag='chain:view')
+    router.add('POST', 'regex:^/chain/regex$', view, tag='chain:view')
+    router.middleware(pre, None, post, methods='post')
+    router.middleware(pre, None, None, routes='/chain/static/')
+
+    found = router.find('GET', '/chain/static')
+    assert router.chain(found[1], found[3]) == ([pre], [resource], [post])
+
+    found = router.find('GET', '/chain/1')
+    assert router.chain(found[1], found[3]) == ([pre],
+                                                [resource, resource],
+                                                [post, post])
+
+    found = router.find('POST', '/chain/regex')
+    assert router.chain(found[1], found[3]) == ([pre, pre],
+                                                [resource, resource],
+                                                [post, post, post])
+
+    found = router.find('GET', '/chain/missing/route')
+    assert router.chain(found[1], found[3]) == ((), [resource], [post])
+
+
+def test_wsgi_middleware_scoped(client):
+    calls = []
+
+    class Scoped(object):
+        routes = ('/middleware/scoped',)
+
+        def pre(self, req, resp):
+            calls.append(('pre', req.route))
+
+        def resource(self, req, resp):
+            calls.append(('resource', req.route))
+
+        def post(self, req, resp, error):
+            calls.append(('post', req.route))
+
+    class Denied(object):
+        tags = ('middleware:denied',)
+
+        def pre(self, req, resp):
+            # Scoped pre runs after routing, before policy validation.
+            assert req.tag == 'middleware:denied'
+            calls.append(('denied', req.route))
+
+    register.middleware(Scoped)
+    register.middleware(Denied)
+
+    @register.resource('GET', '/middleware/scoped')
+    def scoped(req, resp):
+        return 'scoped'
+
+    @register.resource('GET', '/middleware/plain')
+    def plain(req, resp):
+        return 'plain'
+
+    @register.resource('GET', '/middleware/denied', tag='middleware:denied')
+    def denied(req, resp):
+        return 'denied'
+
+    result = client.get(path='/middleware/plain')
+    assert result.status_code == 200
+    assert calls == []
+
+    result = client.get(path='/middleware/scoped')
+    assert result.status_code == 200
+    assert calls == [('pre', '/middleware/scoped'),
+                     ('resource', '/middleware/scoped'),
+                     ('post', '/middleware/scoped')]
+
+    calls.clear()
+    result = client.get(path='/middleware/denied')
+    assert result.status_code == 403
+    assert calls == [('denied', '/middleware/denied')]
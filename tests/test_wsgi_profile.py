@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import pstats
+
+import pytest
+
+from luxon import register
+from luxon.middleware.profile import Profile
+
+
+@pytest.fixture(scope="module")
+def client():
+    from luxon.testing.wsgi.client import Client
+
+    @register.resource('GET', '/profile/{id}')
+    def profile(req, resp, id):
+        return id
+
+    return Client(__file__)
+
+
+def test_wsgi_profile(client, tmp_path):
+    with pytest.raises(ValueError):
+        Profile(header='X-Profile')
+
+    register.middleware(Profile, rate=0, header='X-Profile',
+                        token='secret', path=str(tmp_path), backups=2,
+                        routes=('/profile/{id}',))
+
+    result = client.get(path='/profile/1')
+    assert result.status_code == 200
+    assert os.listdir(tmp_path) == []
+
+    result = client.get(path='/profile/1',
+                        headers={'X-Profile': 'wrong'})
+    assert result.status_code == 200
+    assert os.listdir(tmp_path) == []
+
+    for i in range(3):
+        result = client.get(path='/profile/%s' % i,
+                            headers={'X-Profile': 'secret'})
+        assert result.status_code == 200
+
+    profiles = os.listdir(tmp_path)
+    assert len(profiles) == 2
+    for name in profiles:
+        assert name.endswith('_GET_profile_id.pstats')
+        pstats.Stats(os.path.join(tmp_path, name))
@@ -55,12 +55,25 @@ class Routing(object):
         g.router.add('GET', '/routing/{key1}/{key2}', self.keywords)
         g.router.add('GET', '/routing/{key1}/next/{key2}', self.keywords)
 
+        g.router.add('GET', 'regex:^/regex/first.*$', self.first)
+        g.router.add('GET', 'regex:^/regex/.*$', self.second)
+        g.router.add('GET', 'regex:^/regex_(?P<name>[a-z]+)$', self.named)
+
     def home(self, req, resp):
         return req.method
 
     def keywords(self, req, resp, key1, key2):
         return "%s:%s" % (key1, key2,)
 
+    def first(self, req, resp):
+        return 'first'
+
+    def second(self, req, resp):
+        return 'second'
+
+    def named(self, req, resp):
+        return 'named'
+
 def test_wsgi_methods(client):
     for method in METHODS:
         req = getattr(client, method.lower())
@@ -78,3 +91,21 @@ def test_wsgi_route_keywords(client):
     result = client.get(path='/routing/iamkey1/next/iamkey2')
     assert result.status_code == 200
     assert result.text == "iamkey1:iamkey2"
+
+def test_wsgi_route_regex(client):
+    # First registered route that matches wins.
+    result = client.get(path='/regex/first/page')
+    assert result.status_code == 200
+    assert result.text == "first"
+
+    result = client.get(path='/regex/second')
+    assert result.status_code == 200
+    assert result.text == "second"
+
+    # Route with named groups is matched on its own.
+    result = client.get(path='/regex_test')
+    assert result.status_code == 200
+    assert result.text == "named"
+
+    result = client.get(path='/regex_404')
+    assert result.status_code == 404
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018-2020 Christiaan Frans Rademan <chris@fwiw.co.za>.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holders nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+import os
+import gzip
+import wsgiref.util
+
+import pytest
+
+from luxon import register
+from luxon.core.handlers.wsgi.static import static_file
+
+CONTENT = b'0123456789' * 1000
+
+
+class SendfileWrapper(wsgiref.util.FileWrapper):
+    # Sends files up to the end like os.sendfile from current offset.
+    def __iter__(self):
+        try:
+            fileno = self.filelike.fileno()
+        except AttributeError:
+            yield from super().__iter__()
+            return
+        while True:
+            data = os.read(fileno, self.blksize)
+            if not data:
+                break
+            yield data
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    from luxon.testing.wsgi.client import Client
+
+    path = str(tmp_path_factory.mktemp('static'))
+    with open(path + '/asset.js', 'wb') as f:
+        f.write(CONTENT)
+    with open(path + '/compressed.js', 'wb') as f:
+        f.write(CONTENT)
+    with open(path + '/compressed.js.gz', 'wb') as f:
+        f.write(gzip.compress(CONTENT))
+
+    @register.resource('GET', '/static_file/{name}')
+    def static(req, resp, name):
+        return static_file(req, resp, path + '/' + name)
+
+    return Client(__file__)
+
+
+def test_wsgi_static_file(client):
+    result = client.get(path='/static_file/asset.js')
+    assert result.status_code == 200
+    assert result.content == CONTENT
+    assert result.headers['Content-Length'] == str(len(CONTENT))
+    assert 'javascript' in result.headers['Content-Type']
+    assert result.headers['Accept-Ranges'] == 'bytes'
+    assert result.headers['ETag']
+
+    result = client.get(path='/static_file/asset.js',
+                        file_wrapper=wsgiref.util.FileWrapper)
+    assert result.status_code == 200
+    assert result.content == CONTENT
+
+    result = client.get(path='/static_file/missing.js')
+    assert result.status_code != 200
+
+
+def test_wsgi_static_range(client):
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=10-19'},
+                        file_wrapper=wsgiref.util.FileWrapper)
+    assert result.status_code == 206
+    assert result.content == CONTENT[10:20]
+    assert result.headers['Content-Range'] == 'bytes 10-19/%s' % len(CONTENT)
+
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=-5'})
+    assert result.status_code == 206
+    assert result.content == CONTENT[-5:]
+
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=9990-'})
+    assert result.status_code == 206
+    assert result.content == CONTENT[9990:]
+
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=20000-'})
+    assert result.status_code == 416
+
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=0-9',
+                                 'If-Range': '"outdated"'})
+    assert result.status_code == 200
+    assert result.content == CONTENT
+
+    result = client.get(path='/static_file/asset.js',
+                        headers={'Range': 'bytes=10-19'},
+                        file_wrapper=SendfileWrapper)
+    assert result.status_code == 206
+    assert result.content == CONTENT[10:20]
+
+
+def test_wsgi_static_if_range(client):
+    result = client.get(path='/static_file/asset.js')
+    etag = result.headers['ETag']
+    last_modified = result.headers['Last-Modified']
+
+    for if_range in (etag, 'W/' + etag, last_modified):
+        result = client.get(path='/static_file/asset.js',
+                            headers={'Range': 'bytes=0-9',
+                                     'If-Range': if_range})
+        assert result.status_code == 206
+        assert result.content == CONTENT[:10]
+
+    for if_range in ('Tue, 15 Nov 1994 12:45:26 GMT', 'invalid'):
+        result = client.get(path='/static_file/asset.js',
+                            headers={'Range': 'bytes=0-9',
+                                     'If-Range': if_range})
+        assert result.status_code == 200
+        assert result.content == CONTENT
+
+
+def test_wsgi_static_precompressed(client):
+    result = client.get(path='/static_file/compressed.js',
+                        headers={'Accept-Encoding': 'gzip, deflate'})
+    assert result.status_code == 200
+    assert result.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(result.content) == CONTENT
+    gzip_etag = result.headers['ETag']
+
+    result = client.get(path='/static_file/compressed.js',
+                        headers={'Accept-Encoding': 'gzip;q=0'})
+    assert result.status_code == 200
+    assert 'Content-Encoding' not in result.headers
+    assert result.content == CONTENT
+    assert result.headers['ETag'] != gzip_etag